@@ -2,7 +2,7 @@ from rest_framework import viewsets
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from django.contrib.auth.models import User
-from django.db.models import Count, Sum, Avg
+from django.db.models import Count, Avg
 from rest_framework.permissions import IsAdminUser
 from user.serializers import UserSerializer
 from music.models import Track, Album, Artist, Playlist
@@ -11,6 +11,7 @@ from datetime import timedelta
 from django.contrib.auth import get_user_model
 from user_activity.models import UserActivity
 from search.models import SearchHistory
+from tracks.services import leaderboard_service
 
 User = get_user_model()
 
@@ -78,27 +79,19 @@ def user_analytics(request):
 @permission_classes([IsAdminUser])
 def content_analytics(request):
     """Get content-related analytics"""
-    # Most played tracks
-    top_tracks = Track.objects.annotate(
-        total_plays=Sum('play_count')
-    ).order_by('-total_plays')[:10]
-    
-    # Most downloaded tracks
-    top_downloads = Track.objects.annotate(
-        total_downloads=Sum('download_count')
-    ).order_by('-total_downloads')[:10]
-    
-    # Most popular artists
-    top_artists = Artist.objects.annotate(
-        track_count=Count('tracks'),
-        total_plays=Sum('tracks__play_count')
-    ).order_by('-total_plays')[:10]
-    
-    # Most popular albums
-    top_albums = Album.objects.annotate(
-        track_count=Count('tracks'),
-        total_plays=Sum('tracks__play_count')
-    ).order_by('-total_plays')[:10]
+    # Rankings come from the leaderboards (database fallback when Redis is down)
+    top_tracks = leaderboard_service.top(leaderboard_service.PLAYS, 10, select_related=['artist'])
+    top_downloads = leaderboard_service.top(leaderboard_service.DOWNLOADS, 10, select_related=['artist'])
+    top_artists = leaderboard_service.top(leaderboard_service.ARTIST_PLAYS, 10)
+    top_albums = leaderboard_service.top(leaderboard_service.ALBUM_PLAYS, 10, select_related=['artist'])
+
+    # Track counts for the 20 ranked artists/albums only
+    artist_track_counts = dict(
+        Track.objects.filter(artist__in=top_artists).values_list('artist').annotate(count=Count('id'))
+    )
+    album_track_counts = dict(
+        Track.objects.filter(album__in=top_albums).values_list('album').annotate(count=Count('id'))
+    )
     
     return Response({
         'topTracks': [
@@ -106,7 +99,7 @@ def content_analytics(request):
                 'id': track.id,
                 'title': track.title,
                 'artist': track.artist.name,
-                'plays': track.total_plays
+                'plays': track.score
             } for track in top_tracks
         ],
         'topDownloads': [
@@ -114,15 +107,15 @@ def content_analytics(request):
                 'id': track.id,
                 'title': track.title,
                 'artist': track.artist.name,
-                'downloads': track.total_downloads
+                'downloads': track.score
             } for track in top_downloads
         ],
         'topArtists': [
             {
                 'id': artist.id,
                 'name': artist.name,
-                'trackCount': artist.track_count,
-                'totalPlays': artist.total_plays
+                'trackCount': artist_track_counts.get(artist.id, 0),
+                'totalPlays': artist.score
             } for artist in top_artists
         ],
         'topAlbums': [
@@ -130,8 +123,8 @@ def content_analytics(request):
                 'id': album.id,
                 'title': album.title,
                 'artist': album.artist.name,
-                'trackCount': album.track_count,
-                'totalPlays': album.total_plays
+                'trackCount': album_track_counts.get(album.id, 0),
+                'totalPlays': album.score
             } for album in top_albums
         ]
     })
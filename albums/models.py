@@ -1,5 +1,6 @@
 from django.db import models
 from artists.models import Artist
+from core.object_cache import ObjectCacheManager
 
 class Album(models.Model):
     title = models.CharField(max_length=255, db_index=True)
@@ -7,6 +8,9 @@ class Album(models.Model):
     release_date = models.DateField(default=None, blank=True, null=True)
     cover = models.ImageField(upload_to="cover_img/album/", blank=True, null=True)
 
+    objects = models.Manager()
+    cached = ObjectCacheManager(select_related=('artist',))
+
     class Meta:
         ordering = ["-release_date"]
         unique_together = ("title", "artist")  # Một artist không có 2 album trùng tên
@@ -0,0 +1,19 @@
+from django.db.models import Count
+from core.projections import Projection, Column, DateColumn, FileColumn, Computed
+from .models import Album
+
+
+def _tracks_counts(ids):
+    return dict(Album.objects.filter(id__in=ids).annotate(count=Count('tracks')).values_list('id', 'count'))
+
+
+# Same output as AlbumSerializer
+ALBUM_PROJECTION = Projection(Album, {
+    'id': Column('id'),
+    'artist': Column('artist_id'),
+    'artist_name': Column('artist__name'),
+    'tracks_count': Computed(_tracks_counts, default=0),
+    'title': Column('title'),
+    'release_date': DateColumn('release_date'),
+    'cover': FileColumn('cover'),
+})
@@ -2,8 +2,10 @@ from rest_framework import serializers
 from .models import Album, Artist
 from genres.models import Genre
 from genres.serializers import GenreSerializer
+from core.fields import VersionedMediaSerializerMixin
+from core.serializers import DynamicFieldsMixin
 
-class AlbumSerializer(serializers.ModelSerializer):
+class AlbumSerializer(DynamicFieldsMixin, VersionedMediaSerializerMixin, serializers.ModelSerializer):
     artist = serializers.PrimaryKeyRelatedField(queryset=Artist.objects.all())
     artist_name = serializers.CharField(source='artist.name', read_only=True)
     genres = GenreSerializer(many=True, read_only=True)
@@ -19,6 +21,10 @@ class AlbumSerializer(serializers.ModelSerializer):
     class Meta:
         model = Album
         fields = '__all__'
+        expandable_fields = {
+            'artist': ('artists.serializers.ArtistSerializer', {}),
+        }
+        field_sources = {'tracks_count': []}
 
     def get_tracks_count(self, obj):
         return obj.tracks.count() 
\ No newline at end of file
@@ -4,8 +4,11 @@ from rest_framework.response import Response
 from django.db.models import Count
 from .models import Album
 from .serializers import AlbumSerializer
+from tracks.services.archive_service import zip_download_response
+from core.views import CachedObjectViewMixin, DynamicFieldsViewMixin
+from core.response_cache import cache_response
 
-class AlbumViewSet(viewsets.ModelViewSet):
+class AlbumViewSet(CachedObjectViewMixin, DynamicFieldsViewMixin, viewsets.ModelViewSet):
     queryset = Album.objects.all()
     serializer_class = AlbumSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
@@ -35,6 +38,7 @@ class AlbumViewSet(viewsets.ModelViewSet):
         return Response({"error": "artist_id parameter is required"}, status=status.HTTP_400_BAD_REQUEST)
     
     @action(detail=False, methods=['get'])
+    @cache_response()
     def latest(self, request):
         """Get latest albums"""
         albums = Album.objects.order_by('-release_date')[:10]
@@ -42,10 +46,22 @@ class AlbumViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
     
     @action(detail=False, methods=['get'])
+    @cache_response()
     def popular(self, request):
         """Get albums with most tracks"""
         albums = Album.objects.annotate(
             track_count=Count('tracks')
         ).order_by('-track_count')[:10]
         serializer = self.get_serializer(albums, many=True)
-        return Response(serializer.data) 
\ No newline at end of file
+        return Response(serializer.data)
+
+    @action(detail=True, methods=['get'])
+    def download(self, request, pk=None):
+        """Download every downloadable track of the album as one streamed ZIP"""
+        album = self.get_object()
+        tracks = album.tracks.select_related('artist').order_by('id')
+        response = zip_download_response(request, tracks, f"{album.artist.name} - {album.title}")
+        if response is None:
+            return Response({'error': 'No downloadable tracks in this album'},
+                         status=status.HTTP_404_NOT_FOUND)
+        return response
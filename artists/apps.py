@@ -0,0 +1,8 @@
+from django.apps import AppConfig
+
+class ArtistsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'artists'
+
+    def ready(self):
+        from . import signals  # noqa: F401
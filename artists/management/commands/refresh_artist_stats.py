@@ -0,0 +1,17 @@
+import logging
+from django.core.management.base import BaseCommand
+from artists.services import stats_service
+
+logger = logging.getLogger(__name__)
+
+class Command(BaseCommand):
+    help = 'Recompute the per-artist stats rows (track/album counts, plays, listeners) from scratch'
+
+    def add_arguments(self, parser):
+        parser.add_argument('artist_ids', nargs='*', type=int,
+                            help='Artists to refresh (default: all)')
+
+    def handle(self, *args, **options):
+        count = stats_service.refresh(options['artist_ids'] or None)
+        self.stdout.write(self.style.SUCCESS(f'Successfully refreshed stats for {count} artists'))
+        logger.info(f'Successfully refreshed stats for {count} artists')
@@ -0,0 +1,28 @@
+# Generated by Django 5.1.7 on 2026-10-19 09:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('artists', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArtistStats',
+            fields=[
+                ('artist', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='artists.artist')),
+                ('track_count', models.PositiveIntegerField(default=0)),
+                ('album_count', models.PositiveIntegerField(default=0)),
+                ('total_plays', models.PositiveBigIntegerField(default=0)),
+                ('listeners', models.PositiveIntegerField(default=0, help_text='Distinct signed-in users who played the artist')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Artist stats',
+            },
+        ),
+    ]
@@ -1,12 +1,34 @@
 from django.db import models
+from core.object_cache import ObjectCacheManager
 
 class Artist(models.Model):
     name = models.CharField(max_length=255, db_index=True)
     bio = models.TextField(blank=True, null=True, default='No bio available')
     avatar = models.ImageField(upload_to='artists/', blank=True, null=True)
 
+    objects = models.Manager()
+    cached = ObjectCacheManager()
+
     class Meta:
         ordering = ["name"]
 
     def __str__(self):
-        return self.name 
\ No newline at end of file
+        return self.name 
+
+class ArtistStats(models.Model):
+    """
+    Aggregates for the artist page, kept up to date incrementally by
+    artists.signals and recomputed by the refresh_artist_stats command.
+    """
+    artist = models.OneToOneField(Artist, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    track_count = models.PositiveIntegerField(default=0)
+    album_count = models.PositiveIntegerField(default=0)
+    total_plays = models.PositiveBigIntegerField(default=0)
+    listeners = models.PositiveIntegerField(default=0, help_text="Distinct signed-in users who played the artist")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = 'Artist stats'
+
+    def __str__(self):
+        return f"Stats for {self.artist_id}"
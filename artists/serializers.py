@@ -1,7 +1,9 @@
 from rest_framework import serializers
 from .models import Artist
+from core.fields import VersionedMediaSerializerMixin
+from core.serializers import DynamicFieldsMixin
 
-class ArtistSerializer(serializers.ModelSerializer):
+class ArtistSerializer(DynamicFieldsMixin, VersionedMediaSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Artist
         fields = '__all__' 
\ No newline at end of file
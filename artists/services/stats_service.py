@@ -0,0 +1,92 @@
+from django.db.models import Count, F, Sum, Value
+from django.db.models.functions import Greatest
+from albums.models import Album
+from tracks.models import Track
+from user_activity.models import PlayHistory
+from ..models import Artist, ArtistStats
+
+STAT_FIELDS = ('track_count', 'album_count', 'total_plays', 'listeners')
+
+
+def _compute(artist_ids):
+    stats = {artist_id: dict.fromkeys(STAT_FIELDS, 0) for artist_id in artist_ids}
+    for artist_id, tracks, plays in (
+        Track.objects.filter(artist_id__in=artist_ids).order_by()
+        .values('artist_id').annotate(tracks=Count('id'), plays=Sum('play_count'))
+        .values_list('artist_id', 'tracks', 'plays')
+    ):
+        stats[artist_id].update(track_count=tracks, total_plays=plays or 0)
+    for artist_id, albums in (
+        Album.objects.filter(artist_id__in=artist_ids).order_by()
+        .values('artist_id').annotate(albums=Count('id')).values_list('artist_id', 'albums')
+    ):
+        stats[artist_id]['album_count'] = albums
+    for artist_id, listeners in (
+        PlayHistory.objects.filter(track__artist_id__in=artist_ids).order_by()
+        .values('track__artist_id').annotate(listeners=Count('user_id', distinct=True))
+        .values_list('track__artist_id', 'listeners')
+    ):
+        stats[artist_id]['listeners'] = listeners
+    return stats
+
+
+def refresh(artist_ids=None, batch_size=1000):
+    """Recompute the stats rows of ``artist_ids`` (every artist by default) from scratch; returns the row count"""
+    if artist_ids is None:
+        artist_ids = Artist.objects.order_by('id').values_list('id', flat=True)
+    artist_ids = list(artist_ids)
+    for start in range(0, len(artist_ids), batch_size):
+        stats = _compute(artist_ids[start:start + batch_size])
+        ArtistStats.objects.bulk_create(
+            [ArtistStats(artist_id=artist_id, **values) for artist_id, values in stats.items()],
+            update_conflicts=True,
+            unique_fields=['artist'],
+            update_fields=[*STAT_FIELDS, 'updated_at'],
+        )
+    return len(artist_ids)
+
+
+def get_stats(artist_id):
+    """The artist's stats row, computed on first use"""
+    try:
+        return ArtistStats.objects.get(artist_id=artist_id)
+    except ArtistStats.DoesNotExist:
+        refresh([artist_id])
+        return ArtistStats.objects.get(artist_id=artist_id)
+
+
+def _add(artist_id, **deltas):
+    # Artists without a row yet get exact numbers when it is first computed
+    ArtistStats.objects.filter(artist_id=artist_id).update(
+        **{field: Greatest(F(field) + delta, Value(0)) for field, delta in deltas.items()}
+    )
+
+
+def track_added(track):
+    _add(track.artist_id, track_count=1, total_plays=track.play_count)
+
+
+def track_removed(track):
+    _add(track.artist_id, track_count=-1, total_plays=-track.play_count)
+
+
+def album_added(album):
+    _add(album.artist_id, album_count=1)
+
+
+def album_removed(album):
+    _add(album.artist_id, album_count=-1)
+
+
+def record_play(track):
+    _add(track.artist_id, total_plays=1)
+
+
+def record_listener(play):
+    """Count the user as a listener the first time they play any track of the artist"""
+    artist_id = play.track.artist_id
+    played_before = PlayHistory.objects.filter(
+        user_id=play.user_id, track__artist_id=artist_id
+    ).exclude(pk=play.pk).exists()
+    if not played_before:
+        _add(artist_id, listeners=1)
@@ -0,0 +1,29 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from albums.models import Album
+from tracks.models import Track
+from user_activity.models import PlayHistory
+from .services import stats_service
+
+@receiver(post_save, sender=Track)
+def count_added_track(sender, instance, created, **kwargs):
+    if created:
+        stats_service.track_added(instance)
+
+@receiver(post_delete, sender=Track)
+def count_removed_track(sender, instance, **kwargs):
+    stats_service.track_removed(instance)
+
+@receiver(post_save, sender=Album)
+def count_added_album(sender, instance, created, **kwargs):
+    if created:
+        stats_service.album_added(instance)
+
+@receiver(post_delete, sender=Album)
+def count_removed_album(sender, instance, **kwargs):
+    stats_service.album_removed(instance)
+
+@receiver(post_save, sender=PlayHistory)
+def count_listener(sender, instance, created, **kwargs):
+    if created:
+        stats_service.record_listener(instance)
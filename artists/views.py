@@ -1,8 +1,40 @@
 from rest_framework import viewsets, permissions
+from rest_framework.decorators import action
+from rest_framework.response import Response
 from .models import Artist
 from .serializers import ArtistSerializer
+from .services import stats_service
+from albums.models import Album
+from albums.projections import ALBUM_PROJECTION
+from tracks.models import Track
+from tracks.projections import TRACK_PROJECTION
+from core.views import CachedObjectViewMixin, DynamicFieldsViewMixin
+from core.response_cache import cache_response
 
-class ArtistViewSet(viewsets.ModelViewSet):
+OVERVIEW_TOP_TRACKS = 10
+
+class ArtistViewSet(CachedObjectViewMixin, DynamicFieldsViewMixin, viewsets.ModelViewSet):
     queryset = Artist.objects.all()
     serializer_class = ArtistSerializer
-    permission_classes = [permissions.AllowAny] 
\ No newline at end of file
+    permission_classes = [permissions.AllowAny]
+    cached_object_actions = ('retrieve', 'overview')
+
+    @cache_response()
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @action(detail=True, methods=['get'])
+    @cache_response()
+    def overview(self, request, pk=None):
+        """Everything the artist page shows in one request: profile, stats, top tracks and albums"""
+        artist = self.get_object()
+        stats = stats_service.get_stats(artist.id)
+        return Response({
+            'artist': ArtistSerializer(artist, context={'request': request}).data,
+            'stats': {field: getattr(stats, field) for field in stats_service.STAT_FIELDS},
+            'top_tracks': TRACK_PROJECTION.render(
+                Track.objects.filter(artist=artist).order_by('-play_count', '-created_at')[:OVERVIEW_TOP_TRACKS],
+                request,
+            ),
+            'albums': ALBUM_PROJECTION.render(Album.objects.filter(artist=artist), request),
+        })
@@ -0,0 +1,130 @@
+import logging
+import math
+import random
+import time
+import uuid
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+# How often a worker waiting on another worker's computation checks the cache
+WAIT_INTERVAL = 0.05
+
+
+def _lock_key(key):
+    return f'{key}:lock'
+
+
+def _generation_key(key):
+    return f'{key}:generation'
+
+
+def _new_generation(key):
+    # Seeded from the clock, so a generation lost from the cache never comes back to an older value
+    cache.add(_generation_key(key), int(time.time() * 1000), None)
+    return cache.get(_generation_key(key))
+
+
+def _read(key):
+    """(entry or None, current generation) in one cache round trip"""
+    found = cache.get_many([key, _generation_key(key)])
+    generation = found.get(_generation_key(key))
+    if generation is None:
+        return None, _new_generation(key)
+    entry = found.get(key)
+    # Entries computed before the last invalidate() are ignored
+    if entry is not None and entry[0] != generation:
+        entry = None
+    return entry, generation
+
+
+def _compute_and_store(key, compute, timeout, stale_timeout, generation):
+    started = time.monotonic()
+    value = compute()
+    delta = time.monotonic() - started
+    # Stored past its soft expiry so it can still be served while someone recomputes it.
+    # Tagged with the generation read before computing: an invalidate() meanwhile discards it
+    cache.set(key, (generation, value, delta, time.time() + timeout), timeout + stale_timeout)
+    return value
+
+
+def _acquire(key, lock_timeout):
+    """Token of the lock on ``key``, or None if another caller holds it"""
+    token = uuid.uuid4().hex
+    return token if cache.add(_lock_key(key), token, lock_timeout) else None
+
+
+def _release(key, token):
+    # Past lock_timeout the lock may belong to someone else by now
+    if cache.get(_lock_key(key)) == token:
+        cache.delete(_lock_key(key))
+
+
+def _should_refresh(delta, expires_at, beta):
+    """XFetch: recompute before expiry with a probability growing as expiry nears and with compute cost"""
+    return time.time() - delta * beta * math.log(1 - random.random()) >= expires_at
+
+
+def get_or_compute(key, compute, timeout, stale_timeout=None, beta=1.0):
+    """
+    ``cache.get``/``cache.set`` for expensive values, safe under concurrency.
+
+    - single flight: one caller (across workers, through ``cache.add``)
+      recomputes a missing or expiring value; the others wait for it on a
+      miss, or keep serving the previous value meanwhile
+    - early refresh: values are recomputed slightly before ``timeout`` with
+      a probability that grows with the time the computation takes (XFetch),
+      so a popular key never expires for everyone at once
+    - stale-while-revalidate: an expired value is still served for
+      ``stale_timeout`` more seconds (default: ``timeout``) while it is
+      being recomputed
+    """
+    stale_timeout = timeout if stale_timeout is None else stale_timeout
+    lock_timeout = settings.CACHE_LOCK_TIMEOUT
+
+    entry, generation = _read(key)
+    if entry is not None:
+        _, value, delta, expires_at = entry
+        if not _should_refresh(delta, expires_at, beta):
+            return value
+        token = _acquire(key, lock_timeout)
+        if token is not None:
+            try:
+                return _compute_and_store(key, compute, timeout, stale_timeout, generation)
+            finally:
+                _release(key, token)
+        # Someone else is refreshing it
+        return value
+
+    token = _acquire(key, lock_timeout)
+    if token is not None:
+        try:
+            return _compute_and_store(key, compute, timeout, stale_timeout, generation)
+        finally:
+            _release(key, token)
+
+    # Wait for the worker holding the lock rather than running the same query
+    deadline = time.monotonic() + lock_timeout
+    while time.monotonic() < deadline:
+        time.sleep(WAIT_INTERVAL)
+        entry, generation = _read(key)
+        if entry is not None:
+            return entry[1]
+        if cache.get(_lock_key(key)) is None:
+            break
+    logger.info(f"Computing {key} without the lock")
+    return _compute_and_store(key, compute, timeout, stale_timeout, generation)
+
+
+def invalidate(*keys):
+    """
+    Drop values outright: the next read recomputes instead of serving stale
+    data, and computations already running cannot store their older result.
+    """
+    for key in keys:
+        try:
+            cache.incr(_generation_key(key))
+        except ValueError:
+            _new_generation(key)
+    cache.delete_many(keys)
@@ -0,0 +1,108 @@
+import threading
+import time
+from types import MappingProxyType
+from django.conf import settings
+from django.core.cache import cache
+
+VERSION_KEY = 'catalog_snapshot:version'
+
+_lock = threading.Lock()
+_snapshot = None
+_checked_at = 0.0
+
+
+class CatalogSnapshot:
+    """
+    Immutable copy of the small dimension tables: genre names, artist names
+    and the artist of every album. Lookups return None for ids or names
+    missing from it, and callers fall back to the database.
+    """
+
+    def __init__(self, version, genres, artists, album_artists):
+        self.version = version
+        self.built_at = time.monotonic()
+        self.genres = MappingProxyType(genres)
+        self.artists = MappingProxyType(artists)
+        self.album_artists = MappingProxyType(album_artists)
+        self._genre_ids = MappingProxyType({name.lower(): pk for pk, name in genres.items()})
+        artist_ids = {}
+        for pk, name in sorted(artists.items()):
+            artist_ids.setdefault(name.lower(), pk)
+        self._artist_ids = MappingProxyType(artist_ids)
+
+    @classmethod
+    def build(cls, version):
+        from albums.models import Album
+        from artists.models import Artist
+        from genres.models import Genre
+
+        return cls(
+            version,
+            dict(Genre.objects.values_list('id', 'name')),
+            dict(Artist.objects.values_list('id', 'name')),
+            dict(Album.objects.values_list('id', 'artist_id')),
+        )
+
+    def genre_id(self, name):
+        """Id of the genre with this name, case-insensitively"""
+        return self._genre_ids.get(name.lower())
+
+    def genre_ids_containing(self, text):
+        """Ids of the genres whose name contains ``text`` (like ``name__icontains``)"""
+        text = text.lower()
+        return [pk for name, pk in self._genre_ids.items() if text in name]
+
+    def artist_id(self, name):
+        """Id of the artist with this name, case-insensitively (the oldest one on duplicates)"""
+        return self._artist_ids.get(name.lower())
+
+    def artist_ids_containing(self, text):
+        """Ids of the artists whose name contains ``text`` (like ``name__icontains``)"""
+        text = text.lower()
+        return [pk for pk, name in self.artists.items() if text in name.lower()]
+
+    def album_artist_id(self, album_id):
+        return self.album_artists.get(album_id)
+
+
+def _shared_version():
+    # Seeded from the clock, so a version lost from the cache never comes back to an older value
+    cache.add(VERSION_KEY, int(time.time() * 1000), None)
+    return cache.get(VERSION_KEY)
+
+
+def get_snapshot():
+    """
+    The current snapshot. The shared version is checked at most every
+    CATALOG_SNAPSHOT_CHECK_INTERVAL seconds; when another worker bumped it the
+    snapshot is rebuilt (three queries) and swapped in whole. Snapshots older
+    than CATALOG_SNAPSHOT_MAX_AGE are rebuilt anyway: with a process-local
+    cache the other workers' bumps never show up here.
+    """
+    global _snapshot, _checked_at
+    now = time.monotonic()
+    snapshot = _snapshot
+    if snapshot is not None and now - _checked_at < settings.CATALOG_SNAPSHOT_CHECK_INTERVAL:
+        return snapshot
+
+    with _lock:
+        version = _shared_version()
+        if (
+            _snapshot is None
+            or _snapshot.version != version
+            or now - _snapshot.built_at >= settings.CATALOG_SNAPSHOT_MAX_AGE
+        ):
+            _snapshot = CatalogSnapshot.build(version)
+        _checked_at = now
+        return _snapshot
+
+
+def invalidate():
+    """Rebuild on next use here, and on every other worker at their next version check"""
+    global _snapshot
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        _shared_version()
+    with _lock:
+        _snapshot = None
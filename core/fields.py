@@ -0,0 +1,30 @@
+from django.db import models
+from rest_framework import serializers
+from rest_framework.settings import api_settings
+from .media import versioned_url
+
+
+class VersionedFileField(serializers.FileField):
+    """FileField whose URL carries a version, so clients can cache it forever"""
+
+    def to_representation(self, value):
+        url = super().to_representation(value)
+        if url and getattr(self, 'use_url', api_settings.UPLOADED_FILES_USE_URL):
+            return versioned_url(url, value)
+        return url
+
+
+class VersionedImageField(VersionedFileField, serializers.ImageField):
+    pass
+
+
+class VersionedMediaSerializerMixin:
+    """
+    Mixin for ModelSerializers: every FileField/ImageField on the model is
+    rendered as a versioned URL.
+    """
+    serializer_field_mapping = {
+        **serializers.ModelSerializer.serializer_field_mapping,
+        models.FileField: VersionedFileField,
+        models.ImageField: VersionedImageField,
+    }
@@ -0,0 +1,56 @@
+import time
+from io import BytesIO
+from django.core.management.base import BaseCommand
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+from albums.views import AlbumViewSet
+from artists.views import ArtistViewSet
+from genres.views import GenreViewSet
+from tracks.views import TrackViewSet
+from core.parsers import ORJSONParser
+from core.renderers import ORJSONRenderer
+
+# Catalog endpoints whose unpaginated responses are the largest payloads the API renders
+ENDPOINTS = [
+    ('/api/tracks/', TrackViewSet.as_view({'get': 'list'})),
+    ('/api/tracks/top_tracks/', TrackViewSet.as_view({'get': 'top_tracks'})),
+    ('/api/albums/', AlbumViewSet.as_view({'get': 'list'})),
+    ('/api/artists/', ArtistViewSet.as_view({'get': 'list'})),
+    ('/api/genres/', GenreViewSet.as_view({'get': 'list'})),
+]
+
+
+class Command(BaseCommand):
+    help = 'Compare the stdlib and orjson renderer/parser on real endpoint payloads'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=20, help='Renders/parses per payload')
+
+    def handle(self, *args, **options):
+        factory = APIRequestFactory()
+        repeat = options['repeat']
+        for path, view in ENDPOINTS:
+            data = view(factory.get(path)).data
+            body = JSONRenderer().render(data)
+
+            render_std = self._time(lambda: JSONRenderer().render(data), repeat)
+            render_fast = self._time(lambda: ORJSONRenderer().render(data), repeat)
+            parse_std = self._time(lambda: JSONParser().parse(BytesIO(body)), repeat)
+            parse_fast = self._time(lambda: ORJSONParser().parse(BytesIO(body)), repeat)
+            self.stdout.write(
+                f'{path} ({len(body) / 1024:,.0f} KB): '
+                f'render {render_std * 1000:.2f} -> {render_fast * 1000:.2f} ms '
+                f'({render_std / render_fast:.1f}x), '
+                f'parse {parse_std * 1000:.2f} -> {parse_fast * 1000:.2f} ms '
+                f'({parse_std / parse_fast:.1f}x)'
+            )
+
+        self.stdout.write(self.style.SUCCESS('Benchmark finished'))
+
+    def _time(self, run, repeat):
+        """Mean seconds per call"""
+        started = time.perf_counter()
+        for _ in range(repeat):
+            run()
+        return (time.perf_counter() - started) / repeat
@@ -0,0 +1,48 @@
+import hashlib
+import os
+from django.core.files.storage import FileSystemStorage
+
+# Paths under these prefixes already contain the content hash, so their URL never changes meaning
+CONTENT_ADDRESSED_PREFIXES = ('blobs/',)
+
+# Sent with versioned media: the URL changes whenever the file does
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+
+def is_content_addressed(name):
+    return name.lstrip('/').startswith(CONTENT_ADDRESSED_PREFIXES)
+
+
+def file_version(path):
+    """Version token of a file on local disk (mtime and size), or None if it is missing"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return f'{int(stat.st_mtime):x}{stat.st_size:x}'
+
+
+def media_version(field_file):
+    """
+    Short token that changes whenever the stored file changes, or None if
+    the URL is already content-addressed or the file cannot be found.
+    """
+    name = field_file.name
+    if not name or is_content_addressed(name):
+        return None
+
+    storage = field_file.storage
+    if isinstance(storage, FileSystemStorage):
+        return file_version(storage.path(name))
+
+    # Remote storage never overwrites (AWS_S3_FILE_OVERWRITE = False): a name maps to one content
+    return hashlib.md5(name.encode('utf-8')).hexdigest()[:12]
+
+
+def versioned_url(url, field_file):
+    """Append ``?v=<version>`` to a media URL"""
+    if '?' in url:
+        # Signed URLs must not be modified
+        return url
+    version = media_version(field_file)
+    return f'{url}?v={version}' if version else url
@@ -0,0 +1,89 @@
+import time
+from django.conf import settings
+from django.core.cache import cache
+from django.db import models
+
+
+class ObjectCacheManager(models.Manager):
+    """
+    Read-through cache of single objects, declared next to the default manager:
+
+        objects = models.Manager()
+        cached = ObjectCacheManager(select_related=('artist',))
+
+        Track.cached.get_by_pk(pk)    # raises Track.DoesNotExist
+        Track.cached.get_many(ids)    # {pk: track}, missing ids left out
+
+    Every object has a version key, bumped by ``invalidate`` (wired to
+    post_save/post_delete in core.signals). Entries remember the version they
+    were loaded under and are fetched together with the version keys in one
+    ``cache.get_many``, so a lookup is a single cache round trip and a reload
+    racing a write can never leave an outdated copy behind.
+    """
+
+    def __init__(self, select_related=(), prefetch_related=(), timeout=None):
+        super().__init__()
+        self.select_related_fields = tuple(select_related)
+        self.prefetch_related_fields = tuple(prefetch_related)
+        self.timeout = timeout
+
+    def _key(self, pk):
+        return f'object_cache:{self.model._meta.label_lower}:{pk}'
+
+    def _version_key(self, pk):
+        return f'{self._key(pk)}:version'
+
+    def _new_version(self, pk):
+        # Seeded from the clock, so a version lost from the cache never comes back to an older value
+        cache.add(self._version_key(pk), int(time.time() * 1000), None)
+        return cache.get(self._version_key(pk))
+
+    def _load(self, pks):
+        queryset = self.get_queryset()
+        if self.select_related_fields:
+            queryset = queryset.select_related(*self.select_related_fields)
+        if self.prefetch_related_fields:
+            queryset = queryset.prefetch_related(*self.prefetch_related_fields)
+        return queryset.in_bulk(pks)
+
+    def get_many(self, pks):
+        pks = list(dict.fromkeys(self.model._meta.pk.to_python(pk) for pk in pks))
+        if not pks:
+            return {}
+
+        found = cache.get_many([key for pk in pks for key in (self._key(pk), self._version_key(pk))])
+        result, missing = {}, {}
+        for pk in pks:
+            entry = found.get(self._key(pk))
+            version = found.get(self._version_key(pk))
+            if entry is not None and version is not None and entry[0] == version:
+                result[pk] = entry[1]
+            else:
+                missing[pk] = version if version is not None else self._new_version(pk)
+
+        if missing:
+            # Versions are read before the rows: a write landing in between bumps past them
+            loaded = self._load(list(missing))
+            cache.set_many(
+                {self._key(pk): (missing[pk], obj) for pk, obj in loaded.items()},
+                self.timeout if self.timeout is not None else settings.OBJECT_CACHE_TIMEOUT,
+            )
+            result.update(loaded)
+        return {pk: result[pk] for pk in pks if pk in result}
+
+    def get_by_pk(self, pk):
+        obj = self.get_many([pk]).get(self.model._meta.pk.to_python(pk))
+        if obj is None:
+            raise self.model.DoesNotExist(f'{self.model._meta.object_name} {pk} does not exist.')
+        return obj
+
+    def invalidate(self, *pks):
+        for pk in pks:
+            try:
+                cache.incr(self._version_key(pk))
+            except ValueError:
+                self._new_version(pk)
+
+    def related_paths(self):
+        """Relations whose objects are embedded in the cached copies"""
+        return self.select_related_fields + self.prefetch_related_fields
@@ -0,0 +1,8 @@
+from rest_framework.pagination import PageNumberPagination
+
+
+class SizedPageNumberPagination(PageNumberPagination):
+    """?page=N&size=M, capped so one request cannot pull a whole collection"""
+    page_size = 50
+    page_size_query_param = 'size'
+    max_page_size = 500
@@ -0,0 +1,151 @@
+import gzip
+import hashlib
+import json
+import time
+from functools import cached_property, wraps
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
+from rest_framework.response import Response
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+VERSION_KEY = 'response_cache:catalog_version'
+PLAYLISTS_VERSION_KEY = 'response_cache:playlists_version'
+
+
+def _version(key):
+    # Seeded from the clock, so a version lost from the cache never comes back to an older value
+    cache.add(key, int(time.time() * 1000), None)
+    return cache.get(key)
+
+
+def _bump(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        _version(key)
+
+
+def catalog_version():
+    return _version(VERSION_KEY)
+
+
+def bump_catalog_version():
+    """Make every cached catalog response stale"""
+    _bump(VERSION_KEY)
+
+
+def playlists_version():
+    return _version(PLAYLISTS_VERSION_KEY)
+
+
+def bump_playlists_version():
+    """Make cached responses listing public playlists stale"""
+    _bump(PLAYLISTS_VERSION_KEY)
+
+
+def _cache_key(request, authenticator, playlists):
+    params = '&'.join(f'{key}={value}' for key, value in sorted(request.query_params.lists()))
+    # Host is part of the key: media URLs in the body are absolute
+    raw = f'{request.get_host()}{request.path}?{params}|{request.accepted_renderer.format}|{authenticator}'
+    version = f'{catalog_version()}:{playlists_version()}' if playlists else catalog_version()
+    return f'response_cache:{version}:{hashlib.md5(raw.encode()).hexdigest()}'
+
+
+class CachedResponse(HttpResponse):
+    """Response served from the cache; ``data`` is decoded only if someone asks for it"""
+
+    def __init__(self, entry, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._entry = entry
+
+    @cached_property
+    def data(self):
+        return json.loads(self._entry['identity'])
+
+
+def _build_entry(response):
+    body = response.content
+    return {
+        'content_type': response['Content-Type'],
+        'etag': hashlib.md5(body).hexdigest(),
+        'identity': body,
+        'gzip': gzip.compress(body, compresslevel=6, mtime=0),
+        'br': brotli.compress(body) if brotli is not None else None,
+    }
+
+
+def _accepted_encodings(header):
+    accepted = set()
+    for part in header.split(','):
+        name, _, params = part.strip().partition(';')
+        if params.strip().replace(' ', '') in ('q=0', 'q=0.0'):
+            continue
+        accepted.add(name.strip().lower())
+    return accepted
+
+
+def _serve(request, entry):
+    accepted = _accepted_encodings(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+    encoding = 'identity'
+    if entry['br'] is not None and 'br' in accepted:
+        encoding = 'br'
+    elif 'gzip' in accepted:
+        encoding = 'gzip'
+
+    # Each encoding is a different representation, so it gets its own ETag
+    etag = f'"{entry["etag"]}"' if encoding == 'identity' else f'"{entry["etag"]}-{encoding}"'
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match and (if_none_match.strip() == '*' or etag in parse_etags(if_none_match)):
+        response = CachedResponse(entry, status=304)
+    else:
+        response = CachedResponse(entry, entry[encoding], content_type=entry['content_type'])
+        if encoding != 'identity':
+            response['Content-Encoding'] = encoding
+    response['ETag'] = etag
+    patch_vary_headers(response, ['Accept-Encoding'])
+    return response
+
+
+def cache_response(timeout=None, anonymous_only=True, playlists=False):
+    """
+    Cache the rendered JSON of a viewset action, with gzip/brotli copies and
+    ETags. Hits are served without touching the ORM or the serializer.
+
+    The key covers host, path, query string, renderer and authentication class.
+    With ``anonymous_only`` signed-in callers bypass the cache; pass False
+    only when the body is the same for everyone. Catalog writes invalidate
+    every entry through ``bump_catalog_version``; entries cached with
+    ``playlists`` also go on ``bump_playlists_version`` (public playlist writes).
+    """
+    def decorator(view_method):
+        @wraps(view_method)
+        def wrapped(self, request, *args, **kwargs):
+            authenticated = bool(request.user and request.user.is_authenticated)
+            if (
+                request.method not in ('GET', 'HEAD')
+                or (anonymous_only and authenticated)
+                or request.accepted_renderer.format != 'json'
+            ):
+                return view_method(self, request, *args, **kwargs)
+
+            authenticator = type(request.successful_authenticator).__name__ if authenticated else 'anonymous'
+            key = _cache_key(request, authenticator, playlists)
+            entry = cache.get(key)
+            if entry is None:
+                response = view_method(self, request, *args, **kwargs)
+                if not isinstance(response, Response) or response.status_code != 200:
+                    return response
+                response = self.finalize_response(request, response, *args, **kwargs)
+                response.render()
+                entry = _build_entry(response)
+                cache.set(key, entry, timeout if timeout is not None else settings.RESPONSE_CACHE_TIMEOUT)
+            return _serve(request, entry)
+        return wrapped
+    return decorator
@@ -0,0 +1,171 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from django.utils.module_loading import import_string
+from rest_framework import serializers
+
+
+def parse_field_paths(value):
+    """'id,album.title,album.artist' (or a list of paths) -> {'id': [], 'album': ['title', 'artist']}"""
+    if isinstance(value, str):
+        value = value.split(',')
+    selection = {}
+    for path in value:
+        name, _, rest = path.strip().partition('.')
+        if not name:
+            continue
+        nested = selection.setdefault(name, [])
+        if rest:
+            nested.append(rest)
+    return selection
+
+
+class DynamicFieldsMixin:
+    """
+    Mixin for ModelSerializers driven by the request (or by the ``fields`` /
+    ``expand`` kwargs for nested use):
+
+    - ``?fields=id,title,album.title`` renders only the listed fields
+    - ``?expand=album`` renders a relation from ``Meta.expandable_fields``
+      (name -> (serializer class or dotted path, kwargs)) as a nested object
+      instead of its id
+
+    Dotted paths are handed down to nested serializers. Serializers receiving
+    input are left untouched, so writes always see every field.
+    ``Meta.field_sources`` maps method fields to the model paths they read
+    (``[]`` for none beyond the pk), which lets ``optimize_queryset`` prune them.
+    ``Meta.related_queryset`` (queryset -> queryset) makes ``optimize_queryset``
+    prefetch the relation through it instead of joining, for annotated objects.
+    """
+    fields_param = 'fields'
+    expand_param = 'expand'
+
+    def __init__(self, *args, **kwargs):
+        self._requested_fields = kwargs.pop('fields', None)
+        self._requested_expand = kwargs.pop('expand', None)
+        super().__init__(*args, **kwargs)
+
+    def _is_root(self):
+        parent = self.parent
+        return parent is None or (isinstance(parent, serializers.ListSerializer) and parent.parent is None)
+
+    def _selection(self):
+        fields, expand = self._requested_fields, self._requested_expand
+        request = self.context.get('request')
+        if fields is None and expand is None and request is not None and self._is_root():
+            params = getattr(request, 'query_params', request.GET)
+            fields, expand = params.get(self.fields_param), params.get(self.expand_param)
+        return (
+            parse_field_paths(fields) if fields is not None else None,
+            parse_field_paths(expand) if expand else {},
+        )
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if hasattr(self.root, 'initial_data'):
+            return fields
+
+        selected, expand = self._selection()
+        expandable = getattr(self.Meta, 'expandable_fields', {})
+        for name in expand:
+            if name not in expandable or (selected is not None and name not in selected):
+                continue
+            serializer_class, options = expandable[name]
+            if isinstance(serializer_class, str):
+                serializer_class = import_string(serializer_class)
+            fields[name] = serializer_class(read_only=True, **options)
+
+        if selected is not None:
+            for name in list(fields):
+                if name not in selected:
+                    del fields[name]
+
+        # Hand the dotted remainder down to nested serializers
+        for name, field in fields.items():
+            child = getattr(field, 'child', field)
+            if isinstance(child, DynamicFieldsMixin):
+                if selected and selected.get(name):
+                    child._requested_fields = selected[name]
+                if expand.get(name):
+                    child._requested_expand = expand[name]
+        return fields
+
+
+def _collect(serializer, model, prefix, select, prefetch):
+    """
+    Walk the fields ``serializer`` renders. Adds the relations to join or
+    prefetch to ``select``/``prefetch`` and returns the columns to load, or
+    None when some field cannot be traced to model fields (load them all).
+    """
+    meta = getattr(serializer, 'Meta', None)
+    sources = getattr(meta, 'field_sources', {})
+    only = {prefix + model._meta.pk.name}
+    complete = True
+
+    for name, field in serializer.fields.items():
+        if field.write_only:
+            continue
+        if name in sources:
+            paths = [path.split('__') for path in sources[name]]
+        elif isinstance(field, serializers.SerializerMethodField) or field.source == '*':
+            complete = False
+            continue
+        else:
+            paths = [field.source_attrs]
+
+        nested = field if name not in sources else None
+        for attrs in paths:
+            if not _collect_path(nested, model, attrs, prefix, only, select, prefetch):
+                complete = False
+    return only if complete else None
+
+
+def _collect_path(field, model, attrs, prefix, only, select, prefetch):
+    try:
+        model_field = model._meta.get_field(attrs[0])
+    except FieldDoesNotExist:
+        return False
+    path = prefix + attrs[0]
+
+    if not model_field.is_relation:
+        only.add(path)
+        return True
+    if model_field.many_to_many or model_field.one_to_many:
+        prefetch.add(path)
+        return True
+    if model_field.concrete:
+        only.add(path)
+
+    related_model = model_field.related_model
+    if len(attrs) > 1:
+        select.add(path)
+        return _collect_path(field, related_model, attrs[1:], path + '__', only, select, prefetch)
+    related_queryset = getattr(getattr(field, 'Meta', None), 'related_queryset', None)
+    if related_queryset is not None:
+        # A join would lose the annotations the nested serializer reads
+        prefetch.add(Prefetch(path, queryset=related_queryset(related_model.objects.all())))
+        return model_field.concrete
+    if isinstance(field, serializers.BaseSerializer):
+        select.add(path)
+        nested_only = _collect(field, related_model, path + '__', select, prefetch)
+        # Unlisted related columns are loaded in full
+        if nested_only is not None:
+            only.update(nested_only)
+        return True
+    # Rendered as a primary key: the FK column is enough
+    return model_field.concrete
+
+
+def optimize_queryset(queryset, serializer):
+    """
+    Join/prefetch the relations ``serializer`` renders, and load only the
+    columns it needs when every rendered field maps to the model.
+    """
+    select, prefetch = set(), set()
+    only = _collect(serializer, queryset.model, '', select, prefetch)
+    if select:
+        queryset = queryset.select_related(*sorted(select))
+    if prefetch:
+        queryset = queryset.prefetch_related(*sorted(prefetch, key=lambda lookup: getattr(lookup, 'prefetch_to', lookup)))
+    if only is not None:
+        queryset = queryset.only(*only)
+    return queryset
@@ -0,0 +1,104 @@
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete, m2m_changed
+from albums.models import Album
+from artists.models import Artist
+from genres.models import Genre
+from playlists.models import Playlist
+from tracks.models import Track
+from . import catalog_snapshot
+from .response_cache import bump_catalog_version, bump_playlists_version
+
+CATALOG_MODELS = (Track, Album, Artist, Genre)
+
+# Tables copied into every worker by core.catalog_snapshot
+SNAPSHOT_MODELS = (Genre, Artist, Album)
+
+# Models with an ObjectCacheManager as ``cached``
+OBJECT_CACHED_MODELS = (Track, Album, Artist, Genre)
+
+# Saves touching only these fields are counters; cached lists may lag on them until they expire
+COUNTER_FIELDS = {'play_count', 'download_count', 'followers'}
+
+
+def invalidate_catalog_responses(sender, update_fields=None, **kwargs):
+    if update_fields and set(update_fields) <= COUNTER_FIELDS:
+        return
+    bump_catalog_version()
+
+
+def invalidate_on_genres_change(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        bump_catalog_version()
+
+
+def remember_playlist_visibility(sender, instance, **kwargs):
+    # A playlist turning private has to leave the public lists too, so look up what is stored
+    instance._was_public = (
+        not instance.is_public
+        and instance.pk is not None
+        and sender.objects.filter(pk=instance.pk, is_public=True).exists()
+    )
+
+
+def invalidate_playlist_responses(sender, instance, update_fields=None, **kwargs):
+    # Private playlists appear in no shared response
+    if update_fields and set(update_fields) <= COUNTER_FIELDS:
+        return
+    if instance.is_public or getattr(instance, '_was_public', False):
+        bump_playlists_version()
+
+
+def _invalidate_objects(model, pks):
+    model.cached.invalidate(*pks)
+    # Once more after commit: a reader may have cached the old row before the write became visible
+    transaction.on_commit(lambda: model.cached.invalidate(*pks))
+
+
+def invalidate_cached_object(sender, instance, update_fields=None, **kwargs):
+    if update_fields and set(update_fields) <= COUNTER_FIELDS:
+        return
+    _invalidate_objects(sender, [instance.pk])
+
+    # Cached copies embedding this object through select_related/prefetch_related
+    for model in OBJECT_CACHED_MODELS:
+        for path in model.cached.related_paths():
+            if model._meta.get_field(path).related_model is sender:
+                pks = list(model.objects.filter(**{path: instance.pk}).values_list('pk', flat=True))
+                if pks:
+                    _invalidate_objects(model, pks)
+
+
+def invalidate_cached_tracks_on_genres_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            _invalidate_objects(Track, [instance.pk])
+    elif action in ('post_add', 'post_remove') and pk_set:
+        _invalidate_objects(Track, list(pk_set))
+    elif action == 'pre_clear':
+        _invalidate_objects(Track, list(instance.tracks.values_list('pk', flat=True)))
+
+
+def invalidate_catalog_snapshot(sender, update_fields=None, **kwargs):
+    if update_fields and set(update_fields) <= COUNTER_FIELDS:
+        return
+    catalog_snapshot.invalidate()
+    # Once more after commit: another worker may have rebuilt from the old rows meanwhile
+    transaction.on_commit(catalog_snapshot.invalidate)
+
+
+for model in CATALOG_MODELS:
+    post_save.connect(invalidate_catalog_responses, sender=model, dispatch_uid=f'response_cache_save_{model.__name__}')
+    post_delete.connect(invalidate_catalog_responses, sender=model, dispatch_uid=f'response_cache_delete_{model.__name__}')
+pre_save.connect(remember_playlist_visibility, sender=Playlist, dispatch_uid='response_cache_playlist_visibility')
+post_save.connect(invalidate_playlist_responses, sender=Playlist, dispatch_uid='response_cache_save_Playlist')
+post_delete.connect(invalidate_playlist_responses, sender=Playlist, dispatch_uid='response_cache_delete_Playlist')
+m2m_changed.connect(invalidate_on_genres_change, sender=Track.genres.through, dispatch_uid='response_cache_track_genres')
+
+for model in OBJECT_CACHED_MODELS:
+    post_save.connect(invalidate_cached_object, sender=model, dispatch_uid=f'object_cache_save_{model.__name__}')
+    post_delete.connect(invalidate_cached_object, sender=model, dispatch_uid=f'object_cache_delete_{model.__name__}')
+m2m_changed.connect(invalidate_cached_tracks_on_genres_change, sender=Track.genres.through, dispatch_uid='object_cache_track_genres')
+
+for model in SNAPSHOT_MODELS:
+    post_save.connect(invalidate_catalog_snapshot, sender=model, dispatch_uid=f'catalog_snapshot_save_{model.__name__}')
+    post_delete.connect(invalidate_catalog_snapshot, sender=model, dispatch_uid=f'catalog_snapshot_delete_{model.__name__}')
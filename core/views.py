@@ -0,0 +1,140 @@
+import copy
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from urllib.parse import urlsplit
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import connections
+from django.db.models import QuerySet
+from django.http import Http404, QueryDict
+from django.urls import Resolver404, resolve
+from rest_framework import permissions, status
+from rest_framework.fields import BooleanField
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from .serializers import optimize_queryset
+
+logger = logging.getLogger(__name__)
+
+
+class DynamicFieldsViewMixin:
+    """
+    For viewsets whose serializer uses DynamicFieldsMixin: fetch only the
+    columns and relations the response will render (after ?fields=/?expand=).
+    """
+    dynamic_fields_actions = ('list', 'retrieve')
+
+    # filter_queryset rather than get_queryset: viewsets override the latter without calling super()
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.action in self.dynamic_fields_actions and isinstance(queryset, QuerySet):
+            queryset = optimize_queryset(queryset, self.get_serializer())
+        return queryset
+
+
+class CachedObjectViewMixin:
+    """
+    For viewsets over a model with an ObjectCacheManager (``Model.cached``):
+    ``get_object()`` reads through the object cache for ``cached_object_actions``.
+    Query-string filters of ``get_queryset()`` do not apply to those lookups.
+    """
+    cached_object_actions = ('retrieve',)
+
+    def get_object(self):
+        if self.action not in self.cached_object_actions:
+            return super().get_object()
+
+        model = self.get_queryset().model
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            obj = model.cached.get_by_pk(self.kwargs[lookup_url_kwarg])
+        except (model.DoesNotExist, ValidationError):
+            raise Http404(f'No {model._meta.object_name} matches the given query.')
+
+        self.check_object_permissions(self.request, obj)
+        return obj
+
+
+# Conditional headers of the batch itself must not turn sub-responses into 304s
+_SUB_REQUEST_DROPPED_META = ('CONTENT_LENGTH', 'CONTENT_TYPE', 'HTTP_IF_NONE_MATCH', 'HTTP_IF_MODIFIED_SINCE')
+
+
+class BatchView(APIView):
+    """
+    Several GET calls in one request: POST /api/batch/ with
+    ``{"requests": ["/api/tracks/recent/", {"path": "/api/home/"}], "parallel": true}``.
+
+    The caller is authenticated once; each path is then dispatched straight to
+    its view in-process (no middleware), as that user, and answered in order
+    as ``{"path", "status", "body"}``. With ``parallel`` the calls run on a
+    thread pool of BATCH_MAX_WORKERS, so the batch takes about as long as its
+    slowest call.
+    """
+    permission_classes = [permissions.AllowAny]
+
+    def post(self, request):
+        paths = request.data.get('requests') if isinstance(request.data, dict) else None
+        if not isinstance(paths, list) or not paths:
+            return Response({'error': 'requests must be a non-empty list of paths'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(paths) > settings.BATCH_MAX_REQUESTS:
+            return Response({'error': f'At most {settings.BATCH_MAX_REQUESTS} requests per batch'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        paths = [item.get('path') if isinstance(item, dict) else item for item in paths]
+        if not all(isinstance(path, str) and path.startswith('/api/') for path in paths):
+            return Response({'error': 'Every request must be a path under /api/'}, status=status.HTTP_400_BAD_REQUEST)
+
+        parallel = BooleanField().to_internal_value(request.data.get('parallel', False))
+        if parallel and len(paths) > 1:
+            with ThreadPoolExecutor(max_workers=min(len(paths), settings.BATCH_MAX_WORKERS)) as executor:
+                results = list(executor.map(lambda path: self._run_in_thread(request, path), paths))
+        else:
+            results = [self._run(request, path) for path in paths]
+        return Response({'responses': results})
+
+    def _run_in_thread(self, request, path):
+        try:
+            return self._run(request, path)
+        finally:
+            # Worker threads open their own database connections
+            connections.close_all()
+
+    def _run(self, request, path):
+        url = urlsplit(path)
+        try:
+            match = resolve(url.path)
+        except Resolver404:
+            return {'path': path, 'status': status.HTTP_404_NOT_FOUND, 'body': {'detail': 'Not found.'}}
+        if getattr(match.func, 'view_class', None) is type(self):
+            return {'path': path, 'status': status.HTTP_400_BAD_REQUEST, 'body': {'error': 'Batches cannot be nested'}}
+
+        try:
+            response = match.func(self._sub_request(request, url, match), *match.args, **match.kwargs)
+        except Exception:
+            # Details stay in the log, like any other unhandled error
+            logger.exception(f"Batched request {path} failed")
+            return {'path': path, 'status': status.HTTP_500_INTERNAL_SERVER_ERROR, 'body': {'detail': 'Internal server error'}}
+        return {'path': path, 'status': response.status_code, 'body': self._body(response)}
+
+    def _sub_request(self, request, url, match):
+        sub = copy.copy(request._request)
+        sub.method = 'GET'
+        sub.path = sub.path_info = url.path
+        sub.GET = QueryDict(url.query)
+        sub.META = {key: value for key, value in sub.META.items() if key not in _SUB_REQUEST_DROPPED_META}
+        sub.META.update(REQUEST_METHOD='GET', PATH_INFO=url.path, QUERY_STRING=url.query)
+        sub._stream = BytesIO()
+        sub.resolver_match = match
+        # Reuse the batch's authentication instead of decoding the token again
+        if request.user is not None:
+            sub._force_auth_user = request.user
+            sub._force_auth_token = request.auth
+        return sub
+
+    def _body(self, response):
+        if hasattr(response, 'data'):
+            return response.data
+        if response.get('Content-Type', '').startswith('application/json') and not response.streaming:
+            return json.loads(response.content)
+        return None
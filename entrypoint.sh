@@ -17,6 +17,11 @@ fi
 # Apply migrations
 python manage.py migrate --noinput
 
+# Build the Redis leaderboards from the database counts (they stay unused until built)
+if [ -n "$REDIS_URL" ]; then
+    python manage.py rebuild_leaderboards
+fi
+
 # Run gunicorn in production or runserver in development
 if [ "$DJANGO_ENV" = "production" ]; then
     echo "Starting Gunicorn server in production mode"
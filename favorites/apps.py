@@ -2,4 +2,7 @@ from django.apps import AppConfig
 
 class FavoritesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'favorites' 
\ No newline at end of file
+    name = 'favorites'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -1,21 +1,26 @@
 from rest_framework import serializers
 from .models import Favorite
+from .services import favorite_set_service
+from core.serializers import DynamicFieldsMixin
 from tracks.serializers import TrackSerializer
 from artists.serializers import ArtistSerializer
 from albums.serializers import AlbumSerializer
-from playlists.serializers import PlaylistSerializer
+from playlists.serializers import PlaylistSummarySerializer
 
-class FavoriteSerializer(serializers.ModelSerializer):
-    track = TrackSerializer(read_only=True)
-    artist = ArtistSerializer(read_only=True)
-    album = AlbumSerializer(read_only=True)
-    playlist = PlaylistSerializer(read_only=True)
+class FavoriteSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     user_name = serializers.CharField(source='user.username', read_only=True)
 
     class Meta:
         model = Favorite
         fields = '__all__'
         read_only_fields = ('user', 'created_at')
+        # Liked items render as ids; ?expand=track,artist nests the full objects
+        expandable_fields = {
+            'track': (TrackSerializer, {}),
+            'artist': (ArtistSerializer, {}),
+            'album': (AlbumSerializer, {}),
+            'playlist': (PlaylistSummarySerializer, {}),
+        }
 
     def validate(self, data):
         # Ensure exactly one content object is set
@@ -33,4 +38,15 @@ class FavoriteSerializer(serializers.ModelSerializer):
         elif data.get('playlist'):
             data['content_type'] = 'playlist'
             
-        return data 
\ No newline at end of file
+        return data 
+
+
+class FavoriteStatusListSerializer(serializers.ListSerializer):
+    """Looks up is_favorite for the whole list at once; the child reads ``favorite_ids``"""
+
+    def to_representation(self, data):
+        items = list(data.all() if hasattr(data, 'all') else data)
+        request = self.context.get('request')
+        if request and request.user and request.user.is_authenticated:
+            self.child.favorite_ids = favorite_set_service.contains(request.user.id, [item.id for item in items])
+        return super().to_representation(items)
@@ -0,0 +1,100 @@
+import logging
+from array import array
+from bisect import bisect_left
+from django.core.cache import cache
+from redis.exceptions import RedisError
+from core.redis_client import get_redis
+from ..models import Favorite
+
+logger = logging.getLogger(__name__)
+
+# Track ids are >= 1, so member 0 marks a loaded set even when the user has no favorites
+LOADED_MARKER = 0
+FALLBACK_CACHE_TIMEOUT = 60 * 60
+# Sets are reloaded from the database this often, dropping drift left by failed updates
+SET_TIMEOUT = 24 * 60 * 60
+
+
+def _redis_key(user_id):
+    return f'favorites:tracks:{user_id}'
+
+
+def _cache_key(user_id):
+    return f'favorite_track_ids_{user_id}'
+
+
+def _favorite_track_ids(user_id):
+    return Favorite.objects.filter(
+        user_id=user_id, content_type='track', track__isnull=False
+    ).values_list('track_id', flat=True)
+
+
+def _redis_contains(client, user_id, track_ids):
+    key = _redis_key(user_id)
+    loaded, *flags = client.smismember(key, [LOADED_MARKER, *track_ids])
+    if not loaded:
+        # Members added by add() while the set was not loaded yet are kept: the union is still right
+        pipeline = client.pipeline()
+        pipeline.sadd(key, LOADED_MARKER, *_favorite_track_ids(user_id))
+        pipeline.expire(key, SET_TIMEOUT)
+        pipeline.execute()
+        flags = client.smismember(key, track_ids)
+    return {track_id for track_id, flag in zip(track_ids, flags) if flag}
+
+
+def _sorted_ids(user_id):
+    """Sorted array('I') of the user's favorite track ids, from the cache when possible"""
+    packed = cache.get(_cache_key(user_id))
+    if packed is None:
+        ids = array('I', sorted(_favorite_track_ids(user_id)))
+        cache.set(_cache_key(user_id), ids.tobytes(), FALLBACK_CACHE_TIMEOUT)
+        return ids
+    ids = array('I')
+    ids.frombytes(packed)
+    return ids
+
+
+def contains(user_id, track_ids):
+    """Return the subset of ``track_ids`` the user has favorited, in one lookup"""
+    track_ids = list(dict.fromkeys(track_ids))
+    if not track_ids:
+        return set()
+
+    client = get_redis()
+    if client is not None:
+        try:
+            return _redis_contains(client, user_id, track_ids)
+        except RedisError as e:
+            logger.warning(f"Could not read favorite set of user {user_id}: {e}")
+
+    ids = _sorted_ids(user_id)
+    found = set()
+    for track_id in track_ids:
+        index = bisect_left(ids, track_id)
+        if index < len(ids) and ids[index] == track_id:
+            found.add(track_id)
+    return found
+
+
+def _update(user_id, track_id, command):
+    cache.delete(_cache_key(user_id))
+    client = get_redis()
+    if client is None:
+        return
+    key = _redis_key(user_id)
+    try:
+        # Applied even before the set is loaded, so a load racing this update cannot lose it
+        pipeline = client.pipeline()
+        getattr(pipeline, command)(key, track_id)
+        pipeline.expire(key, SET_TIMEOUT)
+        pipeline.execute()
+    except RedisError as e:
+        logger.warning(f"Could not update favorite set of user {user_id}: {e}")
+
+
+def add(user_id, track_id):
+    _update(user_id, track_id, 'sadd')
+
+
+def remove(user_id, track_id):
+    _update(user_id, track_id, 'srem')
@@ -0,0 +1,21 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import Favorite
+from core import cached
+from .services import favorite_set_service
+
+def _invalidate_list(favorite):
+    # favorite_tracks_<uid>, favorite_artists_<uid>, ... (see FavoriteViewSet)
+    cached.invalidate(f'favorite_{favorite.content_type}s_{favorite.user_id}')
+
+@receiver(post_save, sender=Favorite)
+def add_to_favorite_set(sender, instance, created, **kwargs):
+    _invalidate_list(instance)
+    if created and instance.content_type == 'track' and instance.track_id:
+        favorite_set_service.add(instance.user_id, instance.track_id)
+
+@receiver(post_delete, sender=Favorite)
+def remove_from_favorite_set(sender, instance, **kwargs):
+    _invalidate_list(instance)
+    if instance.content_type == 'track' and instance.track_id:
+        favorite_set_service.remove(instance.user_id, instance.track_id)
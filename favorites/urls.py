@@ -6,6 +6,6 @@ router = DefaultRouter()
 router.register(r'favorites', FavoriteViewSet, basename='favorite')
 
 urlpatterns = [
-    path('favorites/tracks/<int:track_id>/', FavoriteViewSet.as_view({'post': 'add_track'})),
+    path('favorites/tracks/<int:track_id>/', FavoriteViewSet.as_view({'post': 'add_track', 'delete': 'remove_track'})),
     path('', include(router.urls)),
 ] 
\ No newline at end of file
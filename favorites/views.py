@@ -1,19 +1,23 @@
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.core.cache import cache
+from django.conf import settings
 from .models import Favorite
 from .serializers import FavoriteSerializer
-from music.serializers import TrackSerializer, AlbumSerializer, PlaylistSerializer, ArtistSerializer
+from .services import favorite_set_service
+from music.serializers import TrackSerializer, AlbumSerializer, ArtistSerializer
+from playlists.serializers import PlaylistSummarySerializer, with_summary
 from tracks.models import Track
 from artists.models import Artist
 from albums.models import Album
 from playlists.models import Playlist
+from core import cached
+from core.views import DynamicFieldsViewMixin
 import logging
 
 logger = logging.getLogger(__name__)
 
-class FavoriteViewSet(viewsets.ModelViewSet):
+class FavoriteViewSet(DynamicFieldsViewMixin, viewsets.ModelViewSet):
     serializer_class = FavoriteSerializer
     permission_classes = [permissions.IsAuthenticated]
     
@@ -23,81 +27,81 @@ class FavoriteViewSet(viewsets.ModelViewSet):
         
         if content_type:
             queryset = queryset.filter(content_type=content_type)
-            
-        try:
-            return queryset.select_related('track', 'artist', 'album', 'playlist')
-        except Exception as e:
-            logger.error(f"Error getting favorites: {str(e)}")
-            # If playlist table doesn't exist, return queryset without related
-            return queryset.select_related('track', 'artist', 'album')
+
+        # Joins for ?expand= relations are added by DynamicFieldsViewMixin
+        return queryset
 
     def perform_create(self, serializer):
-        favorite = serializer.save(user=self.request.user)
-        # Invalidate user's favorites cache
-        cache.delete(f'favorites_{self.request.user.id}')
+        # The user's cached favorite lists are invalidated in signals.py
+        serializer.save(user=self.request.user)
 
     def perform_destroy(self, instance):
         instance.delete()
-        # Invalidate user's favorites cache
-        cache.delete(f'favorites_{self.request.user.id}')
 
     @action(detail=False, methods=['get'])
     def tracks(self, request):
         """Get user's favorite tracks"""
-        cache_key = f'favorite_tracks_{request.user.id}'
-        cached_tracks = cache.get(cache_key)
-        
-        if cached_tracks is None:
+        def serialize():
             tracks = Track.objects.filter(favorites__user=request.user)
-            cached_tracks = TrackSerializer(tracks, many=True).data
-            cache.set(cache_key, cached_tracks, 300)  # 5 minutes cache
-            
+            return TrackSerializer(tracks, many=True, context={'request': request}).data
+
+        cached_tracks = cached.get_or_compute(f'favorite_tracks_{request.user.id}', serialize, 300)  # 5 minutes cache
         return Response(cached_tracks)
 
     @action(detail=False, methods=['get'])
     def artists(self, request):
         """Get user's favorite artists"""
-        cache_key = f'favorite_artists_{request.user.id}'
-        cached_artists = cache.get(cache_key)
-        
-        if cached_artists is None:
+        def serialize():
             artists = Artist.objects.filter(favorites__user=request.user)
-            cached_artists = ArtistSerializer(artists, many=True).data
-            cache.set(cache_key, cached_artists, 300)  # 5 minutes cache
-            
+            return ArtistSerializer(artists, many=True).data
+
+        cached_artists = cached.get_or_compute(f'favorite_artists_{request.user.id}', serialize, 300)  # 5 minutes cache
         return Response(cached_artists)
 
     @action(detail=False, methods=['get'])
     def albums(self, request):
         """Get user's favorite albums"""
-        cache_key = f'favorite_albums_{request.user.id}'
-        cached_albums = cache.get(cache_key)
-        
-        if cached_albums is None:
+        def serialize():
             albums = Album.objects.filter(favorites__user=request.user)
-            cached_albums = AlbumSerializer(albums, many=True).data
-            cache.set(cache_key, cached_albums, 300)  # 5 minutes cache
-            
+            return AlbumSerializer(albums, many=True).data
+
+        cached_albums = cached.get_or_compute(f'favorite_albums_{request.user.id}', serialize, 300)  # 5 minutes cache
         return Response(cached_albums)
 
     @action(detail=False, methods=['get'])
     def playlists(self, request):
         """Get user's favorite playlists"""
         try:
-            cache_key = f'favorite_playlists_{request.user.id}'
-            cached_playlists = cache.get(cache_key)
-        
-            if cached_playlists is None:
-                playlists = Playlist.objects.filter(favorites__user=request.user)
-                cached_playlists = PlaylistSerializer(playlists, many=True).data
-                cache.set(cache_key, cached_playlists, 300)  # 5 minutes cache
-            
+            def serialize():
+                playlists = with_summary(Playlist.objects.filter(favorites__user=request.user))
+                return PlaylistSummarySerializer(playlists, many=True, context={'request': request}).data
+
+            cached_playlists = cached.get_or_compute(f'favorite_playlists_{request.user.id}', serialize, 300)  # 5 minutes cache
             return Response(cached_playlists)
         
         except Exception as e:
             logger.error(f"Error getting favorite playlists: {str(e)}")
             return Response([], status=status.HTTP_200_OK)
     
+    @action(detail=False, methods=['post'])
+    def contains(self, request):
+        """Which of {"track_ids": [...]} the user has favorited"""
+        track_ids = request.data.get('track_ids')
+        if not isinstance(track_ids, list):
+            return Response({'error': 'track_ids must be a list'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(track_ids) > settings.FAVORITES_CONTAINS_MAX_IDS:
+            return Response(
+                {'error': f'At most {settings.FAVORITES_CONTAINS_MAX_IDS} track_ids per request'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            track_ids = [int(track_id) for track_id in track_ids]
+        except (TypeError, ValueError):
+            return Response({'error': 'track_ids must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+
+        found = favorite_set_service.contains(request.user.id, track_ids)
+        return Response({'favorite_ids': [track_id for track_id in dict.fromkeys(track_ids) if track_id in found]})
+
     @action(detail=False, methods=['post'], url_path='tracks/(?P<track_id>[^/.]+)')
     def add_track(self, request, track_id=None):
         if not track_id:
@@ -1,10 +1,14 @@
 from django.db import models
+from core.object_cache import ObjectCacheManager
 
 class Genre(models.Model):
     name = models.CharField(max_length=100, unique=True, db_index=True)
     description = models.TextField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = models.Manager()
+    cached = ObjectCacheManager()
+
     class Meta:
         ordering = ['name']
 
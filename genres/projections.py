@@ -0,0 +1,27 @@
+from django.db.models import Count
+from core.projections import Projection, Column, DateTimeColumn, Computed
+from .models import Genre
+
+
+def _tracks_counts(ids):
+    return dict(Genre.objects.filter(id__in=ids).annotate(count=Count('tracks')).values_list('id', 'count'))
+
+
+def _albums_counts(ids):
+    # Same definition as GenreSerializer.get_albums_count
+    return dict(
+        Genre.objects.filter(id__in=ids, tracks__album__isnull=False)
+        .annotate(count=Count('tracks__album', distinct=True))
+        .values_list('id', 'count')
+    )
+
+
+# Same output as GenreSerializer
+GENRE_PROJECTION = Projection(Genre, {
+    'id': Column('id'),
+    'tracks_count': Computed(_tracks_counts, default=0),
+    'albums_count': Computed(_albums_counts, default=0),
+    'name': Column('name'),
+    'description': Column('description'),
+    'created_at': DateTimeColumn('created_at'),
+})
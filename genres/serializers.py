@@ -1,16 +1,19 @@
 from rest_framework import serializers
 from .models import Genre
+from core.serializers import DynamicFieldsMixin
 
-class GenreSerializer(serializers.ModelSerializer):
+class GenreSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     tracks_count = serializers.SerializerMethodField()
     albums_count = serializers.SerializerMethodField()
 
     class Meta:
         model = Genre
         fields = '__all__'
+        field_sources = {'tracks_count': [], 'albums_count': []}
 
     def get_tracks_count(self, obj):
         return obj.tracks.count()
 
     def get_albums_count(self, obj):
-        return obj.albums.count() 
\ No newline at end of file
+        # Album không có quan hệ genre riêng: đếm các album chứa track thuộc genre này
+        return obj.tracks.exclude(album=None).values('album').distinct().count() 
\ No newline at end of file
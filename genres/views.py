@@ -4,8 +4,10 @@ from rest_framework.response import Response
 from django.db.models import Count
 from .models import Genre
 from .serializers import GenreSerializer
+from core.views import CachedObjectViewMixin, DynamicFieldsViewMixin
+from core.response_cache import cache_response
 
-class GenreViewSet(viewsets.ModelViewSet):
+class GenreViewSet(CachedObjectViewMixin, DynamicFieldsViewMixin, viewsets.ModelViewSet):
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
@@ -20,6 +22,7 @@ class GenreViewSet(viewsets.ModelViewSet):
         return queryset
     
     @action(detail=False, methods=['get'])
+    @cache_response()
     def popular(self, request):
         """Get genres with most tracks"""
         genres = Genre.objects.annotate(
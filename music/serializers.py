@@ -1,25 +1,27 @@
 from rest_framework import serializers
 from .models import Artist, Album, Track, Playlist, Genre, UserActivity
-from favorites.models import Favorite
+from favorites.serializers import FavoriteStatusListSerializer
+from favorites.services import favorite_set_service
+from core.fields import VersionedMediaSerializerMixin
 
 class GenreSerializer(serializers.ModelSerializer):
     class Meta:
         model = Genre
         fields = ['id', 'name']
 
-class ArtistSerializer(serializers.ModelSerializer):
+class ArtistSerializer(VersionedMediaSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Artist
         fields = '__all__'
 
-class AlbumSerializer(serializers.ModelSerializer):
+class AlbumSerializer(VersionedMediaSerializerMixin, serializers.ModelSerializer):
     artist = serializers.PrimaryKeyRelatedField(queryset=Artist.objects.all())
 
     class Meta:
         model = Album
         fields = '__all__'
 
-class TrackSerializer(serializers.ModelSerializer):
+class TrackSerializer(VersionedMediaSerializerMixin, serializers.ModelSerializer):
     album = serializers.PrimaryKeyRelatedField(queryset=Album.objects.all(), required=False)
     artist = serializers.PrimaryKeyRelatedField(queryset=Artist.objects.all())
     artist_name = serializers.CharField(source='artist.name', read_only=True)
@@ -37,6 +39,7 @@ class TrackSerializer(serializers.ModelSerializer):
     class Meta:
         model = Track
         fields = '__all__'
+        list_serializer_class = FavoriteStatusListSerializer
     
     def validate_duration(self, value):
         print(f"Duration value received: {value}")
@@ -49,26 +52,25 @@ class TrackSerializer(serializers.ModelSerializer):
         
     def get_is_favorite(self, obj):
         request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            if hasattr(obj, 'id'):
-                try:
-                    return Favorite.objects.filter(
-                        user=request.user, 
-                        track_id=obj.id
-                    ).exists()
-                except Exception as e:
-                    print(f"Error checking favorite status: {e}")
-                    return False
+        if request and request.user and request.user.is_authenticated:
+            # Filled by FavoriteStatusListSerializer for lists, or put in the context by a parent
+            # nesting tracks one by one (QueueSerializer); other single tracks look up on their own
+            favorite_ids = getattr(self, 'favorite_ids', None)
+            if favorite_ids is None:
+                favorite_ids = self.context.get('favorite_ids')
+            if favorite_ids is None:
+                favorite_ids = favorite_set_service.contains(request.user.id, [obj.id])
+            return obj.id in favorite_ids
         return False
     
-class TrackSimpleSerializer(serializers.ModelSerializer):
+class TrackSimpleSerializer(VersionedMediaSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Track
         fields = ['id', 'title', 'artist', 'album', 'duration', 'file', 'music_video']
 
 class PlaylistSerializer(serializers.ModelSerializer):
     user = serializers.StringRelatedField()
-    tracks = TrackSimpleSerializer(many=True, read_only=True)
+    tracks = TrackSimpleSerializer(source='ordered_tracks', many=True, read_only=True)
 
     class Meta:
         model = Playlist
@@ -9,6 +9,14 @@ from music.models import Track, Artist, Album, Playlist
 
 # ========== Fixtures ==========
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    # Cached feeds/lists must not leak between tests (ids are reused)
+    from django.core.cache import cache
+    from core import catalog_snapshot
+    cache.clear()
+    catalog_snapshot.invalidate()
+
 @pytest.fixture
 def api_client():
     return APIClient()
@@ -49,6 +57,15 @@ def sample_mp3():
     file.name = "test.mp3"
     return SimpleUploadedFile("test.mp3", file.read(), content_type="audio/mp3")
 
+@pytest.fixture
+def fake_redis(settings, monkeypatch):
+    import fakeredis
+
+    client = fakeredis.FakeRedis(decode_responses=True)
+    settings.REDIS_URL = 'redis://test'
+    monkeypatch.setattr('core.redis_client._clients', {'redis://test': client})
+    return client
+
 # ========== Artist Tests ==========
 
 @pytest.mark.django_db
@@ -396,4 +413,986 @@ def test_tracks_pagination(api_client, create_artist, create_track):
     print(response.status_code, response.data)
     
     assert response.status_code == status.HTTP_200_OK
-    assert len(response.data) == 5
\ No newline at end of file
+    assert len(response.data) == 5
+# ========== Delivery Tests ==========
+
+@pytest.mark.django_db
+def test_stream_redirects_to_presigned_url(api_client, create_artist, settings, monkeypatch):
+    import boto3
+    import requests
+    from urllib.parse import unquote
+    from django.core.cache import cache
+    from moto import mock_aws
+    from storages.backends.s3 import S3Storage
+
+    settings.MEDIA_DELIVERY_MODE = 'presigned'
+    cache.clear()
+    monkeypatch.setenv('AWS_ACCESS_KEY_ID', 'testing')
+    monkeypatch.setenv('AWS_SECRET_ACCESS_KEY', 'testing')
+
+    with mock_aws():
+        client = boto3.client('s3', region_name='us-east-1')
+        client.create_bucket(Bucket='harmonia-test')
+        client.put_object(Bucket='harmonia-test', Key='tracks/song.mp3', Body=b'0123456789')
+
+        storage = S3Storage(bucket_name='harmonia-test', region_name='us-east-1', custom_domain=None)
+        monkeypatch.setattr(Track._meta.get_field('file'), 'storage', storage)
+        track = Track.objects.create(title="Remote Track", artist=create_artist(), file='tracks/song.mp3')
+
+        response = api_client.get(f"/api/tracks/{track.id}/stream/")
+        assert response.status_code == status.HTTP_302_FOUND
+        url = response['Location']
+        assert 'Signature' in url
+
+        # Signed URL is memoized per track
+        assert api_client.get(f"/api/tracks/{track.id}/stream/")['Location'] == url
+
+        # S3 answers Range requests itself
+        ranged = requests.get(url, headers={'Range': 'bytes=2-5'})
+        assert ranged.status_code == 206
+        assert ranged.content == b'2345'
+
+        response = api_client.get(f"/api/tracks/{track.id}/download/", {'redirect': 'false'})
+        assert response.status_code == status.HTTP_200_OK
+        assert 'attachment' in unquote(response.data['url'])
+
+        # Quotes and non-ASCII in download names survive as an RFC 6266 filename*
+        from tracks.services.delivery_service import get_presigned_url
+        signed = get_presigned_url(track.file, as_attachment=True, filename='Sơn "Live".mp3')
+        disposition = requests.get(signed).headers['Content-Disposition']
+        assert disposition.startswith('attachment; filename*=utf-8\'\'')
+        assert unquote(disposition.split("''", 1)[1]).endswith('Sơn "Live".mp3')
+
+# ========== Chunked Upload Tests ==========
+
+@pytest.mark.django_db
+def test_chunked_upload_resumes_and_finalizes(authenticated_client, create_artist, settings, tmp_path):
+    import base64
+    import hashlib
+
+    settings.MEDIA_ROOT = str(tmp_path / 'media')
+    settings.UPLOAD_STAGING_ROOT = str(tmp_path / 'staging')
+    client, user = authenticated_client
+    artist = create_artist()
+    content = b"ID3" + b"x" * 997
+
+    response = client.post("/api/uploads/", {"filename": "song.mp3", "size": len(content)}, format='json')
+    assert response.status_code == status.HTTP_201_CREATED
+    upload_url = f"/api/uploads/{response.data['id']}/"
+    assert response['Upload-Offset'] == '0'
+
+    def send(chunk, offset, checksum=None):
+        headers = {'HTTP_UPLOAD_OFFSET': str(offset)}
+        if checksum:
+            headers['HTTP_UPLOAD_CHECKSUM'] = checksum
+        return client.patch(upload_url, chunk, content_type='application/offset+octet-stream', **headers)
+
+    first = content[:400]
+    good = 'sha256 ' + base64.b64encode(hashlib.sha256(first).digest()).decode()
+    assert send(first, 0, good).status_code == status.HTTP_204_NO_CONTENT
+
+    # Corrupted chunk is rejected and the offset does not move
+    bad = 'sha256 ' + base64.b64encode(hashlib.sha256(b'other').digest()).decode()
+    assert send(content[400:], 400, bad).status_code == 460
+    assert send(content[400:], 0).status_code == status.HTTP_409_CONFLICT
+    assert client.head(upload_url)['Upload-Offset'] == '400'
+
+    assert send(content[400:], 400).status_code == status.HTTP_204_NO_CONTENT
+
+    response = client.post(f"{upload_url}finalize/", {"title": "Chunked", "artist": artist.id}, format='json')
+    assert response.status_code == status.HTTP_201_CREATED
+    track = Track.objects.get(id=response.data['id'])
+    with track.file.open('rb') as stored:
+        assert stored.read() == content
+
+# ========== Archive Download Tests ==========
+
+@pytest.mark.django_db
+def test_album_download_streams_zip(api_client, create_album, settings, tmp_path):
+    import io
+    import zipfile
+
+    settings.MEDIA_ROOT = str(tmp_path)
+    (tmp_path / 'tracks').mkdir()
+    album = create_album(title="Zipped")
+    contents = {}
+    for title, downloadable in (("One", True), ("Two", True), ("Locked", False)):
+        (tmp_path / 'tracks' / f'{title}.mp3').write_bytes(title.encode() * 100)
+        track = Track.objects.create(title=title, artist=album.artist, album=album,
+                                     file=f'tracks/{title}.mp3', is_downloadable=downloadable)
+        contents[track.id] = title.encode() * 100
+
+    response = api_client.get(f"/api/albums/{album.id}/download/")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.streaming
+    archive = zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content)))
+    assert len(archive.namelist()) == 2
+    assert all(info.compress_type == zipfile.ZIP_STORED for info in archive.infolist())
+    assert sorted(archive.read(name) for name in archive.namelist()) == sorted([b'One' * 100, b'Two' * 100])
+    assert list(Track.objects.filter(album=album).order_by('title').values_list('title', 'download_count')) == [
+        ('Locked', 0), ('One', 1), ('Two', 1)
+    ]
+
+# ========== Content-Addressed Storage Tests ==========
+
+@pytest.mark.django_db
+def test_identical_audio_is_stored_once(api_client, create_artist, settings, tmp_path):
+    from django.core.files.base import ContentFile
+    from tracks.models import MediaBlob
+
+    settings.MEDIA_ROOT = str(tmp_path)
+    artist = create_artist()
+    content = b"ID3" + b"same audio" * 100
+
+    first = Track.objects.create(title="Original", artist=artist, file=ContentFile(content, name="a.mp3"))
+    second = Track.objects.create(title="Re-upload", artist=artist, file=ContentFile(content, name="b.mp3"))
+
+    assert MediaBlob.objects.count() == 1
+    assert first.audio_blob_id == second.audio_blob_id
+    assert first.file.name == second.file.name
+    assert len(list((tmp_path / 'blobs').rglob('*.mp3'))) == 1
+
+    response = api_client.get(f"/api/tracks/{second.id}/stream/")
+    assert response.status_code == status.HTTP_200_OK
+    assert response['ETag'] == f'"{first.audio_blob.sha256}"'
+
+    response = api_client.get(f"/api/tracks/{second.id}/stream/", HTTP_IF_NONE_MATCH=response['ETag'])
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+# ========== Media Caching Tests ==========
+
+@pytest.mark.django_db
+def test_media_urls_are_versioned_and_immutable(api_client, create_artist, settings, tmp_path):
+    from urllib.parse import urlsplit
+
+    settings.MEDIA_ROOT = str(tmp_path)
+    (tmp_path / 'artists').mkdir()
+    (tmp_path / 'artists' / 'avatar.png').write_bytes(b'\x89PNG\r\n\x1a\n' + b'0' * 64)
+    artist = create_artist()
+    artist.avatar = 'artists/avatar.png'
+    artist.save()
+
+    response = api_client.get(f"/api/artists/{artist.id}/")
+    url = urlsplit(response.data['avatar'])
+    assert url.query.startswith('v=')
+
+    response = api_client.get(f"{url.path}?{url.query}")
+    assert response.status_code == status.HTTP_200_OK
+    assert response['Content-Type'] == 'image/png'
+    assert 'immutable' in response['Cache-Control']
+    # Only the file's current version pins it
+    assert api_client.get(f"{url.path}?v=x")['Cache-Control'] == 'no-cache'
+
+    response = api_client.get(url.path, HTTP_RANGE='bytes=0-3')
+    assert response.status_code == status.HTTP_206_PARTIAL_CONTENT
+    assert response['Content-Type'] == 'image/png'
+    assert response['Cache-Control'] == 'no-cache'
+
+# ========== Leaderboard Tests ==========
+
+@pytest.mark.django_db
+def test_trending_reads_from_leaderboard(authenticated_client, create_artist, fake_redis, django_capture_on_commit_callbacks):
+    from django.core.management import call_command
+
+    api_client, _ = authenticated_client
+    artist = create_artist()
+    quiet = Track.objects.create(title="Quiet", artist=artist)
+    hit = Track.objects.create(title="Hit", artist=artist)
+    call_command('rebuild_leaderboards')
+
+    for _ in range(3):
+        api_client.post(f"/api/tracks/{hit.id}/increment_play_count/")
+    api_client.post(f"/api/tracks/{quiet.id}/increment_play_count/")
+    api_client.post(f"/api/tracks/{quiet.id}/increment_download_count/")
+
+    assert fake_redis.zscore('leaderboard:plays', hit.id) == 3
+    assert fake_redis.zscore('leaderboard:popular', quiet.id) == 2
+
+    response = api_client.get("/api/tracks/trending/")
+    assert [track['title'] for track in response.data] == ["Hit", "Quiet"]
+
+    # A lost Redis is neither read nor incremented until it is rebuilt from the database counts
+    fake_redis.flushall()
+    api_client.post(f"/api/tracks/{hit.id}/increment_play_count/")
+    assert not fake_redis.exists('leaderboard:plays')
+    assert [track['title'] for track in api_client.get("/api/tracks/top_tracks/").data] == ["Hit", "Quiet"]
+    call_command('rebuild_leaderboards')
+    assert fake_redis.zscore('leaderboard:plays', hit.id) == 4
+    assert fake_redis.zscore('leaderboard:artist_plays', artist.id) == 5
+
+    # Deleted rows leave every board they were ranked on
+    quiet_id = quiet.id
+    with django_capture_on_commit_callbacks(execute=True):
+        quiet.delete()
+    assert fake_redis.zscore('leaderboard:popular', quiet_id) is None
+    assert fake_redis.zscore('leaderboard:downloads', quiet_id) is None
+    with django_capture_on_commit_callbacks(execute=True):
+        artist.delete()
+    assert not fake_redis.zcard('leaderboard:artist_plays') and not fake_redis.zcard('leaderboard:plays')
+
+# ========== Trending Tests ==========
+
+@pytest.mark.django_db
+def test_trending_decays_old_plays(api_client, authenticated_client, create_artist):
+    from datetime import timedelta
+    from django.core.cache import cache
+    from django.core.management import call_command
+    from django.utils import timezone
+    from genres.models import Genre
+    from tracks.models import TrackPlayBucket
+    from user_activity.models import PlayHistory
+
+    _, user = authenticated_client
+    artist = create_artist()
+    old_hit = Track.objects.create(title="Old Hit", artist=artist)
+    fresh = Track.objects.create(title="Fresh", artist=artist)
+    rock = Genre.objects.create(name="Rock")
+    old_hit.genres.add(rock)
+
+    # 40 plays four half-lives ago weigh 2.5 plays today
+    PlayHistory.objects.bulk_create([PlayHistory(user=user, track=old_hit) for _ in range(40)])
+    PlayHistory.objects.filter(track=old_hit).update(played_at=timezone.now() - timedelta(days=4))
+    PlayHistory.objects.bulk_create([PlayHistory(user=user, track=fresh) for _ in range(3)])
+
+    # Before the first run genre lists fall back to lifetime plays within the genre
+    Track.objects.filter(pk=fresh.pk).update(play_count=5)
+    response = api_client.get(f"/api/tracks/trending/?genre={rock.id}")
+    assert [track['title'] for track in response.data] == ["Old Hit"]
+    cache.clear()
+
+    call_command('compute_trending')
+
+    response = api_client.get("/api/tracks/trending/")
+    assert [track['title'] for track in response.data] == ["Fresh", "Old Hit"]
+    response = api_client.get(f"/api/tracks/trending/?genre={rock.id}")
+    assert [track['title'] for track in response.data] == ["Old Hit"]
+    extra = Track.objects.bulk_create([Track(title=f"Filler {i}", artist=artist) for i in range(12)])
+    PlayHistory.objects.bulk_create([PlayHistory(user=user, track=track) for track in extra])
+    call_command('compute_trending')
+    assert len(api_client.get(f"/api/tracks/trending/?artist={artist.id}").data) == 10
+
+    # Only the new plays are folded in on the next run
+    PlayHistory.objects.create(user=user, track=fresh)
+    call_command('compute_trending')
+    assert sum(TrackPlayBucket.objects.filter(track=fresh).values_list('plays', flat=True)) == 4
+
+    # A play committed after a higher id was ingested is still counted on a later run
+    late = PlayHistory.objects.create(user=user, track=fresh)
+    late_id = late.id
+    late.delete()
+    PlayHistory.objects.create(user=user, track=fresh)
+    call_command('compute_trending')
+    PlayHistory.objects.create(id=late_id, user=user, track=fresh)
+    call_command('compute_trending')
+    assert sum(TrackPlayBucket.objects.filter(track=fresh).values_list('plays', flat=True)) == 6
+
+# ========== Recommendation Tests ==========
+
+@pytest.mark.django_db
+def test_similar_tracks_from_co_listening(api_client, create_artist):
+    from django.core.management import call_command
+    from favorites.models import Favorite
+    from user_activity.models import PlayHistory
+
+    artist = create_artist()
+    a, b, c, d = (Track.objects.create(title=title, artist=artist) for title in "ABCD")
+    alice, bob, carol = (User.objects.create_user(username=name, password='x') for name in ("alice", "bob", "carol"))
+
+    plays = [(alice, a), (alice, a), (alice, b), (bob, a), (bob, b), (bob, c), (carol, d)]
+    PlayHistory.objects.bulk_create([PlayHistory(user=user, track=track) for user, track in plays])
+    Favorite.objects.create(user=alice, content_type='track', track=b)
+
+    call_command('build_similar_tracks', '--chunk-size', '2', '--block-size', '2')
+
+    response = api_client.get(f"/api/tracks/{a.id}/similar/")
+    assert response.status_code == status.HTTP_200_OK
+    assert [track['title'] for track in response.data] == ["B", "C"]
+    assert 0 < response.data[1]['similarity'] < response.data[0]['similarity'] <= 1
+
+    response = api_client.get(f"/api/tracks/{d.id}/similar/")
+    assert response.data == []
+
+# ========== Home Feed Tests ==========
+
+@pytest.mark.django_db
+def test_home_feed_is_cached_and_refreshed_incrementally(authenticated_client, create_artist, django_assert_max_num_queries):
+    from favorites.models import Favorite
+    from user_activity.models import PlayHistory
+
+    client, user = authenticated_client
+    artist = create_artist()
+    first, second, new_single = (Track.objects.create(title=title, artist=artist) for title in ("First", "Second", "New"))
+    PlayHistory.objects.create(user=user, track=first)
+    Favorite.objects.create(user=user, content_type='artist', artist=artist)
+
+    response = client.get("/api/home/")
+    assert response.status_code == status.HTTP_200_OK
+    assert [track['title'] for track in response.data['recently_played']] == ["First"]
+    assert response.data['because_you_liked'] is None
+
+    # A play updates the cached section without rebuilding the feed
+    PlayHistory.objects.create(user=user, track=second)
+    Favorite.objects.create(user=user, content_type='track', track=first)
+    with django_assert_max_num_queries(4):
+        response = client.get("/api/home/")
+    assert [track['title'] for track in response.data['recently_played']] == ["Second", "First"]
+    assert response.data['because_you_liked']['seed']['title'] == "First"
+    assert {track['title'] for track in response.data['new_from_favorite_artists']} == {"First", "Second", "New"}
+
+# ========== Queue Radio Tests ==========
+
+@pytest.mark.django_db
+def test_active_users_are_listed_once(authenticated_client, create_artist):
+    from user_activity.models import PlayHistory
+    from user_activity.services.home_feed_service import active_user_ids
+
+    _, user = authenticated_client
+    track = Track.objects.create(title="Loop", artist=create_artist())
+    PlayHistory.objects.bulk_create([PlayHistory(user=user, track=track) for _ in range(3)])
+    assert list(active_user_ids(days=1)) == [user.id]
+
+@pytest.mark.django_db
+def test_radio_extends_queue_near_the_end(authenticated_client, create_artist, settings):
+    from genres.models import Genre
+    from stream_queue.models import Queue
+
+    settings.RADIO_BATCH_SIZE = 2
+    client, user = authenticated_client
+    artist, other = create_artist(), create_artist(name="Other")
+    seed = Track.objects.create(title="Seed", artist=artist)
+    same_artist = Track.objects.create(title="Same Artist", artist=artist, play_count=5)
+    jazz = Genre.objects.create(name="Jazz")
+    same_genre = Track.objects.create(title="Same Genre", artist=other)
+    Track.objects.create(title="Unrelated", artist=other)
+    seed.genres.add(jazz)
+    same_genre.genres.add(jazz)
+
+    client.post(f"/api/queue/add-track/{seed.id}/")
+    response = client.post("/api/queue/radio/", {"enabled": True}, format='json')
+    assert response.data == {'radio_enabled': True, 'radio_added': 2}
+
+    queue = Queue.objects.get(user=user)
+    assert list(queue.queuetrack_set.order_by('order').values_list('track__title', flat=True)) == [
+        "Seed", "Same Artist", "Same Genre",
+    ]
+    # The seed artist's tracks come before same-genre ones
+    assert queue.queuetrack_set.order_by('order')[1].track_id == same_artist.id
+    # Every candidate for this seed is already queued
+    assert client.post(f"/api/queue/set-current/{seed.id}/").data['radio_added'] == 0
+
+# ========== Shuffle / Repeat Tests ==========
+
+@pytest.mark.django_db
+def test_shuffle_and_repeat_resolve_through_permutation(authenticated_client, create_artist, django_assert_max_num_queries):
+    from stream_queue.models import Queue, QueueTrack
+
+    client, user = authenticated_client
+    artist = create_artist()
+    queue = Queue.objects.create(user=user)
+    for order in range(10):
+        QueueTrack.objects.create(queue=queue, track=Track.objects.create(title=f"T{order}", artist=artist), order=order)
+
+    # One row written, no matter how long the queue is
+    with django_assert_max_num_queries(3):
+        response = client.post("/api/queue/shuffle/", {"enabled": True, "seed": 42}, format='json')
+    assert response.data == {'shuffle_enabled': True, 'shuffle_seed': 42}
+    assert list(queue.queuetrack_set.order_by('order').values_list('order', flat=True)) == list(range(10))
+
+    played = ["T0"]
+    while True:
+        response = client.post("/api/queue/next/")
+        if response.status_code == status.HTTP_404_NOT_FOUND:
+            break
+        played.append(response.data['track']['track']['title'])
+    assert sorted(played) == sorted(f"T{i}" for i in range(10))
+    assert played != [f"T{i}" for i in range(10)]
+
+    client.post("/api/queue/repeat/", {"mode": "all"}, format='json')
+    assert client.post("/api/queue/next/").data['track']['track']['title'] == "T0"
+
+    client.post("/api/queue/repeat/", {"mode": "one"}, format='json')
+    assert client.post("/api/queue/next/", {"skip": False}, format='json').data['track']['track']['title'] == "T0"
+    # An explicit skip still moves on
+    assert client.post("/api/queue/next/").data['track']['track']['title'] == played[1]
+    assert client.post("/api/queue/previous/").data['track']['track']['title'] == "T0"
+
+# ========== Playlist Ordering Tests ==========
+
+@pytest.mark.django_db
+def test_playlist_insert_and_move_keep_order(authenticated_client, create_artist):
+    from playlists.models import PlaylistTrack
+
+    client, user = authenticated_client
+    artist = create_artist()
+    tracks = {title: Track.objects.create(title=title, artist=artist) for title in "ABCDEF"}
+    playlist = Playlist.objects.create(name="Ordered", user=user)
+
+    def titles():
+        response = client.get(f"/api/playlists/{playlist.id}/tracks/?size=100")
+        return [entry['track']['title'] for entry in response.data['results']]
+
+    response = client.post(f"/api/playlists/{playlist.id}/add-tracks/",
+                           {"track_ids": [tracks[t].id for t in "ABCD"]}, format='json')
+    assert response.data['added'] == 4
+    client.post(f"/api/playlists/{playlist.id}/add-tracks/",
+                {"track_ids": [tracks["E"].id, tracks["F"].id], "position": 1}, format='json')
+    assert titles() == list("AEFBCD")
+
+    untouched = dict(PlaylistTrack.objects.filter(track__title__in="ABF").values_list('track__title', 'order'))
+    # Move "C, D" to the front: only those two rows change
+    response = client.post(f"/api/playlists/{playlist.id}/move/", {"start": 4, "count": 2, "to": 0}, format='json')
+    assert response.data['moved'] == 2
+    assert titles() == list("CDAEFB")
+    assert dict(PlaylistTrack.objects.filter(track__title__in="ABF").values_list('track__title', 'order')) == untouched
+
+# ========== Playlist Summary Tests ==========
+
+@pytest.mark.django_db
+def test_playlist_listing_is_summarized_and_tracks_paginated(authenticated_client, create_artist, django_assert_max_num_queries):
+    from playlists.services import ordering_service
+
+    client, user = authenticated_client
+    artist = create_artist()
+    playlist = Playlist.objects.create(name="Big", user=user)
+    track_ids = [Track.objects.create(title=f"Song {i}", artist=artist).id for i in range(120)]
+    ordering_service.add_tracks(playlist, track_ids)
+
+    with django_assert_max_num_queries(3):
+        response = client.get("/api/playlists/")
+    assert response.data[0]['tracks_count'] == 120
+    assert 'tracks' not in response.data[0]
+
+    with django_assert_max_num_queries(3):
+        detail = client.get(f"/api/playlists/{playlist.id}/")
+    assert detail.data['tracks_count'] == 120
+    assert 'tracks' not in detail.data
+
+    response = client.get(f"/api/playlists/{playlist.id}/tracks/?page=2&size=50")
+    assert response.data['count'] == 120
+    assert [entry['track']['title'] for entry in response.data['results']][:2] == ["Song 50", "Song 51"]
+    assert response.data['next'] is not None
+
+# ========== Delta Sync Tests ==========
+
+@pytest.mark.django_db
+def test_sync_returns_changes_since_snapshot(authenticated_client, create_artist):
+    from playlists.services import ordering_service
+
+    client, user = authenticated_client
+    artist = create_artist()
+    a, b, c = (Track.objects.create(title=title, artist=artist) for title in "ABC")
+    playlist = Playlist.objects.create(name="Synced", user=user)
+    ordering_service.add_tracks(playlist, [a.id, b.id])
+
+    response = client.get(f"/api/sync/playlist/{playlist.id}/?since=0")
+    snapshot = response.data['version']
+    assert [(change['op'], change['item_id']) for change in response.data['changes']] == [('add', a.id), ('add', b.id)]
+    assert client.get(f"/api/sync/playlist/{playlist.id}/?since={snapshot}").status_code == 304
+
+    ordering_service.remove_tracks(playlist, [a.id])
+    ordering_service.add_tracks(playlist, [c.id], position=0)
+    response = client.get(f"/api/sync/playlist/{playlist.id}/?since={snapshot}")
+    assert response.data['reset'] is False
+    assert [(change['op'], change['item_id']) for change in response.data['changes']] == [('remove', a.id), ('add', c.id)]
+
+    # Clients behind the pruned log are told to reload
+    from sync.models import CollectionChange
+    CollectionChange.objects.filter(version=1).delete()
+    assert client.get(f"/api/sync/playlist/{playlist.id}/?since=0").data['reset'] is True
+
+    client.post(f"/api/favorites/tracks/{a.id}/")
+    client.post(f"/api/queue/add-track/{b.id}/")
+    assert client.get("/api/sync/favorites/?since=0").data['changes'][0]['item_id'] == a.id
+    assert client.get("/api/sync/queue/?since=0").data['changes'][0]['op'] == 'add'
+
+    # Deleting a track removes it from playlists and queues by cascade, which is logged too
+    queue_snapshot = client.get("/api/sync/queue/?since=0").data['version']
+    playlist_snapshot = client.get(f"/api/sync/playlist/{playlist.id}/?since=0").data['version']
+    b_id = b.id
+    b.delete()
+    response = client.get(f"/api/sync/playlist/{playlist.id}/?since={playlist_snapshot}")
+    assert [(change['op'], change['item_id']) for change in response.data['changes']] == [('remove', b_id)]
+    response = client.get(f"/api/sync/queue/?since={queue_snapshot}")
+    assert [(change['op'], change['item_id']) for change in response.data['changes']] == [('remove', b_id)]
+
+@pytest.mark.django_db
+def test_sync_logs_renumbered_orders(authenticated_client, create_artist):
+    from playlists.models import PlaylistTrack
+    from playlists.services import ordering_service
+    from sync.services import sync_service
+
+    client, user = authenticated_client
+    artist = create_artist()
+    a, b, c = (Track.objects.create(title=title, artist=artist) for title in "ABC")
+    playlist = Playlist.objects.create(name="Tight", user=user)
+    ordering_service.add_tracks(playlist, [a.id, b.id])
+    # No room left between A and B, so the insert renumbers first
+    PlaylistTrack.objects.filter(playlist=playlist, track=b).update(order=ordering_service.GAP + 1)
+    snapshot = sync_service.current_version('playlist', playlist.id)
+
+    ordering_service.add_tracks(playlist, [c.id], position=1)
+    response = client.get(f"/api/sync/playlist/{playlist.id}/?since={snapshot}")
+    orders = dict(PlaylistTrack.objects.filter(playlist=playlist).values_list('track_id', 'order'))
+    assert [(change['op'], change['item_id'], change['position']) for change in response.data['changes']] == [
+        ('move', a.id, orders[a.id]), ('move', b.id, orders[b.id]), ('add', c.id, orders[c.id]),
+    ]
+    assert orders[a.id] < orders[c.id] < orders[b.id]
+
+# ========== Favorite Status Tests ==========
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('use_redis', [False, True])
+def test_favorite_contains_and_is_favorite(request, use_redis, authenticated_client, create_artist, rf, settings, monkeypatch, django_assert_max_num_queries):
+    from music.serializers import TrackSerializer
+
+    if use_redis:
+        request.getfixturevalue('fake_redis')
+    client, user = authenticated_client
+    artist = create_artist()
+    tracks = [Track.objects.create(title=f"Song {i}", artist=artist) for i in range(5)]
+    client.post(f"/api/favorites/tracks/{tracks[1].id}/")
+    client.post(f"/api/favorites/tracks/{tracks[3].id}/")
+
+    ids = [track.id for track in tracks]
+    response = client.post("/api/favorites/contains/", {"track_ids": ids}, format='json')
+    assert response.data['favorite_ids'] == [tracks[1].id, tracks[3].id]
+
+    client.delete(f"/api/favorites/tracks/{tracks[1].id}/")
+    response = client.post("/api/favorites/contains/", {"track_ids": ids}, format='json')
+    assert response.data['favorite_ids'] == [tracks[3].id]
+
+    http_request = rf.get('/')
+    http_request.user = user
+    queryset = Track.objects.select_related('artist', 'album').prefetch_related('genres')
+    # The favorite lookup no longer grows with the number of tracks
+    with django_assert_max_num_queries(2):
+        data = TrackSerializer(queryset, many=True, context={'request': http_request}).data
+    assert {item['id'] for item in data if item['is_favorite']} == {tracks[3].id}
+
+    # Queued tracks are nested one by one; the queue still looks them up in one call
+    from favorites.services import favorite_set_service
+    for track in tracks:
+        client.post(f"/api/queue/add-track/{track.id}/")
+    contains = favorite_set_service.contains
+    calls = []
+    monkeypatch.setattr(favorite_set_service, 'contains', lambda *args: calls.append(args) or contains(*args))
+    queued = client.get("/api/queue/current-queue/").data['tracks']
+    assert len(calls) == 1
+    assert [entry['track']['id'] for entry in queued if entry['track']['is_favorite']] == [tracks[3].id]
+
+    too_many = list(range(1, settings.FAVORITES_CONTAINS_MAX_IDS + 2))
+    assert client.post("/api/favorites/contains/", {"track_ids": too_many}, format='json').status_code == 400
+
+@pytest.mark.django_db
+def test_favorite_added_during_set_load_is_kept(authenticated_client, create_artist, fake_redis, monkeypatch):
+    from favorites.models import Favorite
+    from favorites.services import favorite_set_service
+
+    client, user = authenticated_client
+    artist = create_artist()
+    old, new = (Track.objects.create(title=title, artist=artist) for title in ("Old", "New"))
+    Favorite.objects.create(user=user, track=old, content_type='track')
+
+    # The loader read the database before the new favorite was committed
+    load = favorite_set_service._favorite_track_ids
+    def stale_load(user_id):
+        ids = list(load(user_id))
+        client.post(f"/api/favorites/tracks/{new.id}/")
+        return ids
+
+    monkeypatch.setattr(favorite_set_service, '_favorite_track_ids', stale_load)
+    assert favorite_set_service.contains(user.id, [old.id, new.id]) == {old.id, new.id}
+    monkeypatch.setattr(favorite_set_service, '_favorite_track_ids', load)
+    assert favorite_set_service.contains(user.id, [old.id, new.id]) == {old.id, new.id}
+    assert 0 < fake_redis.ttl(favorite_set_service._redis_key(user.id)) <= favorite_set_service.SET_TIMEOUT
+
+# ========== Sparse Fieldset Tests ==========
+
+@pytest.mark.django_db
+def test_fields_and_expand_prune_response_and_query(authenticated_client, create_artist, create_album, django_assert_max_num_queries):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    client, user = authenticated_client
+    artist = create_artist()
+    album = create_album(artist=artist)
+    for i in range(3):
+        Track.objects.create(title=f"Song {i}", artist=artist, album=album, lyrics="la la la")
+
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get("/api/tracks/?fields=id,title,artist_name")
+    assert set(response.data[0]) == {'id', 'title', 'artist_name'}
+    sql = ' '.join(query['sql'] for query in queries.captured_queries)
+    assert 'lyrics' not in sql and '"video"' not in sql
+
+    # Relations are rendered as ids unless expanded, and expansion does not add a query per row
+    with django_assert_max_num_queries(4):
+        response = client.get("/api/tracks/?expand=album&fields=id,album.title")
+    assert response.data[0]['album'] == {'title': album.title}
+
+    client.post(f"/api/favorites/tracks/{Track.objects.first().id}/")
+    favorite = client.get("/api/favorites/").data[0]
+    assert isinstance(favorite['track'], int)
+    favorite = client.get("/api/favorites/?expand=track&fields=id,track.title").data[0]
+    assert set(favorite) == {'id', 'track'} and set(favorite['track']) == {'title'}
+
+@pytest.mark.django_db
+def test_nested_playlist_summaries_are_prefetched(authenticated_client, create_artist, django_assert_max_num_queries):
+    from favorites.models import Favorite
+    from playlists.services import ordering_service
+    from user_activity.models import UserActivity
+
+    client, user = authenticated_client
+    artist = create_artist()
+    track_ids = [Track.objects.create(title=f"Song {i}", artist=artist).id for i in range(3)]
+    for i in range(4):
+        playlist = Playlist.objects.create(name=f"Mix {i}", user=user)
+        ordering_service.add_tracks(playlist, track_ids[:i])
+        Favorite.objects.create(user=user, playlist=playlist, content_type='playlist')
+        UserActivity.objects.create(user=user, playlist=playlist, action='create_playlist')
+
+    # Row count does not change the number of queries
+    with django_assert_max_num_queries(3):
+        response = client.get("/api/favorites/?expand=playlist")
+    assert sorted(favorite['playlist']['tracks_count'] for favorite in response.data) == [0, 1, 2, 3]
+    with django_assert_max_num_queries(3):
+        response = client.get("/api/activities/recent/")
+    assert sorted(activity['playlist']['tracks_count'] for activity in response.data) == [0, 1, 2, 3]
+
+# ========== Read Projection Tests ==========
+
+@pytest.mark.django_db
+def test_track_projection_matches_serializer(create_artist, create_album, rf):
+    from genres.models import Genre
+    from tracks.projections import TRACK_PROJECTION
+    from tracks.serializers import TrackSerializer
+
+    artist = create_artist()
+    album = create_album(artist=artist)
+    rock, pop = Genre.objects.create(name="Rock"), Genre.objects.create(name="Pop")
+    with_album = Track.objects.create(title="With album", artist=artist, album=album, file="tracks/a.mp3", lyrics="la")
+    with_album.genres.set([rock, pop])
+    Track.objects.create(title="Single", artist=artist)
+
+    request = rf.get('/')
+    queryset = Track.objects.order_by('-created_at')
+    expected = [dict(item) for item in TrackSerializer(queryset, many=True, context={'request': request}).data]
+    assert TRACK_PROJECTION.render(queryset, request) == expected
+    assert TRACK_PROJECTION.render_ids([with_album.id], request) == [expected[1]]
+
+# ========== JSON Renderer Tests ==========
+
+def test_orjson_renderer_matches_json_renderer():
+    import datetime
+    import decimal
+    import uuid
+    from io import BytesIO
+    from rest_framework.renderers import JSONRenderer
+    from core.parsers import ORJSONParser
+    from core.renderers import ORJSONRenderer
+
+    data = {
+        'when': datetime.datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=datetime.timezone.utc),
+        'day': datetime.date(2024, 5, 1),
+        'price': decimal.Decimal('9.99'),
+        'id': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+        'counts': {1: 2},
+        'text': 'Sơn Tùng   M-TP',
+        'items': [None, True, 1.5],
+    }
+    rendered = ORJSONRenderer().render(data)
+    assert rendered == JSONRenderer().render(data)
+    assert ORJSONParser().parse(BytesIO(rendered))['text'] == data['text']
+
+# ========== Response Cache Tests ==========
+
+@pytest.mark.django_db
+def test_anonymous_catalog_responses_are_cached(api_client, create_artist, django_assert_num_queries):
+    import gzip
+
+    artist = create_artist()
+    track = Track.objects.create(title="Cached", artist=artist)
+
+    first = api_client.get("/api/tracks/recent/")
+    assert [item['title'] for item in first.json()] == ["Cached"]
+    with django_assert_num_queries(0):
+        hit = api_client.get("/api/tracks/recent/", HTTP_ACCEPT_ENCODING='gzip')
+    assert hit['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(hit.content) == first.content
+    assert api_client.get("/api/tracks/recent/", HTTP_IF_NONE_MATCH=first['ETag']).status_code == 304
+
+    # Counter updates keep the entry, catalog writes replace it
+    track.increment_play_count()
+    assert api_client.get("/api/tracks/recent/").content == first.content
+    Track.objects.create(title="Newer", artist=artist)
+    assert [item['title'] for item in api_client.get("/api/tracks/recent/").json()] == ["Newer", "Cached"]
+
+@pytest.mark.django_db
+def test_featured_playlists_follow_public_playlist_writes(authenticated_client):
+    from core.response_cache import catalog_version
+
+    client, user = authenticated_client
+    public = Playlist.objects.create(name="Public", user=user)
+    version = catalog_version()
+    assert [item['name'] for item in client.get("/api/playlists/featured/").json()] == ["Public"]
+
+    # Private playlists leave the catalog and the featured list alone
+    private = Playlist.objects.create(name="Private", user=user, is_public=False)
+    private.name = "Renamed"
+    private.save()
+    assert catalog_version() == version
+    assert [item['name'] for item in client.get("/api/playlists/featured/").json()] == ["Public"]
+
+    private.is_public = True
+    private.save()
+    assert {item['name'] for item in client.get("/api/playlists/featured/").json()} == {"Public", "Renamed"}
+    public.is_public = False
+    public.save()
+    assert [item['name'] for item in client.get("/api/playlists/featured/").json()] == ["Renamed"]
+
+# ========== Cached Computation Tests ==========
+
+def test_cached_computation_is_single_flight_and_serves_stale(monkeypatch):
+    from django.core.cache import cache
+    from core import cached
+
+    calls = []
+    def compute():
+        calls.append(1)
+        return len(calls)
+
+    assert cached.get_or_compute('answer', compute, 60) == 1
+    assert cached.get_or_compute('answer', compute, 60) == 1
+
+    # Past its soft expiry while another worker holds the lock: the old value is served
+    monkeypatch.setattr(cached, '_should_refresh', lambda *args: True)
+    cache.add('answer:lock', 1)
+    assert cached.get_or_compute('answer', compute, 60) == 1
+    assert len(calls) == 1
+    cache.delete('answer:lock')
+    assert cached.get_or_compute('answer', compute, 60) == 2
+
+    monkeypatch.setattr(cached, '_should_refresh', lambda *args: False)
+    cached.invalidate('answer')
+    assert cached.get_or_compute('answer', compute, 60) == 3
+
+    # A computation that started before invalidate() cannot store its older result
+    def outdated():
+        cached.invalidate('answer')
+        return 'outdated'
+
+    cached.invalidate('answer')
+    assert cached.get_or_compute('answer', outdated, 60) == 'outdated'
+    assert cached.get_or_compute('answer', compute, 60) == 4
+
+    # A lock that expired and was taken over is not released by its first owner
+    monkeypatch.setattr(cached, '_should_refresh', lambda *args: True)
+    def slow():
+        cache.set('answer:lock', 'other worker')
+        return 5
+
+    assert cached.get_or_compute('answer', slow, 60) == 5
+    assert cache.get('answer:lock') == 'other worker'
+
+
+@pytest.mark.django_db
+def test_favorite_lists_are_invalidated_on_change(authenticated_client, create_artist):
+    client, user = authenticated_client
+    artist = create_artist()
+    track = Track.objects.create(title="Liked", artist=artist)
+
+    assert client.get("/api/favorites/tracks/").data == []
+    client.post(f"/api/favorites/tracks/{track.id}/")
+    assert [item['title'] for item in client.get("/api/favorites/tracks/").data] == ["Liked"]
+
+
+# ========== Object Cache Tests ==========
+
+@pytest.mark.django_db
+def test_object_cache_reads_through_and_invalidates(api_client, create_artist, django_assert_num_queries):
+    artist = create_artist()
+    tracks = [Track.objects.create(title=f"Track {i}", artist=artist) for i in range(3)]
+    ids = [track.id for track in tracks]
+
+    assert set(Track.cached.get_many(ids + [999999])) == set(ids)
+    with django_assert_num_queries(0):
+        cached_tracks = Track.cached.get_many(ids)
+        assert cached_tracks[ids[0]].artist.name == artist.name
+        assert [genre for genre in cached_tracks[ids[0]].genres.all()] == []
+
+    # Saving the track, or the artist embedded in it, drops the cached copy
+    tracks[0].title = "Renamed"
+    tracks[0].save()
+    artist.name = "Renamed Artist"
+    artist.save()
+    assert Track.cached.get_by_pk(ids[0]).title == "Renamed"
+    assert Track.cached.get_by_pk(ids[1]).artist.name == "Renamed Artist"
+
+    assert api_client.get(f"/api/artists/{artist.id}/").data['name'] == "Renamed Artist"
+    with django_assert_num_queries(0):
+        assert api_client.get(f"/api/artists/{artist.id}/").data['name'] == "Renamed Artist"
+    assert api_client.get("/api/artists/999999/").status_code == 404
+
+
+# ========== Catalog Snapshot Tests ==========
+
+@pytest.mark.django_db
+def test_catalog_snapshot_serves_lookups_and_follows_writes(api_client, create_artist, create_album, settings, django_assert_num_queries):
+    from django.core.cache import cache
+    from django.core.exceptions import ValidationError
+    from core import catalog_snapshot
+    from genres.models import Genre
+
+    settings.CATALOG_SNAPSHOT_CHECK_INTERVAL = 60
+    artist = create_artist()
+    other = Artist.objects.create(name="Other Artist")
+    album = create_album(artist=artist)
+    rock = Genre.objects.create(name="Rock")
+
+    snapshot = catalog_snapshot.get_snapshot()
+    with django_assert_num_queries(0):
+        assert catalog_snapshot.get_snapshot() is snapshot
+        assert snapshot.album_artist_id(album.id) == artist.id
+        assert snapshot.genre_id("rock") == rock.id
+        assert snapshot.artist_ids_containing("other") == [other.id]
+        Track(title="Checked", artist=artist, album=album).clean()
+    with pytest.raises(ValidationError):
+        Track(title="Mismatch", artist=other, album=album).clean()
+
+    # A write elsewhere bumps the shared version; local writes drop the snapshot at once
+    cache.incr(catalog_snapshot.VERSION_KEY)
+    settings.CATALOG_SNAPSHOT_CHECK_INTERVAL = 0
+    assert catalog_snapshot.get_snapshot() is not snapshot
+    Genre.objects.create(name="Jazz")
+    assert catalog_snapshot.get_snapshot().genre_id("Jazz") is not None
+
+    # Without a shared cache no bump arrives from other workers, so old snapshots are rebuilt
+    snapshot = catalog_snapshot.get_snapshot()
+    Genre.objects.bulk_create([Genre(name="Blues")])
+    assert catalog_snapshot.get_snapshot() is snapshot
+    settings.CATALOG_SNAPSHOT_MAX_AGE = 0
+    assert catalog_snapshot.get_snapshot().genre_id("Blues") is not None
+
+    track = Track.objects.create(title="Rocking", artist=artist)
+    track.genres.add(rock)
+    Track.objects.create(title="Quiet", artist=other)
+    response = api_client.get("/api/tracks/", {'genre': 'roc', 'artist': artist.name[:4]})
+    assert [item['title'] for item in response.data] == ["Rocking"]
+
+
+# ========== Faceted Browse Tests ==========
+
+@pytest.mark.django_db
+def test_browse_filters_by_ids_and_counts_facets(api_client, create_artist, create_album, django_assert_max_num_queries):
+    from genres.models import Genre
+
+    rock, pop = Genre.objects.create(name="Rock"), Genre.objects.create(name="Pop")
+    first, second = create_artist(), Artist.objects.create(name="Second")
+    album = create_album(artist=first)
+    for title, artist, track_album, genres in [
+        ("A", first, album, [rock]),
+        ("B", first, None, [rock, pop]),
+        ("C", second, None, [pop]),
+    ]:
+        Track.objects.create(title=title, artist=artist, album=track_album).genres.set(genres)
+
+    response = api_client.get("/api/tracks/browse/", {'genre': f'{rock.id},{pop.id}', 'artist': first.id})
+    assert response.status_code == 200
+    assert response.data['count'] == 2
+    assert sorted(item['title'] for item in response.data['results']) == ["A", "B"]
+    facets = response.data['facets']
+    # Genre counts ignore the genre filter, the other facets apply it
+    assert {g['name']: g['count'] for g in facets['genres']} == {"Rock": 2, "Pop": 1}
+    assert {a['name']: a['count'] for a in facets['artists']} == {first.name: 2, "Second": 1}
+    assert facets['albums'] == [{'id': album.id, 'name': album.title, 'count': 1}]
+
+    # Facet counts are cached: only the page is queried (count, ids, projection)
+    with django_assert_max_num_queries(7):
+        api_client.get("/api/tracks/browse/", {'genre': f'{pop.id},{rock.id}', 'artist': first.id})
+    assert api_client.get("/api/tracks/browse/", {'genre': 'rock'}).status_code == 400
+
+
+# ========== Artist Overview Tests ==========
+
+@pytest.mark.django_db
+def test_artist_overview_with_incremental_stats(api_client, authenticated_client, create_artist, create_album):
+    from io import StringIO
+    from django.core.management import call_command
+    from artists.models import ArtistStats
+
+    client, user = authenticated_client
+    artist = create_artist()
+    album = create_album(artist=artist)
+    hit = Track.objects.create(title="Hit", artist=artist, album=album)
+    Track.objects.create(title="Deep Cut", artist=artist)
+
+    overview = api_client.get(f"/api/artists/{artist.id}/overview/").data
+    assert overview['artist']['name'] == artist.name
+    assert overview['stats'] == {'track_count': 2, 'album_count': 1, 'total_plays': 0, 'listeners': 0}
+    assert overview['albums'][0]['tracks_count'] == 1
+
+    # Plays, listeners and new tracks update the stats row in place
+    client.post(f"/api/tracks/{hit.id}/increment_play_count/")
+    client.post(f"/api/tracks/{hit.id}/increment_play_count/")
+    Track.objects.create(title="New", artist=artist)
+    stats = ArtistStats.objects.get(artist=artist)
+    assert (stats.track_count, stats.total_plays, stats.listeners) == (3, 2, 1)
+
+    overview = client.get(f"/api/artists/{artist.id}/overview/").data
+    assert [track['title'] for track in overview['top_tracks']][0] == "Hit"
+
+    ArtistStats.objects.filter(artist=artist).update(total_plays=99)
+    call_command('refresh_artist_stats', stdout=StringIO())
+    assert ArtistStats.objects.get(artist=artist).total_plays == 2
+
+
+# ========== Batch Request Tests ==========
+
+@pytest.mark.django_db
+def test_batch_runs_get_requests_as_the_caller(api_client, authenticated_client, create_artist, monkeypatch):
+    client, user = authenticated_client
+    artist = create_artist()
+    Track.objects.create(title="Batched", artist=artist)
+
+    response = client.post("/api/batch/", {'requests': [
+        "/api/tracks/recent/",
+        {'path': f"/api/artists/{artist.id}/"},
+        "/api/sync/favorites/",
+        "/api/nowhere/",
+    ]}, format='json')
+    assert response.status_code == 200
+    recent, artist_detail, sync, missing = response.data['responses']
+    assert [item['title'] for item in recent['body']] == ["Batched"]
+    assert artist_detail['body']['name'] == artist.name
+    # The sub-request is authenticated as the caller
+    assert sync['status'] == 200
+    assert missing['status'] == 404
+
+    anonymous = api_client.post("/api/batch/", {'requests': ["/api/sync/favorites/"]}, format='json')
+    assert anonymous.data['responses'][0]['status'] in (401, 403)
+    assert api_client.post("/api/batch/", {'requests': ["/api/batch/"]}, format='json').data['responses'][0]['status'] == 400
+    assert api_client.post("/api/batch/", {'requests': ["https://example.com/"]}, format='json').status_code == 400
+
+    parallel = api_client.post("/api/batch/", {'requests': ["/api/nowhere/", "/api/batch/"], 'parallel': True}, format='json')
+    assert [result['status'] for result in parallel.data['responses']] == [404, 400]
+    # "false" as sent by form-like clients means sequential
+    def no_pool(*args, **kwargs):
+        raise AssertionError("ran on the thread pool")
+
+    monkeypatch.setattr('core.views.ThreadPoolExecutor', no_pool)
+    sequential = api_client.post("/api/batch/", {'requests': ["/api/nowhere/", "/api/batch/"], 'parallel': "false"}, format='json')
+    assert [result['status'] for result in sequential.data['responses']] == [404, 400]
+
+
+@pytest.mark.django_db
+def test_batch_hides_sub_request_errors(api_client, monkeypatch):
+    from tracks.views import TrackViewSet
+
+    def broken(self, request):
+        raise RuntimeError("connection to database server lost")
+
+    monkeypatch.setattr(TrackViewSet, 'recent', broken)
+    response = api_client.post("/api/batch/", {'requests': ["/api/tracks/recent/"]}, format='json')
+    assert response.data['responses'][0]['status'] == 500
+    assert response.data['responses'][0]['body'] == {'detail': 'Internal server error'}
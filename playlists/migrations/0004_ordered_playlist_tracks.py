@@ -0,0 +1,69 @@
+# Generated by Django 5.1.7 on 2026-10-19 04:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Must match playlists.services.ordering_service.GAP
+GAP = 1024
+
+
+def copy_to_playlist_tracks(apps, schema_editor):
+    """Move rows of the implicit M2M table into PlaylistTrack, keeping insertion order"""
+    Playlist = apps.get_model('playlists', 'Playlist')
+    PlaylistTrack = apps.get_model('playlists', 'PlaylistTrack')
+    Through = Playlist.tracks.through
+
+    existing = set(PlaylistTrack.objects.values_list('playlist_id', 'track_id'))
+    next_order = {}
+    entries = []
+    for playlist_id, track_id in Through.objects.order_by('playlist_id', 'id').values_list('playlist_id', 'track_id'):
+        if (playlist_id, track_id) in existing:
+            continue
+        next_order[playlist_id] = next_order.get(playlist_id, 0) + GAP
+        entries.append(PlaylistTrack(playlist_id=playlist_id, track_id=track_id, order=next_order[playlist_id]))
+    PlaylistTrack.objects.bulk_create(entries, batch_size=1000)
+
+
+def copy_to_implicit_table(apps, schema_editor):
+    Playlist = apps.get_model('playlists', 'Playlist')
+    PlaylistTrack = apps.get_model('playlists', 'PlaylistTrack')
+    Through = Playlist.tracks.through
+    Through.objects.bulk_create(
+        [
+            Through(playlist_id=playlist_id, track_id=track_id)
+            for playlist_id, track_id in PlaylistTrack.objects.order_by('playlist_id', 'order', 'id')
+            .values_list('playlist_id', 'track_id')
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('playlists', '0003_playlist_followers'),
+        ('tracks', '0006_trackneighbors'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='playlisttrack',
+            name='playlist',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='playlist_tracks', to='playlists.playlist'),
+        ),
+        migrations.AddIndex(
+            model_name='playlisttrack',
+            index=models.Index(fields=['playlist', 'order'], name='playlists_p_playlis_c81fae_idx'),
+        ),
+        # Django cannot add `through` to an existing M2M: copy the rows, then swap the field
+        migrations.RunPython(copy_to_playlist_tracks, copy_to_implicit_table),
+        migrations.RemoveField(
+            model_name='playlist',
+            name='tracks',
+        ),
+        migrations.AddField(
+            model_name='playlist',
+            name='tracks',
+            field=models.ManyToManyField(related_name='playlists', through='playlists.PlaylistTrack', to='tracks.track'),
+        ),
+    ]
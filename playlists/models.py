@@ -5,7 +5,7 @@ from tracks.models import Track
 class Playlist(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="playlists")
     name = models.CharField(max_length=255, db_index=True)
-    tracks = models.ManyToManyField(Track, related_name="playlists")
+    tracks = models.ManyToManyField(Track, through="PlaylistTrack", related_name="playlists")
     created_at = models.DateTimeField(auto_now_add=True)
     is_public = models.BooleanField(default=True)
     followers = models.PositiveIntegerField(default=0)
@@ -16,12 +16,20 @@ class Playlist(models.Model):
     def __str__(self):
         return f"{self.name} ({self.user.username})"
 
+    @property
+    def ordered_tracks(self):
+        """Tracks in playlist order (uses prefetched playlist_tracks when available)"""
+        return [entry.track for entry in self.playlist_tracks.all()]
+
 class PlaylistTrack(models.Model):
-    playlist = models.ForeignKey(Playlist, on_delete=models.CASCADE)
+    playlist = models.ForeignKey(Playlist, on_delete=models.CASCADE, related_name="playlist_tracks")
     track = models.ForeignKey(Track, on_delete=models.CASCADE)
     added_at = models.DateTimeField(auto_now_add=True)
     order = models.PositiveIntegerField(default=0)
 
     class Meta:
         ordering = ['order', 'added_at']
-        unique_together = ['playlist', 'track'] 
\ No newline at end of file
+        unique_together = ['playlist', 'track']
+        indexes = [
+            models.Index(fields=['playlist', 'order']),
+        ] 
\ No newline at end of file
@@ -1,9 +1,72 @@
+from django.db.models import Count, OuterRef, Subquery
 from rest_framework import serializers
-from .models import Playlist, Track
+from .models import Playlist, PlaylistTrack, Track
+from albums.models import Album
+from core.media import versioned_url
+from core.serializers import DynamicFieldsMixin
 from tracks.serializers import TrackSerializer
+from .services import ordering_service
 
-class PlaylistSerializer(serializers.ModelSerializer):
-    tracks = TrackSerializer(many=True, read_only=True)
+
+def with_summary(queryset):
+    """Annotate what PlaylistSummarySerializer needs, so a page of playlists costs one query"""
+    first_entry = PlaylistTrack.objects.filter(playlist=OuterRef('pk')).order_by('order', 'id')
+    return queryset.select_related('user').annotate(
+        tracks_count=Count('playlist_tracks', distinct=True),
+        cover_thumbnail=Subquery(first_entry.values('track__track_thumbnail')[:1]),
+        cover_album=Subquery(first_entry.values('track__album__cover')[:1]),
+    )
+
+
+class PlaylistSummarySerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    """Lightweight playlist for list contexts; tracks come from /playlists/{id}/tracks/"""
+    user_name = serializers.CharField(source='user.username', read_only=True)
+    tracks_count = serializers.SerializerMethodField()
+    cover = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Playlist
+        fields = ['id', 'name', 'user', 'user_name', 'is_public', 'followers', 'created_at', 'tracks_count', 'cover']
+        # Both come from with_summary() annotations
+        field_sources = {'tracks_count': [], 'cover': []}
+        related_queryset = staticmethod(with_summary)
+
+    def get_tracks_count(self, obj):
+        count = getattr(obj, 'tracks_count', None)
+        return count if count is not None else obj.playlist_tracks.count()
+
+    def get_cover(self, obj):
+        # Ảnh bìa = thumbnail của track đầu tiên, nếu không có thì cover album của nó
+        if hasattr(obj, 'cover_thumbnail'):
+            thumbnail, album_cover = obj.cover_thumbnail, obj.cover_album
+        else:
+            entry = obj.playlist_tracks.select_related('track__album').first()
+            track = entry.track if entry else None
+            thumbnail = track.track_thumbnail.name if track else None
+            album_cover = track.album.cover.name if track and track.album else None
+
+        if thumbnail:
+            field = Track._meta.get_field('track_thumbnail')
+        elif album_cover:
+            field = Album._meta.get_field('cover')
+        else:
+            return None
+        image = field.attr_class(None, field, thumbnail or album_cover)
+        url = versioned_url(image.url, image)
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
+
+
+class PlaylistTrackSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    track = TrackSerializer(read_only=True)
+
+    class Meta:
+        model = PlaylistTrack
+        fields = ['id', 'track', 'added_at']
+
+
+class PlaylistSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    tracks = TrackSerializer(source='ordered_tracks', many=True, read_only=True)
     tracks_ids = serializers.PrimaryKeyRelatedField(
         queryset=Track.objects.all(),
         many=True,
@@ -24,4 +87,15 @@ class PlaylistSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         validated_data['user'] = self.context['request'].user
-        return super().create(validated_data) 
\ No newline at end of file
+        tracks = validated_data.pop('tracks', [])
+        playlist = super().create(validated_data)
+        ordering_service.add_tracks(playlist, [track.id for track in tracks])
+        return playlist
+
+    def update(self, instance, validated_data):
+        tracks = validated_data.pop('tracks', None)
+        playlist = super().update(instance, validated_data)
+        if tracks is not None:
+            # Thứ tự trong tracks_ids là thứ tự mới của playlist
+            ordering_service.set_tracks(playlist, [track.id for track in tracks])
+        return playlist 
\ No newline at end of file
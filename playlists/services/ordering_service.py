@@ -0,0 +1,120 @@
+import logging
+from django.db import transaction
+from django.db.models import Max
+from sync.services import sync_service
+from ..models import PlaylistTrack
+
+logger = logging.getLogger(__name__)
+
+# Space left between consecutive entries, so inserts and moves rarely renumber
+GAP = 1024
+
+
+def _entries(playlist):
+    return PlaylistTrack.objects.filter(playlist=playlist).order_by('order', 'id')
+
+
+def _renumber(playlist):
+    """Spread all entries GAP apart again. Only needed when a gap is used up."""
+    entries = list(_entries(playlist).only('id', 'track_id', 'order'))
+    for index, entry in enumerate(entries, start=1):
+        entry.order = index * GAP
+    PlaylistTrack.objects.bulk_update(entries, ['order'], batch_size=1000)
+    # Clients place later inserts by these orders, so they must learn the new ones
+    sync_service.record_changes('playlist', playlist.id, sync_service.track_changes('move', entries))
+    logger.info(f"Renumbered {len(entries)} entries of playlist {playlist.id}")
+
+
+def _orders_between(before, after, count):
+    """
+    ``count`` increasing orders strictly between ``before`` and ``after``
+    (``after`` None means the end of the playlist), or None if they do not fit.
+    """
+    if after is None:
+        return [before + GAP * i for i in range(1, count + 1)]
+    step = (after - before) // (count + 1)
+    if step < 1:
+        return None
+    return [before + step * i for i in range(1, count + 1)]
+
+
+def _neighbors(playlist, position, exclude_ids=()):
+    """Orders of the entries just before and at ``position``, ignoring ``exclude_ids``"""
+    orders = _entries(playlist).exclude(id__in=exclude_ids).values_list('order', flat=True)
+    if position <= 0:
+        before, after = 0, orders.first()
+    else:
+        pair = list(orders[position - 1:position + 1])
+        if not pair:
+            before, after = orders.last() or 0, None
+        else:
+            before, after = pair[0], pair[1] if len(pair) > 1 else None
+    return before, after
+
+
+def add_tracks(playlist, track_ids, position=None):
+    """
+    Insert ``track_ids`` at ``position`` (append when None) with one INSERT.
+    Tracks already in the playlist are skipped. Returns the entries created.
+    """
+    existing = set(_entries(playlist).filter(track_id__in=track_ids).values_list('track_id', flat=True))
+    track_ids = [track_id for track_id in dict.fromkeys(track_ids) if track_id not in existing]
+    if not track_ids:
+        return []
+
+    with transaction.atomic():
+        if position is None:
+            last = _entries(playlist).aggregate(last=Max('order'))['last'] or 0
+            orders = _orders_between(last, None, len(track_ids))
+        else:
+            orders = _orders_between(*_neighbors(playlist, position), len(track_ids))
+            if orders is None:
+                _renumber(playlist)
+                orders = _orders_between(*_neighbors(playlist, position), len(track_ids))
+        entries = PlaylistTrack.objects.bulk_create([
+            PlaylistTrack(playlist=playlist, track_id=track_id, order=order)
+            for track_id, order in zip(track_ids, orders)
+        ])
+        sync_service.record_changes('playlist', playlist.id, sync_service.track_changes('add', entries))
+        return entries
+
+
+def move_range(playlist, start, count, to):
+    """
+    Move ``count`` entries starting at position ``start`` so the first lands at
+    position ``to`` (counted without the moved entries). Only the moved rows are
+    written, unless the target gap is used up.
+    """
+    with transaction.atomic():
+        moving = list(_entries(playlist)[start:start + count])
+        if not moving:
+            return 0
+        moving_ids = [entry.id for entry in moving]
+        orders = _orders_between(*_neighbors(playlist, to, moving_ids), len(moving))
+        if orders is None:
+            _renumber(playlist)
+            orders = _orders_between(*_neighbors(playlist, to, moving_ids), len(moving))
+        for entry, order in zip(moving, orders):
+            entry.order = order
+        PlaylistTrack.objects.bulk_update(moving, ['order'])
+        sync_service.record_changes('playlist', playlist.id, sync_service.track_changes('move', moving))
+    return len(moving)
+
+
+def _delete(playlist, entries):
+    removed = list(entries.only('id', 'track_id'))
+    PlaylistTrack.objects.filter(id__in=[entry.id for entry in removed]).delete()
+    sync_service.record_changes('playlist', playlist.id, sync_service.track_changes('remove', removed))
+    return len(removed)
+
+
+def remove_tracks(playlist, track_ids):
+    with transaction.atomic():
+        return _delete(playlist, _entries(playlist).filter(track_id__in=track_ids))
+
+
+def set_tracks(playlist, track_ids):
+    """Replace the playlist content with ``track_ids`` in that order"""
+    with transaction.atomic():
+        _delete(playlist, _entries(playlist))
+        return add_tracks(playlist, track_ids)
@@ -1,36 +1,49 @@
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.core.cache import cache
-from django.db.models import Count
 from django.db.models import Q
-from .serializers import PlaylistSerializer
+from .serializers import PlaylistSerializer, PlaylistSummarySerializer, PlaylistTrackSerializer, with_summary
 from .models import Playlist
+from .services import ordering_service
 from tracks.models import Track
 from user_activity.models import UserActivity
+from tracks.services.archive_service import zip_download_response
+from core.pagination import SizedPageNumberPagination
+from core.views import DynamicFieldsViewMixin
+from core import cached
+from core.response_cache import cache_response
 
-class PlaylistViewSet(viewsets.ModelViewSet):
+class PlaylistViewSet(DynamicFieldsViewMixin, viewsets.ModelViewSet):
     serializer_class = PlaylistSerializer
     permission_classes = [permissions.IsAuthenticated]
+    # Danh sách và chi tiết chỉ trả về bản tóm tắt; track lấy qua /playlists/{id}/tracks/
+    summary_actions = ('list', 'retrieve', 'featured', 'public')
+
+    def get_serializer_class(self):
+        if self.action in self.summary_actions:
+            return PlaylistSummarySerializer
+        if self.action == 'tracks':
+            return PlaylistTrackSerializer
+        return PlaylistSerializer
     
     def get_queryset(self):
-        queryset = Playlist.objects.select_related('user').prefetch_related('tracks')
-        
         if self.action == 'list':
             # Cache the queryset for 5 minutes
-            cache_key = f'playlist_list_{self.request.user.id}'
-            cached_queryset = cache.get(cache_key)
-            if cached_queryset is None:
-                cached_queryset = list(queryset.filter(user=self.request.user))
-                cache.set(cache_key, cached_queryset, 300)  # 5 minutes cache
-            return cached_queryset
-            
+            return cached.get_or_compute(
+                f'playlist_list_{self.request.user.id}',
+                lambda: list(with_summary(Playlist.objects.filter(user=self.request.user))),
+                300,
+            )
+
+        queryset = Playlist.objects.select_related('user')
+        if self.action == 'retrieve':
+            queryset = with_summary(queryset)
         return queryset.filter(Q(is_public=True) | Q(user=self.request.user))
 
     def perform_create(self, serializer):
         playlist = serializer.save(user=self.request.user)
         # Invalidate user's playlist cache
-        cache.delete(f'playlist_list_{self.request.user.id}')
+        cached.invalidate(f'playlist_list_{self.request.user.id}')
         # Record create playlist activity
         UserActivity.objects.create(
             user=self.request.user,
@@ -41,7 +54,7 @@ class PlaylistViewSet(viewsets.ModelViewSet):
     def perform_update(self, serializer):
         serializer.save()
         # Invalidate user's playlist cache
-        cache.delete(f'playlist_list_{self.request.user.id}')
+        cached.invalidate(f'playlist_list_{self.request.user.id}')
 
     def perform_destroy(self, instance):
         # Record user activity before deletion
@@ -52,23 +65,16 @@ class PlaylistViewSet(viewsets.ModelViewSet):
         )
         instance.delete()
         # Invalidate user's playlist cache
-        cache.delete(f'playlist_list_{self.request.user.id}')
+        cached.invalidate(f'playlist_list_{self.request.user.id}')
 
     @action(detail=False)
+    # Same list for every signed-in user
+    @cache_response(timeout=1800, anonymous_only=False, playlists=True)
     def featured(self, request):
         """Get featured playlists"""
-        cache_key = 'featured_playlists'
-        cached_playlists = cache.get(cache_key)
-        
-        if cached_playlists is None:
-            # Get playlists with most tracks
-            playlists = Playlist.objects.annotate(
-                track_count=Count('tracks')
-            ).order_by('-track_count')[:10]
-            cached_playlists = self.get_serializer(playlists, many=True).data
-            cache.set(cache_key, cached_playlists, 1800)  # 30 minutes cache
-            
-        return Response(cached_playlists)
+        # Get public playlists with most tracks
+        playlists = with_summary(Playlist.objects.filter(is_public=True)).order_by('-tracks_count')[:10]
+        return Response(self.get_serializer(playlists, many=True).data)
 
     @action(detail=True, methods=['post'],url_path='add-track/(?P<track_id>[^/.]+)')
     def add_track(self, request, pk=None, track_id=None):
@@ -76,7 +82,7 @@ class PlaylistViewSet(viewsets.ModelViewSet):
             playlist = self.get_object()
             track = Track.objects.get(id=track_id)
             
-            playlist.tracks.add(track)
+            ordering_service.add_tracks(playlist, [track.id])
             # Create activity record
             UserActivity.objects.create(
                 user=self.request.user,
@@ -91,6 +97,50 @@ class PlaylistViewSet(viewsets.ModelViewSet):
         except Track.DoesNotExist:
             return Response({'error': 'Track not found'}, status=status.HTTP_404_NOT_FOUND)
 
+    @action(detail=True, methods=['post'], url_path='add-tracks')
+    def add_tracks(self, request, pk=None):
+        """Thêm nhiều track một lần: {"track_ids": [...], "position": optional index}"""
+        playlist = self.get_object()
+        track_ids = request.data.get('track_ids')
+        position = request.data.get('position')
+        if not isinstance(track_ids, list) or not track_ids:
+            return Response({'error': 'track_ids must be a non-empty list'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            track_ids = [int(track_id) for track_id in track_ids]
+            position = int(position) if position is not None else None
+        except (TypeError, ValueError):
+            return Response({'error': 'track_ids and position must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+
+        found = set(Track.objects.filter(id__in=track_ids).values_list('id', flat=True))
+        missing = [track_id for track_id in track_ids if track_id not in found]
+        if missing:
+            return Response({'error': 'Track not found', 'track_ids': missing}, status=status.HTTP_404_NOT_FOUND)
+
+        entries = ordering_service.add_tracks(playlist, track_ids, position=position)
+        UserActivity.objects.bulk_create([
+            UserActivity(user=request.user, playlist=playlist, track_id=entry.track_id, action='add_to_playlist')
+            for entry in entries
+        ])
+        cached.invalidate(f'playlist_list_{self.request.user.id}')
+        return Response({'status': 'tracks added', 'added': len(entries)})
+
+    @action(detail=True, methods=['post'])
+    def move(self, request, pk=None):
+        """Di chuyển một đoạn: {"start": index, "count": n, "to": index}"""
+        playlist = self.get_object()
+        try:
+            start = int(request.data['start'])
+            count = int(request.data.get('count', 1))
+            to = int(request.data['to'])
+        except (KeyError, TypeError, ValueError):
+            return Response({'error': 'start and to are required integers'}, status=status.HTTP_400_BAD_REQUEST)
+        if start < 0 or count < 1 or to < 0:
+            return Response({'error': 'start/to must be >= 0 and count >= 1'}, status=status.HTTP_400_BAD_REQUEST)
+
+        moved = ordering_service.move_range(playlist, start, count, to)
+        cached.invalidate(f'playlist_list_{self.request.user.id}')
+        return Response({'status': 'tracks moved', 'moved': moved})
+
     @action(detail=True, methods=['post'])
     def remove_track(self, request, pk=None):
         playlist = self.get_object()
@@ -100,8 +150,8 @@ class PlaylistViewSet(viewsets.ModelViewSet):
             return Response({'error': 'track_id is required'}, status=status.HTTP_400_BAD_REQUEST)
             
         try:
-            playlist.tracks.remove(track_id)
-            cache.delete(f'playlist_list_{self.request.user.id}')
+            ordering_service.remove_tracks(playlist, [track_id])
+            cached.invalidate(f'playlist_list_{self.request.user.id}')
             return Response({'status': 'track removed'})
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
@@ -112,8 +162,28 @@ class PlaylistViewSet(viewsets.ModelViewSet):
         Return all public playlists, optionally filter by user.
         """
         user = request.query_params.get('user')
-        qs = Playlist.objects.filter(is_public=True)
+        qs = with_summary(Playlist.objects.filter(is_public=True))
         if user:
             qs = qs.filter(user__username=user)
         serializer = self.get_serializer(qs, many=True)
-        return Response(serializer.data) 
\ No newline at end of file
+        return Response(serializer.data)
+
+    @action(detail=True, methods=['get'], pagination_class=SizedPageNumberPagination)
+    def tracks(self, request, pk=None):
+        """Track của playlist theo thứ tự, phân trang: ?page=N&size=M"""
+        playlist = self.get_object()
+        entries = playlist.playlist_tracks.select_related('track__artist', 'track__album') \
+            .prefetch_related('track__genres').order_by('order', 'id')
+        page = self.paginate_queryset(entries)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    @action(detail=True, methods=['get'])
+    def download(self, request, pk=None):
+        """Download every downloadable track of the playlist as one streamed ZIP"""
+        playlist = self.get_object()
+        tracks = [entry.track for entry in playlist.playlist_tracks.select_related('track__artist')]
+        response = zip_download_response(request, tracks, playlist.name)
+        if response is None:
+            return Response({'error': 'No downloadable tracks in this playlist'}, status=status.HTTP_404_NOT_FOUND)
+        return response
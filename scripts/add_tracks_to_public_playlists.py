@@ -13,6 +13,7 @@ django.setup()
 
 from tracks.models import Track
 from playlists.models import Playlist
+from playlists.services import ordering_service
 
 # Nếu Playlist có trường is_public thì lọc, không thì lấy tất cả
 try:
@@ -31,7 +32,7 @@ for playlist in playlists:
         continue
     # Random 10 track
     to_add = random.sample(available_ids, min(10, len(available_ids)))
-    playlist.tracks.add(*to_add)
+    ordering_service.add_tracks(playlist, to_add)
     print(f"Đã thêm {len(to_add)} track vào playlist '{playlist.name}'")
 
 print("Done!") 
\ No newline at end of file
@@ -7,4 +7,22 @@ source /home/namdt/Code/spotify.django.backend/venv/bin/activate
 cd /home/namdt/Code/spotify.django.backend
 
 # Run the cleanup script
-python manage.py cleanup_tokens 
\ No newline at end of file
+python manage.py cleanup_tokens 
+
+# Drop abandoned chunked uploads
+python manage.py cleanup_uploads
+
+# Warm home feeds for active users
+python manage.py precompute_home_feeds
+
+# Rebuild the "similar tracks" lists from co-listening
+python manage.py build_similar_tracks
+
+# Rebuild the leaderboards, also after a Redis restart
+python manage.py rebuild_leaderboards
+
+# Trim the playlist/favorites/queue change log
+python manage.py prune_sync_changes
+
+# Correct drift in the incrementally updated artist stats
+python manage.py refresh_artist_stats
@@ -12,20 +12,22 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'spotify.settings')
 django.setup()
 
 from tracks.models import Track
+from tracks.services.blob_service import register_stored_file
 from artists.models import Artist
+from core.catalog_snapshot import get_snapshot
 
 TRACKS_DIR = os.path.join(project_dir, 'media', 'tracks')
 
-# Lấy danh sách nghệ sĩ hiện có
-artist_objs = {a.name.lower(): a for a in Artist.objects.all()}
 unknown_artist, _ = Artist.objects.get_or_create(name='Unknown Artist', defaults={'bio': 'Unknown'})
 
 def guess_artist_from_filename(filename):
     # Tách tên nghệ sĩ nếu có trong tên file (ví dụ: "Tên_Bài_Hát_feat._Nghệ_Sĩ.mp3")
+    # Tên nghệ sĩ lấy từ snapshot trong bộ nhớ, không query lại mỗi file
     name = os.path.splitext(filename)[0]
-    for artist_name in artist_objs:
+    for artist_id, artist_name in get_snapshot().artists.items():
+        artist_name = artist_name.lower()
         if artist_name.replace(' ', '_') in name.lower() or artist_name in name.lower():
-            return artist_objs[artist_name]
+            return Artist.cached.get_by_pk(artist_id)
     return unknown_artist
 
 def import_tracks():
@@ -35,8 +37,9 @@ def import_tracks():
     for f in files:
         title = os.path.splitext(f)[0].replace('_', ' ')
         file_path = os.path.join('tracks', f)
-        # Check duplicate by file or title
-        if Track.objects.filter(title=title).exists() or Track.objects.filter(file=file_path).exists():
+        # Check duplicate by content hash, so renamed copies are caught too
+        blob, _ = register_stored_file(file_path)
+        if blob.tracks.exists():
             print(f"Track already exists: {title}")
             continue
         artist = guess_artist_from_filename(f)
@@ -49,7 +52,8 @@ def import_tracks():
         track = Track.objects.create(
             title=title,
             artist=artist,
-            file=file_path,
+            file=blob.file.name,
+            audio_blob=blob,
             duration=duration,
         )
         print(f"Added track: {title} - {artist.name}")
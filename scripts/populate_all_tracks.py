@@ -15,6 +15,7 @@ from django.contrib.auth.models import User
 from artists.models import Artist
 from tracks.models import Track
 from playlists.models import Playlist
+from playlists.services import ordering_service
 
 def create_artists_from_tracks():
     # Get all MP3 files from the tracks directory
@@ -84,7 +85,9 @@ def create_tracks(artists):
             )
             
             if created:
-                track.file.save(mp3_file, File(f), save=True)
+                # Track.save() stores the audio by content hash
+                track.file = File(f, name=mp3_file)
+                track.save()
                 print(f"Created track: {track.title} by {track.artist.name}")
             else:
                 print(f"Track already exists: {track.title} by {track.artist.name}")
@@ -116,8 +119,7 @@ def create_system_playlists(tracks):
     )
     
     # Add all tracks to the playlist
-    for track in tracks:
-        playlist.tracks.add(track)
+    ordering_service.add_tracks(playlist, [track.id for track in tracks])
     
     print(f"{'Created' if created else 'Updated'} playlist: {playlist.name} with {playlist.tracks.count()} tracks")
 
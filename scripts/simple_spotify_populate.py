@@ -20,6 +20,7 @@ from tracks.models import Track
 from genres.models import Genre
 from django.contrib.auth.models import User
 from playlists.models import Playlist
+from playlists.services import ordering_service
 
 # Import Spotify API credentials from config
 try:
@@ -213,7 +214,9 @@ def populate_tracks(token, album_tuples, tracks_per_album=5):
                 # This is a placeholder - in production you'd need real audio files
                 if created:
                     dummy_file = ContentFile(b"This is a placeholder for audio content", name=f"{track.title.replace(' ', '_')}.mp3")
-                    track.file.save(f"{track.title.replace(' ', '_')}.mp3", dummy_file, save=True)
+                    # Identical placeholders end up as a single stored blob
+                    track.file = dummy_file
+                    track.save()
                 
                 tracks_created.append(track)
                 print(f"Added track: {track.title}")
@@ -257,8 +260,7 @@ def create_sample_playlists(tracks, num_playlists=3):
             num_tracks = random.randint(5, min(15, len(tracks)))
             selected_tracks = random.sample(list(tracks), num_tracks)
             
-            for track in selected_tracks:
-                playlist.tracks.add(track)
+            ordering_service.add_tracks(playlist, [track.id for track in selected_tracks])
         
             playlists_created.append(playlist)
             print(f"Created playlist: {playlist.name} with {num_tracks} tracks")
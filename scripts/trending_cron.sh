@@ -0,0 +1,12 @@
+#!/bin/bash
+
+# Refresh trending lists. Schedule separately from cleanup_cron.sh, every 15 minutes:
+# */15 * * * * /home/namdt/Code/spotify.django.backend/scripts/trending_cron.sh
+
+# Activate the virtual environment
+source /home/namdt/Code/spotify.django.backend/venv/bin/activate
+
+# Go to project directory
+cd /home/namdt/Code/spotify.django.backend
+
+python manage.py compute_trending
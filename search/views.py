@@ -2,7 +2,7 @@ from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.db.models import Q
-from django.core.cache import cache
+from core import cached
 from .models import SearchHistory
 from .serializers import SearchHistorySerializer
 from tracks.models import Track
@@ -12,7 +12,7 @@ from playlists.models import Playlist
 from tracks.serializers import TrackSerializer
 from artists.serializers import ArtistSerializer
 from albums.serializers import AlbumSerializer
-from playlists.serializers import PlaylistSerializer
+from playlists.serializers import PlaylistSummarySerializer, with_summary
 import logging
 
 logger = logging.getLogger(__name__)
@@ -26,11 +26,7 @@ class SearchViewSet(viewsets.ViewSet):
         if not query:
             return Response({"error": "Missing search query"}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Cache key for search results
-        cache_key = f'search_results_{query}'
-        cached_results = cache.get(cache_key)
-        
-        if cached_results is None:
+        def search():
             # Search in different models
             tracks = Track.objects.filter(
                 Q(title__icontains=query) |
@@ -51,25 +47,25 @@ class SearchViewSet(viewsets.ViewSet):
             
             # Try to get playlists, catch exception if table doesn't exist
             try:
-                playlists = Playlist.objects.filter(
+                playlists = with_summary(Playlist.objects.all()).filter(
                     Q(name__icontains=query) |
                     Q(description__icontains=query)
                 ).filter(is_public=True)[:10]
-                playlist_data = PlaylistSerializer(playlists, many=True).data
+                playlist_data = PlaylistSummarySerializer(playlists, many=True, context={'request': request}).data
             except Exception as e:
                 logger.error(f"Error getting playlists in search: {str(e)}")
                 playlist_data = []
 
             # Prepare results
-            cached_results = {
+            return {
                 "tracks": TrackSerializer(tracks, many=True).data,
                 "artists": ArtistSerializer(artists, many=True).data,
                 "albums": AlbumSerializer(albums, many=True).data,
                 "playlists": playlist_data
             }
-            
-            # Cache results for 5 minutes
-            cache.set(cache_key, cached_results, 300)
+
+        # Cache results for 5 minutes
+        cached_results = cached.get_or_compute(f'search_results_{query}', search, 300)
 
         # Record search history for authenticated users
         if request.user.is_authenticated:
@@ -70,7 +70,9 @@ INSTALLED_APPS = [
     'stream_queue',
     'user_activity',
     'admin_api',
-    'search'
+    'search',
+    'core',
+    'sync',
 ]
 
 SITE_ID = 1  # Cần thiết cho django-allauth
@@ -84,6 +86,16 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ),
     'UNAUTHENTICATED_USER': None,
+    # orjson cho JSON (tự fallback về encoder chuẩn nếu thiếu orjson)
+    'DEFAULT_RENDERER_CLASSES': (
+        'core.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'core.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
     'DEFAULT_SCHEMA_CLASS': 'rest_framework.schemas.coreapi.AutoSchema',
     'EXCEPTION_HANDLER': 'rest_framework.views.exception_handler',
 }
@@ -262,6 +274,17 @@ AWS_S3_REGION_NAME = os.getenv("AWS_REGION")
 AWS_S3_FILE_OVERWRITE = False
 AWS_DEFAULT_ACL = None
 AWS_S3_CUSTOM_DOMAIN = f'{AWS_STORAGE_BUCKET_NAME}.s3.amazonaws.com'
+# Object names are never reused (FILE_OVERWRITE = False), so browsers/CDN can cache them forever
+AWS_S3_OBJECT_PARAMETERS = {
+    'CacheControl': os.getenv("AWS_S3_CACHE_CONTROL", "public, max-age=31536000, immutable"),
+}
+# Endpoint S3 tùy chỉnh (MinIO/localstack khi chạy local)
+AWS_S3_ENDPOINT_URL = os.getenv("AWS_S3_ENDPOINT_URL")
+
+# Media delivery: "proxy" streams audio through Django, "presigned" redirects
+# stream/download to a presigned S3 URL so Django never touches the bytes
+MEDIA_DELIVERY_MODE = os.getenv("MEDIA_DELIVERY_MODE", "proxy")
+MEDIA_PRESIGNED_URL_EXPIRY = int(os.getenv("MEDIA_PRESIGNED_URL_EXPIRY", "3600"))
 
 # Dùng S3 làm nơi lưu trữ file mặc định
 DEFAULT_FILE_STORAGE = 'storages.backends.s3boto3.S3Boto3Storage'
@@ -283,10 +306,78 @@ if 'test' in sys.argv:
         }
     }
 
+# Redis (leaderboards). Để trống thì các bảng xếp hạng đọc thẳng từ database
+REDIS_URL = os.getenv("REDIS_URL")
+REDIS_SOCKET_TIMEOUT = float(os.getenv("REDIS_SOCKET_TIMEOUT", "0.5"))
+
+# Có Redis thì cache dùng chung giữa các worker gunicorn (cần cho khóa single-flight của core.cached)
+if REDIS_URL and 'test' not in sys.argv:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+            'OPTIONS': {
+                'socket_timeout': REDIS_SOCKET_TIMEOUT,
+                'socket_connect_timeout': REDIS_SOCKET_TIMEOUT,
+            },
+        }
+    }
+# Thời gian tối đa giữ khóa khi tính lại một giá trị cache (giây)
+CACHE_LOCK_TIMEOUT = int(os.getenv("CACHE_LOCK_TIMEOUT", "10"))
+
+# Trending: điểm giảm một nửa sau mỗi TRENDING_HALF_LIFE_HOURS (compute_trending chạy theo lịch)
+TRENDING_HALF_LIFE_HOURS = float(os.getenv("TRENDING_HALF_LIFE_HOURS", "24"))
+TRENDING_LIST_SIZE = int(os.getenv("TRENDING_LIST_SIZE", "50"))
+TRENDING_BUCKET_RETENTION_DAYS = int(os.getenv("TRENDING_BUCKET_RETENTION_DAYS", "14"))
+
+# Similar tracks (build_similar_tracks): số track tương tự lưu cho mỗi track
+SIMILAR_TRACKS_PER_TRACK = int(os.getenv("SIMILAR_TRACKS_PER_TRACK", "50"))
+
+# Home feed cá nhân hóa (/api/home/): thời gian giữ feed đã tính trong cache
+HOME_FEED_TTL = int(os.getenv("HOME_FEED_TTL", str(6 * 60 * 60)))
+HOME_FEED_ACTIVE_DAYS = int(os.getenv("HOME_FEED_ACTIVE_DAYS", "7"))
+
+# Radio cho queue: thêm RADIO_BATCH_SIZE bài khi chỉ còn RADIO_REFILL_THRESHOLD bài phía sau
+RADIO_BATCH_SIZE = int(os.getenv("RADIO_BATCH_SIZE", "20"))
+RADIO_REFILL_THRESHOLD = int(os.getenv("RADIO_REFILL_THRESHOLD", "2"))
+
+# Delta sync: client cũ hơn log (hoặc thiếu quá nhiều thay đổi) phải tải lại toàn bộ
+SYNC_CHANGE_RETENTION_DAYS = int(os.getenv("SYNC_CHANGE_RETENTION_DAYS", "30"))
+SYNC_MAX_CHANGES = int(os.getenv("SYNC_MAX_CHANGES", "1000"))
+
+# Số track id tối đa cho một lần gọi POST /api/favorites/contains/
+FAVORITES_CONTAINS_MAX_IDS = int(os.getenv("FAVORITES_CONTAINS_MAX_IDS", "500"))
+
+# Cache toàn bộ response của các endpoint catalog cho khách (giây); ghi catalog sẽ làm mới ngay
+RESPONSE_CACHE_TIMEOUT = int(os.getenv("RESPONSE_CACHE_TIMEOUT", "60"))
+
+# Cache từng object (track/album/artist/genre) khi đọc chi tiết (giây); lượt nghe/tải có thể trễ tới mức này
+OBJECT_CACHE_TIMEOUT = int(os.getenv("OBJECT_CACHE_TIMEOUT", "300"))
+
+# Mỗi worker giữ bản sao genre/artist/album trong bộ nhớ; kiểm tra phiên bản dùng chung tối đa mỗi N giây
+CATALOG_SNAPSHOT_CHECK_INTERVAL = float(os.getenv("CATALOG_SNAPSHOT_CHECK_INTERVAL", "1"))
+# Tuổi tối đa của bản sao (giây): dựng lại dù phiên bản không đổi, vì cache LocMem (không có REDIS_URL) không chia sẻ giữa các worker
+CATALOG_SNAPSHOT_MAX_AGE = float(os.getenv("CATALOG_SNAPSHOT_MAX_AGE", "300"))
+
+# Duyệt track theo facet (genre/artist/album): thời gian cache số đếm (giây) và số giá trị tối đa mỗi facet
+FACET_CACHE_TIMEOUT = int(os.getenv("FACET_CACHE_TIMEOUT", "600"))
+FACET_MAX_VALUES = int(os.getenv("FACET_MAX_VALUES", "50"))
+
+# /api/batch/: số request GET tối đa mỗi batch và số thread khi chạy song song
+BATCH_MAX_REQUESTS = int(os.getenv("BATCH_MAX_REQUESTS", "20"))
+BATCH_MAX_WORKERS = int(os.getenv("BATCH_MAX_WORKERS", "4"))
+
 # Cấu hình local media files
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR,'media')
 
+# Resumable chunked uploads (/api/uploads/)
+# Staged parts live outside MEDIA_ROOT so half-uploaded files are never served
+UPLOAD_STAGING_ROOT = os.getenv("UPLOAD_STAGING_ROOT", os.path.join(BASE_DIR, 'tmp', 'uploads'))
+UPLOAD_MAX_CHUNK_SIZE = int(os.getenv("UPLOAD_MAX_CHUNK_SIZE", str(8 * 1024 * 1024)))  # 8MB
+UPLOAD_MAX_VIDEO_SIZE = int(os.getenv("UPLOAD_MAX_VIDEO_SIZE", str(500 * 1024 * 1024)))  # 500MB
+UPLOAD_SESSION_TTL_HOURS = int(os.getenv("UPLOAD_SESSION_TTL_HOURS", "24"))
+
 # Chỉ sử dụng S3 trong production
 if ENVIRONMENT == "production":
     DEFAULT_FILE_STORAGE = 'storages.backends.s3boto3.S3Boto3Storage'
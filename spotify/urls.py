@@ -38,6 +38,8 @@ urlpatterns = [
     path("api/", include("user_activity.urls")),
     path("api/", include("analytics.urls")),
     path("api/", include("stream_queue.urls")),
+    path("api/", include("sync.urls")),
+    path("api/", include("core.urls")),
     path("api/chat/", include("chatbot.urls")),
 
     # Media (Custom stream handler)
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.7 on 2026-10-19 04:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stream_queue', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='queue',
+            name='radio_enabled',
+            field=models.BooleanField(default=False),
+        ),
+    ]
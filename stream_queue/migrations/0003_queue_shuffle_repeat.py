@@ -0,0 +1,33 @@
+# Generated by Django 5.1.7 on 2026-10-19 04:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stream_queue', '0002_queue_radio_enabled'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='queue',
+            name='repeat_mode',
+            field=models.CharField(choices=[('off', 'Off'), ('all', 'Repeat queue'), ('one', 'Repeat track')], default='off', max_length=3),
+        ),
+        migrations.AddField(
+            model_name='queue',
+            name='shuffle_enabled',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='queue',
+            name='shuffle_order',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='queue',
+            name='shuffle_seed',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -3,11 +3,24 @@ from django.conf import settings
 from music.models import Track
 
 class Queue(models.Model):
+    REPEAT_CHOICES = (
+        ('off', 'Off'),
+        ('all', 'Repeat queue'),
+        ('one', 'Repeat track'),
+    )
+
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='queues')
     tracks = models.ManyToManyField(Track, through='QueueTrack', related_name='in_queues')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     current_index = models.PositiveIntegerField(default=0)
+    # Tự thêm bài liên quan khi queue sắp hết
+    radio_enabled = models.BooleanField(default=False)
+    # Shuffle lưu dạng seed + hoán vị vị trí (uint32), không ghi lại QueueTrack.order
+    shuffle_enabled = models.BooleanField(default=False)
+    shuffle_seed = models.BigIntegerField(null=True, blank=True)
+    shuffle_order = models.BinaryField(null=True, blank=True)
+    repeat_mode = models.CharField(max_length=3, choices=REPEAT_CHOICES, default='off')
 
 class QueueTrack(models.Model):
     queue = models.ForeignKey(Queue, on_delete=models.CASCADE)
@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from .models import Queue, QueueTrack
 from music.serializers import TrackSerializer
+from favorites.services import favorite_set_service
 
 class QueueTrackSerializer(serializers.ModelSerializer):
     track = TrackSerializer(read_only=True)
@@ -12,4 +13,14 @@ class QueueSerializer(serializers.ModelSerializer):
     tracks = QueueTrackSerializer(source='queuetrack_set', many=True, read_only=True)
     class Meta:
         model = Queue
-        fields = ['id', 'user', 'tracks', 'created_at', 'updated_at'] 
\ No newline at end of file
+        fields = ['id', 'user', 'tracks', 'current_index', 'radio_enabled', 'shuffle_enabled', 'repeat_mode',
+                  'created_at', 'updated_at']
+        read_only_fields = ['shuffle_enabled']
+
+    def to_representation(self, instance):
+        request = self.context.get('request')
+        if request and request.user and request.user.is_authenticated:
+            # Queued tracks are nested one by one, so is_favorite is looked up here for all of them at once
+            track_ids = [entry.track_id for entry in instance.queuetrack_set.all()]
+            self.context['favorite_ids'] = favorite_set_service.contains(request.user.id, track_ids)
+        return super().to_representation(instance)
\ No newline at end of file
@@ -0,0 +1,77 @@
+import random
+from array import array
+
+REPEAT_OFF = 'off'
+REPEAT_ALL = 'all'
+REPEAT_ONE = 'one'
+
+
+def _pack(positions):
+    return array('I', positions).tobytes()
+
+
+def _unpack(data):
+    positions = array('I')
+    positions.frombytes(bytes(data))
+    return positions.tolist()
+
+
+def play_order(queue, count):
+    """
+    Queue positions (index into tracks sorted by ``order``) in the order they play.
+
+    With shuffle the stored permutation is used; tracks appended after
+    shuffling play afterwards in queue order, and positions that no longer
+    exist are skipped.
+    """
+    if not queue.shuffle_enabled or not queue.shuffle_order:
+        return list(range(count))
+    shuffled = _unpack(queue.shuffle_order)
+    return [position for position in shuffled if position < count] + list(range(len(shuffled), count))
+
+
+def set_shuffle(queue, enabled, count, seed=None):
+    """
+    Turn shuffle on/off with a single-row write; QueueTrack rows are never touched.
+    The current track plays first, the rest follow in an order derived from ``seed``.
+    """
+    if enabled:
+        seed = seed if seed is not None else random.getrandbits(63)
+        current = min(queue.current_index, max(count - 1, 0))
+        rest = [position for position in range(count) if position != current]
+        random.Random(seed).shuffle(rest)
+        queue.shuffle_seed = seed
+        queue.shuffle_order = _pack(([current] if count else []) + rest)
+    else:
+        queue.shuffle_seed = None
+        queue.shuffle_order = None
+    queue.shuffle_enabled = enabled
+    queue.save(update_fields=['shuffle_enabled', 'shuffle_seed', 'shuffle_order'])
+
+
+def step(queue, count, direction, skip=False):
+    """
+    Queue position of the next (direction=1) or previous (-1) track, or None past the end.
+    Repeat-one keeps the current track unless the user skipped explicitly.
+    """
+    if not count:
+        return None
+    current = min(queue.current_index, count - 1)
+    if queue.repeat_mode == REPEAT_ONE and not skip:
+        return current
+
+    order = play_order(queue, count)
+    target = order.index(current) + direction
+    if 0 <= target < count:
+        return order[target]
+    if queue.repeat_mode == REPEAT_ALL:
+        return order[target % count]
+    return None
+
+
+def remaining(queue, count):
+    """How many tracks are left to play after the current one"""
+    if not count:
+        return 0
+    current = min(queue.current_index, count - 1)
+    return count - 1 - play_order(queue, count).index(current)
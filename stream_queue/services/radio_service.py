@@ -0,0 +1,75 @@
+import logging
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Max
+from tracks.models import Track, TrackNeighbors
+from sync.services import sync_service
+from ..models import QueueTrack
+from .playback_service import remaining
+
+logger = logging.getLogger(__name__)
+
+# Candidates per source; the list is cached per seed track
+CANDIDATES_PER_SOURCE = 50
+CANDIDATES_CACHE_TIMEOUT = 60 * 60
+
+
+def _cache_key(track_id):
+    return f'radio_candidates_{track_id}'
+
+
+def radio_candidates(track):
+    """
+    Track ids to continue after ``track``, best first: co-listening
+    neighbors, then the same artist, then the same genres.
+    Each source is one indexed query and the result is cached per seed.
+    """
+    key = _cache_key(track.id)
+    candidates = cache.get(key)
+    if candidates is not None:
+        return candidates
+
+    ids = []
+    try:
+        ids += [track_id for track_id, _ in TrackNeighbors.objects.get(track_id=track.id).neighbors(CANDIDATES_PER_SOURCE)]
+    except TrackNeighbors.DoesNotExist:
+        pass
+    ids += Track.objects.filter(artist_id=track.artist_id).exclude(id=track.id) \
+        .order_by('-play_count').values_list('id', flat=True)[:CANDIDATES_PER_SOURCE]
+    genre_ids = list(track.genres.values_list('id', flat=True))
+    if genre_ids:
+        ids += Track.objects.filter(genres__id__in=genre_ids).exclude(id=track.id) \
+            .order_by('-play_count').values_list('id', flat=True)[:CANDIDATES_PER_SOURCE]
+
+    candidates = list(dict.fromkeys(ids))
+    cache.set(key, candidates, CANDIDATES_CACHE_TIMEOUT)
+    return candidates
+
+
+def extend_queue(queue):
+    """
+    Append a batch of radio tracks when the queue is about to run out.
+    Returns the number of tracks added.
+    """
+    if not queue.radio_enabled:
+        return 0
+
+    entries = list(queue.queuetrack_set.order_by('order').values_list('track_id', 'order'))
+    if not entries:
+        return 0
+    # Measured in play order, so it also holds while shuffling
+    if remaining(queue, len(entries)) > settings.RADIO_REFILL_THRESHOLD:
+        return 0
+
+    seed = Track.objects.get(id=entries[min(queue.current_index, len(entries) - 1)][0])
+    queued = {track_id for track_id, _ in entries}
+    picked = [track_id for track_id in radio_candidates(seed) if track_id not in queued][:settings.RADIO_BATCH_SIZE]
+    if not picked:
+        return 0
+
+    next_order = (queue.queuetrack_set.aggregate(max_order=Max('order'))['max_order'] or 0) + 1
+    added = [QueueTrack(queue=queue, track_id=track_id, order=next_order + i) for i, track_id in enumerate(picked)]
+    QueueTrack.objects.bulk_create(added, ignore_conflicts=True)
+    sync_service.record_changes('queue', queue.user_id, sync_service.track_changes('add', added))
+    logger.info(f"Radio added {len(picked)} tracks to queue {queue.id} after track {seed.id}")
+    return len(picked)
@@ -1,12 +1,17 @@
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
+from rest_framework.fields import BooleanField
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from django.db.models import prefetch_related_objects
 from .models import Queue, QueueTrack
 from .serializers import QueueSerializer, QueueTrackSerializer
 from music.models import Track
 from playlists.models import Playlist
 from albums.models import Album
+from .services.radio_service import extend_queue
+from .services import playback_service
+from sync.services import sync_service
 
 class QueueViewSet(viewsets.ModelViewSet):
     serializer_class = QueueSerializer
@@ -32,6 +37,13 @@ class QueueViewSet(viewsets.ModelViewSet):
         queue = self._cleanup_queues(request.user)
         if not queue:
             queue, _ = Queue.objects.get_or_create(user=request.user)
+        # Resolve every queued track from the object cache at once
+        prefetch_related_objects([queue], 'queuetrack_set')
+        queue_tracks = queue.queuetrack_set.all()
+        tracks = Track.cached.get_many(qt.track_id for qt in queue_tracks)
+        for qt in queue_tracks:
+            if qt.track_id in tracks:
+                qt.track = tracks[qt.track_id]
         serializer = self.get_serializer(queue)
         return Response(serializer.data)
 
@@ -40,24 +52,34 @@ class QueueViewSet(viewsets.ModelViewSet):
         queue, _ = Queue.objects.get_or_create(user=request.user)
         track = Track.objects.get(pk=track_id)
         order = queue.queuetrack_set.count()
-        QueueTrack.objects.create(queue=queue, track=track, order=order)
+        qt = QueueTrack.objects.create(queue=queue, track=track, order=order)
+        sync_service.record_changes('queue', request.user.id, sync_service.track_changes('add', [qt]))
         return Response({'status': 'track added to queue'})
 
     @action(detail=False, methods=['post'], url_path='remove-track/(?P<track_id>\\d+)')
     def remove_track(self, request, track_id=None):
         queue, _ = Queue.objects.get_or_create(user=request.user)
-        QueueTrack.objects.filter(queue=queue, track_id=track_id).delete()
+        removed = list(QueueTrack.objects.filter(queue=queue, track_id=track_id))
+        QueueTrack.objects.filter(id__in=[qt.id for qt in removed]).delete()
+        sync_service.record_changes('queue', request.user.id, sync_service.track_changes('remove', removed))
         return Response({'status': 'track removed from queue'})
 
     @action(detail=False, methods=['post'], url_path='add-playlist/(?P<playlist_id>\\d+)')
     def add_playlist(self, request, playlist_id=None):
         # Clean up existing queue first
+        removed = list(QueueTrack.objects.filter(queue__user=request.user))
         Queue.objects.filter(user=request.user).delete()
         # Create new queue and add playlist tracks
         queue = Queue.objects.create(user=request.user)
         playlist = Playlist.objects.get(pk=playlist_id)
-        for idx, track in enumerate(playlist.tracks.all()):
+        added = [
             QueueTrack.objects.create(queue=queue, track=track, order=idx)
+            for idx, track in enumerate(playlist.ordered_tracks)
+        ]
+        sync_service.record_changes(
+            'queue', request.user.id,
+            sync_service.track_changes('remove', removed) + sync_service.track_changes('add', added),
+        )
         return Response({'status': 'playlist added to queue'})
 
     @action(detail=False, methods=['post'], url_path='add-album/(?P<album_id>\\d+)')
@@ -65,14 +87,19 @@ class QueueViewSet(viewsets.ModelViewSet):
         queue, _ = Queue.objects.get_or_create(user=request.user)
         album = Album.objects.get(pk=album_id)
         current_order = queue.queuetrack_set.count()
-        for idx, track in enumerate(album.tracks.all()):
+        added = [
             QueueTrack.objects.create(queue=queue, track=track, order=current_order + idx)
+            for idx, track in enumerate(album.tracks.all())
+        ]
+        sync_service.record_changes('queue', request.user.id, sync_service.track_changes('add', added))
         return Response({'status': 'album added to queue'})
 
     @action(detail=False, methods=['post'], url_path='clear')
     def clear(self, request):
         queue, _ = Queue.objects.get_or_create(user=request.user)
+        removed = list(queue.queuetrack_set.all())
         queue.queuetrack_set.all().delete()
+        sync_service.record_changes('queue', request.user.id, sync_service.track_changes('remove', removed))
         return Response({'status': 'queue cleared'})
 
     @action(detail=False, methods=['get'], url_path='current-track')
@@ -99,10 +126,68 @@ class QueueViewSet(viewsets.ModelViewSet):
             # Thêm vào cuối queue
             order = len(queue_tracks)
             qt = QueueTrack.objects.create(queue=queue, track=track, order=order)
+            sync_service.record_changes('queue', request.user.id, sync_service.track_changes('add', [qt]))
             queue_tracks.append(qt)
             track_ids.append(track.id)
         # Cập nhật current_index trỏ đến vị trí track này
         current_idx = track_ids.index(track.id)
         queue.current_index = current_idx
         queue.save(update_fields=['current_index'])
-        return Response({'status': 'current track set', 'current_index': current_idx}) 
\ No newline at end of file
+        radio_added = extend_queue(queue)
+        return Response({'status': 'current track set', 'current_index': current_idx, 'radio_added': radio_added})
+
+    @action(detail=False, methods=['post'], url_path='radio')
+    def radio(self, request):
+        """Bật/tắt radio: {"enabled": true|false}"""
+        queue, _ = Queue.objects.get_or_create(user=request.user)
+        queue.radio_enabled = BooleanField().to_internal_value(request.data.get('enabled', True))
+        queue.save(update_fields=['radio_enabled'])
+        radio_added = extend_queue(queue)
+        return Response({'radio_enabled': queue.radio_enabled, 'radio_added': radio_added})
+
+    def _move(self, request, direction):
+        queue, _ = Queue.objects.get_or_create(user=request.user)
+        queue_tracks = list(queue.queuetrack_set.select_related('track').order_by('order'))
+        skip = BooleanField().to_internal_value(request.data.get('skip', True))
+        position = playback_service.step(queue, len(queue_tracks), direction, skip=skip)
+        if position is None:
+            return Response({'error': 'End of queue'}, status=status.HTTP_404_NOT_FOUND)
+
+        queue.current_index = position
+        queue.save(update_fields=['current_index'])
+        radio_added = extend_queue(queue) if direction > 0 else 0
+        data = QueueTrackSerializer(queue_tracks[position]).data
+        return Response({'current_index': position, 'track': data, 'radio_added': radio_added})
+
+    @action(detail=False, methods=['post'], url_path='next')
+    def next_track(self, request):
+        """Sang bài tiếp theo theo thứ tự phát (shuffle/repeat). {"skip": false} khi tự chuyển bài"""
+        return self._move(request, 1)
+
+    @action(detail=False, methods=['post'], url_path='previous')
+    def previous_track(self, request):
+        return self._move(request, -1)
+
+    @action(detail=False, methods=['post'], url_path='shuffle')
+    def shuffle(self, request):
+        """Bật/tắt shuffle: {"enabled": true|false, "seed": optional}"""
+        queue, _ = Queue.objects.get_or_create(user=request.user)
+        enabled = BooleanField().to_internal_value(request.data.get('enabled', True))
+        seed = request.data.get('seed')
+        try:
+            seed = int(seed) if seed is not None else None
+        except (TypeError, ValueError):
+            return Response({'error': 'seed must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        playback_service.set_shuffle(queue, enabled, queue.queuetrack_set.count(), seed=seed)
+        return Response({'shuffle_enabled': queue.shuffle_enabled, 'shuffle_seed': queue.shuffle_seed})
+
+    @action(detail=False, methods=['post'], url_path='repeat')
+    def repeat(self, request):
+        """Chế độ lặp: {"mode": "off"|"all"|"one"}"""
+        mode = request.data.get('mode')
+        if mode not in dict(Queue.REPEAT_CHOICES):
+            return Response({'error': 'mode must be one of off, all, one'}, status=status.HTTP_400_BAD_REQUEST)
+        queue, _ = Queue.objects.get_or_create(user=request.user)
+        queue.repeat_mode = mode
+        queue.save(update_fields=['repeat_mode'])
+        return Response({'repeat_mode': queue.repeat_mode})
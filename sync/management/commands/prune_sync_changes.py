@@ -0,0 +1,17 @@
+import logging
+from django.core.management.base import BaseCommand
+from sync.services.sync_service import prune
+
+logger = logging.getLogger(__name__)
+
+class Command(BaseCommand):
+    help = 'Delete old entries of the collection change log (clients behind them reload in full)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=None, help='Keep this many days of changes (default: SYNC_CHANGE_RETENTION_DAYS)')
+
+    def handle(self, *args, **options):
+        deleted = prune(options['days'])
+
+        self.stdout.write(self.style.SUCCESS(f'Successfully pruned {deleted} sync changes'))
+        logger.info(f'Successfully pruned {deleted} sync changes')
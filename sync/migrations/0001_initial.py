@@ -0,0 +1,45 @@
+# Generated by Django 5.1.7 on 2026-10-19 04:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CollectionChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('collection_type', models.CharField(choices=[('playlist', 'Playlist'), ('favorites', 'Favorites'), ('queue', 'Queue')], max_length=10)),
+                ('collection_id', models.PositiveBigIntegerField()),
+                ('version', models.PositiveBigIntegerField()),
+                ('op', models.CharField(choices=[('add', 'Add'), ('remove', 'Remove'), ('move', 'Move')], max_length=6)),
+                ('item_type', models.CharField(default='track', max_length=10)),
+                ('item_id', models.PositiveBigIntegerField()),
+                ('position', models.BigIntegerField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['version', 'id'],
+                'indexes': [models.Index(fields=['collection_type', 'collection_id', 'version'], name='sync_collec_collect_d08ed2_idx'), models.Index(fields=['created_at'], name='sync_collec_created_f50ab1_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='CollectionVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('collection_type', models.CharField(choices=[('playlist', 'Playlist'), ('favorites', 'Favorites'), ('queue', 'Queue')], max_length=10)),
+                ('collection_id', models.PositiveBigIntegerField()),
+                ('version', models.PositiveBigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'unique_together': {('collection_type', 'collection_id')},
+            },
+        ),
+    ]
@@ -0,0 +1,53 @@
+from django.db import models
+
+COLLECTION_CHOICES = [
+    ('playlist', 'Playlist'),
+    ('favorites', 'Favorites'),
+    ('queue', 'Queue'),
+]
+
+
+class CollectionVersion(models.Model):
+    """
+    Current snapshot id of a collection. ``collection_id`` is the playlist id,
+    or the owner's user id for favorites and the queue (one of each per user).
+    """
+    collection_type = models.CharField(max_length=10, choices=COLLECTION_CHOICES)
+    collection_id = models.PositiveBigIntegerField()
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('collection_type', 'collection_id')
+
+    def __str__(self):
+        return f"{self.collection_type}:{self.collection_id} v{self.version}"
+
+
+class CollectionChange(models.Model):
+    """Append-only change log; every change of one snapshot shares its version"""
+    OP_CHOICES = [
+        ('add', 'Add'),
+        ('remove', 'Remove'),
+        ('move', 'Move'),
+    ]
+
+    collection_type = models.CharField(max_length=10, choices=COLLECTION_CHOICES)
+    collection_id = models.PositiveBigIntegerField()
+    version = models.PositiveBigIntegerField()
+    op = models.CharField(max_length=6, choices=OP_CHOICES)
+    item_type = models.CharField(max_length=10, default='track')
+    item_id = models.PositiveBigIntegerField()
+    # Sort key of the item after the change (playlist/queue order), None for removals
+    position = models.BigIntegerField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['collection_type', 'collection_id', 'version']),
+            models.Index(fields=['created_at']),
+        ]
+        ordering = ['version', 'id']
+
+    def __str__(self):
+        return f"{self.collection_type}:{self.collection_id} v{self.version} {self.op} {self.item_type}:{self.item_id}"
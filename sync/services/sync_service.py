@@ -0,0 +1,90 @@
+import logging
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from ..models import CollectionVersion, CollectionChange
+
+logger = logging.getLogger(__name__)
+
+
+def record_changes(collection_type, collection_id, changes):
+    """
+    Append ``changes`` — (op, item_type, item_id, position) tuples — to the log
+    as one new snapshot. Returns the new version, or None if there was nothing to record.
+    """
+    changes = list(changes)
+    if not changes:
+        return None
+
+    with transaction.atomic():
+        # The row lock serializes writers of the same collection, so versions never repeat
+        collection, _ = CollectionVersion.objects.select_for_update().get_or_create(
+            collection_type=collection_type, collection_id=collection_id
+        )
+        collection.version += 1
+        collection.save(update_fields=['version', 'updated_at'])
+        CollectionChange.objects.bulk_create([
+            CollectionChange(
+                collection_type=collection_type,
+                collection_id=collection_id,
+                version=collection.version,
+                op=op,
+                item_type=item_type,
+                item_id=item_id,
+                position=position,
+            )
+            for op, item_type, item_id, position in changes
+        ])
+    return collection.version
+
+
+def track_changes(op, entries):
+    """(op, 'track', track_id, order) for PlaylistTrack/QueueTrack-like ``entries``"""
+    return [(op, 'track', entry.track_id, entry.order if op != 'remove' else None) for entry in entries]
+
+
+def current_version(collection_type, collection_id):
+    return CollectionVersion.objects.filter(
+        collection_type=collection_type, collection_id=collection_id
+    ).values_list('version', flat=True).first() or 0
+
+
+def changes_since(collection_type, collection_id, since):
+    """
+    Return (version, changes) where ``changes`` lists every change after
+    snapshot ``since`` in order. ``changes`` is None when the client cannot
+    catch up from the log (pruned, too many changes, unknown snapshot) and
+    should reload the whole collection instead.
+    """
+    version = current_version(collection_type, collection_id)
+    if since == version:
+        return version, []
+    if since > version:
+        return version, None
+
+    limit = settings.SYNC_MAX_CHANGES
+    changes = list(
+        CollectionChange.objects.filter(
+            collection_type=collection_type, collection_id=collection_id,
+            version__gt=since, version__lte=version,
+        ).order_by('version', 'id').values('version', 'op', 'item_type', 'item_id', 'position')[:limit + 1]
+    )
+    # Versions are contiguous, so a missing since+1 means the log was pruned
+    if len(changes) > limit or not changes or changes[0]['version'] != since + 1:
+        return version, None
+    return version, changes
+
+
+def forget(collection_type, collection_id):
+    """Drop version and log of a collection that no longer exists"""
+    CollectionChange.objects.filter(collection_type=collection_type, collection_id=collection_id).delete()
+    CollectionVersion.objects.filter(collection_type=collection_type, collection_id=collection_id).delete()
+
+
+def prune(days=None):
+    """Delete log entries older than ``days``; clients behind them get a full reload"""
+    days = settings.SYNC_CHANGE_RETENTION_DAYS if days is None else days
+    deleted, _ = CollectionChange.objects.filter(created_at__lt=timezone.now() - timedelta(days=days)).delete()
+    logger.info(f"Pruned {deleted} sync changes older than {days} days")
+    return deleted
@@ -0,0 +1,41 @@
+from collections import defaultdict
+from django.db.models.signals import post_save, post_delete, pre_delete
+from django.dispatch import receiver
+from favorites.models import Favorite
+from playlists.models import Playlist, PlaylistTrack
+from stream_queue.models import QueueTrack
+from tracks.models import Track
+from .services import sync_service
+
+def _favorite_item(favorite):
+    return favorite.content_type, getattr(favorite, f'{favorite.content_type}_id')
+
+@receiver(post_save, sender=Favorite)
+def record_favorite_added(sender, instance, created, **kwargs):
+    if created:
+        item_type, item_id = _favorite_item(instance)
+        sync_service.record_changes('favorites', instance.user_id, [('add', item_type, item_id, None)])
+
+@receiver(post_delete, sender=Favorite)
+def record_favorite_removed(sender, instance, **kwargs):
+    item_type, item_id = _favorite_item(instance)
+    sync_service.record_changes('favorites', instance.user_id, [('remove', item_type, item_id, None)])
+
+@receiver(post_delete, sender=Playlist)
+def forget_deleted_playlist(sender, instance, **kwargs):
+    sync_service.forget('playlist', instance.id)
+
+@receiver(pre_delete, sender=Track)
+def record_track_removed(sender, instance, **kwargs):
+    # Playlist and queue entries of the track go with it by cascade, which sends no delete signal for them
+    playlists = defaultdict(list)
+    for entry in PlaylistTrack.objects.filter(track=instance):
+        playlists[entry.playlist_id].append(entry)
+    queues = defaultdict(list)
+    for entry in QueueTrack.objects.filter(track=instance).select_related('queue'):
+        queues[entry.queue.user_id].append(entry)
+
+    for playlist_id, entries in playlists.items():
+        sync_service.record_changes('playlist', playlist_id, sync_service.track_changes('remove', entries))
+    for user_id, entries in queues.items():
+        sync_service.record_changes('queue', user_id, sync_service.track_changes('remove', entries))
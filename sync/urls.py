@@ -0,0 +1,8 @@
+from django.urls import path
+from .views import CollectionSyncView
+
+urlpatterns = [
+    path('sync/playlist/<int:collection_id>/', CollectionSyncView.as_view(), {'collection_type': 'playlist'}, name='sync-playlist'),
+    path('sync/favorites/', CollectionSyncView.as_view(), {'collection_type': 'favorites'}, name='sync-favorites'),
+    path('sync/queue/', CollectionSyncView.as_view(), {'collection_type': 'queue'}, name='sync-queue'),
+]
@@ -0,0 +1,52 @@
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
+from django.db.models import Q
+from django.utils.http import parse_etags
+from rest_framework import permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from playlists.models import Playlist
+from .services import sync_service
+
+
+class CollectionSyncView(APIView):
+    """
+    Changes of a collection since snapshot ``?since=``:
+    /api/sync/playlist/<id>/, /api/sync/favorites/, /api/sync/queue/.
+    Answers 304 when the client is already at the latest snapshot, and
+    ``reset: true`` when it has to reload the collection from its own endpoint.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, collection_type, collection_id=None):
+        if collection_type == 'playlist':
+            playlist = get_object_or_404(
+                Playlist.objects.filter(Q(is_public=True) | Q(user=request.user)), pk=collection_id
+            )
+            collection_id = playlist.id
+        else:
+            # Favorites and the queue belong to the current user
+            collection_id = request.user.id
+
+        try:
+            since = int(request.query_params.get('since', 0))
+        except ValueError:
+            return Response({'error': 'since must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        if since < 0:
+            return Response({'error': 'since must not be negative'}, status=status.HTTP_400_BAD_REQUEST)
+
+        version, changes = sync_service.changes_since(collection_type, collection_id, since)
+        etag = f'"{collection_type}-{collection_id}-v{version}"'
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+        if (changes == [] and 'since' in request.query_params) or (if_none_match and etag in parse_etags(if_none_match)):
+            response = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+            response['ETag'] = etag
+            return response
+
+        response = Response({
+            'version': version,
+            'reset': changes is None,
+            'changes': changes or [],
+        })
+        response['ETag'] = etag
+        return response
@@ -2,4 +2,7 @@ from django.apps import AppConfig
 
 class TracksConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'tracks' 
\ No newline at end of file
+    name = 'tracks' 
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,45 @@
+import logging
+from django.core.management.base import BaseCommand
+from tracks.models import Track
+from tracks.services.blob_service import register_stored_file
+
+logger = logging.getLogger(__name__)
+
+class Command(BaseCommand):
+    help = 'Hash existing track audio into content-addressed blobs and point duplicate tracks at one copy'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--delete-duplicates',
+            action='store_true',
+            help='Delete duplicate audio files once no track references them',
+        )
+
+    def handle(self, *args, **options):
+        linked = deduplicated = deleted = 0
+        tracks = Track.objects.filter(audio_blob__isnull=True).exclude(file='')
+
+        for track in tracks.iterator():
+            old_name = track.file.name
+            storage = track.file.storage
+            if not storage.exists(old_name):
+                logger.warning(f'Skipping track {track.id}: file not found ({old_name})')
+                continue
+
+            blob, _ = register_stored_file(old_name)
+            Track.objects.filter(pk=track.pk).update(audio_blob=blob, file=blob.file.name)
+            linked += 1
+
+            if blob.file.name != old_name:
+                deduplicated += 1
+                still_used = Track.objects.filter(file=old_name).exists()
+                if options['delete_duplicates'] and not still_used:
+                    storage.delete(old_name)
+                    deleted += 1
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Successfully linked {linked} tracks to blobs ({deduplicated} duplicates, {deleted} files deleted)'
+            )
+        )
+        logger.info(f'Successfully linked {linked} tracks to blobs ({deduplicated} duplicates, {deleted} files deleted)')
@@ -0,0 +1,71 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import RequestFactory
+from artists.models import Artist
+from genres.models import Genre
+from tracks.models import Track
+from tracks.projections import TRACK_PROJECTION
+from tracks.serializers import TrackSerializer
+
+
+class Command(BaseCommand):
+    help = 'Compare rows/sec of TrackSerializer and the values() projection on track lists'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000],
+                            help='List sizes to render')
+        parser.add_argument('--repeat', type=int, default=3,
+                            help='Runs per size; the best one is reported')
+
+    def handle(self, *args, **options):
+        request = RequestFactory().get('/')
+        # Synthetic rows (if needed) are rolled back at the end
+        with transaction.atomic():
+            self._ensure_tracks(max(options['rows']))
+            for rows in options['rows']:
+                queryset = Track.objects.order_by('-created_at')[:rows]
+
+                def serialize():
+                    tracks = queryset.select_related('artist', 'album').prefetch_related('genres')
+                    return TrackSerializer(tracks, many=True, context={'request': request}).data
+
+                def project():
+                    return TRACK_PROJECTION.render(queryset, request)
+
+                serializer_time = self._best(serialize, options['repeat'])
+                projection_time = self._best(project, options['repeat'])
+                self.stdout.write(
+                    f'{rows} rows: serializer {rows / serializer_time:,.0f} rows/s, '
+                    f'projection {rows / projection_time:,.0f} rows/s '
+                    f'({serializer_time / projection_time:.1f}x)'
+                )
+            transaction.set_rollback(True)
+
+        self.stdout.write(self.style.SUCCESS('Benchmark finished'))
+
+    def _best(self, render, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            render()
+            timings.append(time.perf_counter() - started)
+        return min(timings)
+
+    def _ensure_tracks(self, rows):
+        missing = rows - Track.objects.count()
+        if missing <= 0:
+            return
+        artist = Artist.objects.create(name='Benchmark Artist')
+        genres = [Genre.objects.get_or_create(name=f'Benchmark {i}')[0] for i in range(3)]
+        tracks = Track.objects.bulk_create(
+            [Track(title=f'Benchmark {i}', artist=artist, file='tracks/benchmark.mp3', duration=180)
+             for i in range(missing)],
+            batch_size=1000,
+        )
+        Through = Track.genres.through
+        Through.objects.bulk_create(
+            [Through(track_id=track.id, genre_id=genres[track.id % len(genres)].id) for track in tracks],
+            batch_size=1000,
+        )
+        self.stdout.write(f'Created {missing} synthetic tracks for the benchmark')
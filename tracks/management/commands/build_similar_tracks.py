@@ -0,0 +1,27 @@
+import logging
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from tracks.services.similarity_service import build_similar_tracks
+
+logger = logging.getLogger(__name__)
+
+class Command(BaseCommand):
+    help = 'Compute similar tracks from co-listening (PlayHistory and favorites)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--k', type=int, default=settings.SIMILAR_TRACKS_PER_TRACK,
+                            help='Neighbors to keep per track')
+        parser.add_argument('--chunk-size', type=int, default=100_000,
+                            help='Play rows read from the database per query')
+        parser.add_argument('--block-size', type=int, default=1000,
+                            help='Tracks whose similarities are computed together')
+
+    def handle(self, *args, **options):
+        stored = build_similar_tracks(
+            k=options['k'],
+            chunk_size=options['chunk_size'],
+            block_size=options['block_size'],
+        )
+
+        self.stdout.write(self.style.SUCCESS(f'Successfully stored similar tracks for {stored} tracks'))
+        logger.info(f'Successfully stored similar tracks for {stored} tracks')
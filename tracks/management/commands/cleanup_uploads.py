@@ -0,0 +1,19 @@
+import logging
+from django.core.management.base import BaseCommand
+from tracks.services.upload_service import expired_sessions, discard_session
+
+logger = logging.getLogger(__name__)
+
+class Command(BaseCommand):
+    help = 'Remove abandoned chunked uploads and their staged files'
+
+    def handle(self, *args, **options):
+        count = 0
+        for session in expired_sessions().iterator():
+            discard_session(session)
+            count += 1
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Successfully removed {count} abandoned uploads')
+        )
+        logger.info(f'Successfully removed {count} abandoned uploads')
@@ -0,0 +1,16 @@
+import logging
+from django.core.management.base import BaseCommand
+from tracks.services.trending_service import compute_trending
+
+logger = logging.getLogger(__name__)
+
+class Command(BaseCommand):
+    help = 'Fold new plays into hourly buckets, update decayed trending scores and publish the trending lists'
+
+    def handle(self, *args, **options):
+        ingested, lists = compute_trending()
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Successfully ingested {ingested} plays and published {lists} trending lists')
+        )
+        logger.info(f'Successfully ingested {ingested} plays and published {lists} trending lists')
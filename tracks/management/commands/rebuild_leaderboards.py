@@ -0,0 +1,19 @@
+import logging
+from django.core.management.base import BaseCommand, CommandError
+from tracks.services import leaderboard_service
+
+logger = logging.getLogger(__name__)
+
+class Command(BaseCommand):
+    help = 'Rebuild the Redis leaderboards from play/download counts in the database'
+
+    def handle(self, *args, **options):
+        try:
+            counts = leaderboard_service.rebuild()
+        except RuntimeError as e:
+            raise CommandError(str(e))
+
+        for board, count in counts.items():
+            self.stdout.write(f'{board}: {count} entries')
+        self.stdout.write(self.style.SUCCESS('Successfully rebuilt leaderboards'))
+        logger.info(f'Successfully rebuilt leaderboards: {counts}')
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.7 on 2026-10-19 04:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracks', '0005_trending'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrackNeighbors',
+            fields=[
+                ('track', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='neighbors', serialize=False, to='tracks.track')),
+                ('neighbor_ids', models.BinaryField()),
+                ('scores', models.BinaryField()),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
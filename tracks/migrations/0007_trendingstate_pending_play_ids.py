@@ -0,0 +1,18 @@
+# Generated by Django 5.1.7 on 2026-10-19 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracks', '0006_trackneighbors'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='trendingstate',
+            name='pending_play_ids',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
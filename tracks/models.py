@@ -1,4 +1,6 @@
+import uuid
 from django.db import models
+from django.conf import settings
 from django.core.exceptions import ValidationError
 from artists.models import Artist
 from albums.models import Album
@@ -6,18 +8,35 @@ from genres.models import Genre
 from mutagen.mp3 import MP3
 from mutagen.id3 import ID3, APIC
 from django.core.files.base import ContentFile
+from core import catalog_snapshot
+from core.object_cache import ObjectCacheManager
+
+MAX_AUDIO_FILE_SIZE = 50 * 1024 * 1024  # 50MB
 
 def validate_audio_file(file):
     """ Giới hạn dung lượng file audio tối đa là 50MB """
-    max_size = 50 * 1024 * 1024  # 50MB
-    if file.size > max_size:
+    if file.size > MAX_AUDIO_FILE_SIZE:
         raise ValidationError("File must be less than 50MB.")
 
+class MediaBlob(models.Model):
+    """
+    An audio file stored once, addressed by the SHA-256 of its content.
+    Tracks uploaded with identical bytes share the same blob.
+    """
+    sha256 = models.CharField(max_length=64, unique=True)
+    file = models.FileField(upload_to="blobs/", max_length=500)
+    size = models.PositiveBigIntegerField(help_text="Size in bytes")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.sha256
+
 class Track(models.Model):
     title = models.CharField(max_length=255, db_index=True)
     album = models.ForeignKey(Album, on_delete=models.SET_NULL, null=True, blank=True, related_name="tracks")
     artist = models.ForeignKey(Artist, on_delete=models.CASCADE, related_name="tracks")
     file = models.FileField(upload_to="tracks/", validators=[validate_audio_file], max_length=500)
+    audio_blob = models.ForeignKey(MediaBlob, on_delete=models.SET_NULL, null=True, blank=True, related_name="tracks")
     video = models.FileField(upload_to='videos/', null=True, blank=True)
     duration = models.PositiveIntegerField(help_text="Duration in seconds", null=True, blank=True)
     genres = models.ManyToManyField(Genre, related_name="tracks", blank=True)
@@ -30,6 +49,9 @@ class Track(models.Model):
     track_thumbnail = models.ImageField(upload_to="track_thumbnails/", blank=True, null=True)
     video_thumbnail = models.ImageField(upload_to="video_thumbnails/", blank=True, null=True)
 
+    objects = models.Manager()
+    cached = ObjectCacheManager(select_related=('artist', 'album'), prefetch_related=('genres',))
+
     class Meta:
         indexes = [
             models.Index(fields=["title"]),
@@ -39,11 +61,26 @@ class Track(models.Model):
         ordering = ["-created_at"]
 
     def clean(self):
-        if self.album and self.album.artist != self.artist:
+        if self.album_id is None:
+            return
+        # Album -> artist comes from the in-process snapshot; albums newer than it are read from the database
+        album_artist_id = catalog_snapshot.get_snapshot().album_artist_id(self.album_id)
+        if album_artist_id is None:
+            album_artist_id = self.album.artist_id
+        if album_artist_id != self.artist_id:
             raise ValidationError("Artist of the album and artist of the track must be the same.")
 
     def save(self, *args, **kwargs):
         self.clean()
+        if self.file and not self.file._committed:
+            # Lưu file audio theo hash nội dung để upload trùng chỉ lưu một lần
+            from .services.blob_service import ingest_file
+            blob, _ = ingest_file(self.file.file, self.file.name)
+            self.audio_blob = blob
+            self.file = blob.file.name
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None and 'file' in update_fields:
+                kwargs['update_fields'] = set(update_fields) | {'audio_blob'}
         super().save(*args, **kwargs)
         # Tự động lấy cover nếu chưa có thumbnail và có file audio
         if self.file and not self.track_thumbnail:
@@ -63,11 +100,127 @@ class Track(models.Model):
 
     def __str__(self):
         return f"{self.title} - {self.artist.name}"
+
+    @property
+    def etag(self):
+        """Strong ETag for the audio bytes, available once the file is content-addressed"""
+        if self.audio_blob_id:
+            return f'"{self.audio_blob.sha256}"'
+        return None
     
     def increment_play_count(self):
+        from .services import leaderboard_service
+        from artists.services import stats_service
         self.play_count += 1
         self.save(update_fields=['play_count'])
+        leaderboard_service.record_play(self)
+        stats_service.record_play(self)
     
     def increment_download_count(self):
+        from .services import leaderboard_service
         self.download_count += 1  
-        self.save(update_fields=['download_count']) 
\ No newline at end of file
+        self.save(update_fields=['download_count'])
+        leaderboard_service.record_downloads([self.id])
+
+
+class UploadSession(models.Model):
+    """
+    Resumable chunked upload of a track's audio or video.
+    Chunks are appended to a staged file until offset reaches size,
+    then the upload is finalized into a Track.
+    """
+    KIND_CHOICES = (
+        ('audio', 'Audio'),
+        ('video', 'Video'),
+    )
+    STATUS_CHOICES = (
+        ('active', 'Active'),
+        ('completed', 'Completed'),
+    )
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='upload_sessions')
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES, default='audio')
+    filename = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField(help_text="Total upload size in bytes")
+    offset = models.PositiveBigIntegerField(default=0, help_text="Bytes received so far")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='active')
+    # Target track for video uploads, resulting track for audio uploads
+    track = models.ForeignKey(Track, on_delete=models.SET_NULL, null=True, blank=True, related_name='upload_sessions')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.filename} ({self.offset}/{self.size})"
+
+    @property
+    def is_complete(self):
+        return self.offset >= self.size
+
+
+class TrackPlayBucket(models.Model):
+    """Number of plays of a track within one hour, aggregated from PlayHistory"""
+    track = models.ForeignKey(Track, on_delete=models.CASCADE, related_name='play_buckets')
+    hour = models.DateTimeField()
+    plays = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('track', 'hour')
+        indexes = [
+            models.Index(fields=['hour']),
+        ]
+
+    def __str__(self):
+        return f"{self.track_id} @ {self.hour:%Y-%m-%d %H:00}: {self.plays}"
+
+
+class TrendingScore(models.Model):
+    """
+    Exponentially decayed play score of a track.
+
+    Scores are stored scaled to ``TrendingState.epoch`` (forward decay): every
+    row decays by the same factor, so ranking never needs a rewrite and new
+    plays only touch the tracks that received them.
+    """
+    track = models.OneToOneField(Track, on_delete=models.CASCADE, primary_key=True, related_name='trending_score')
+    score = models.FloatField(default=0, db_index=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.track_id}: {self.score}"
+
+
+class TrendingState(models.Model):
+    """Single row: how far PlayHistory has been ingested and the epoch scores are scaled to"""
+    last_play_id = models.BigIntegerField(default=0)
+    # Ids at or below last_play_id that were not visible yet (uncommitted), re-checked for a few runs: {id: runs left}
+    pending_play_ids = models.JSONField(default=dict, blank=True)
+    epoch = models.DateTimeField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"PlayHistory <= {self.last_play_id}"
+
+
+class TrackNeighbors(models.Model):
+    """
+    Most similar tracks by co-listening, written by build_similar_tracks.
+    Ids and scores are packed little-endian int32/float32 arrays, best first.
+    """
+    track = models.OneToOneField(Track, on_delete=models.CASCADE, primary_key=True, related_name='neighbors')
+    neighbor_ids = models.BinaryField()
+    scores = models.BinaryField()
+    computed_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Neighbors of {self.track_id}"
+
+    def neighbors(self, limit=None):
+        """Return [(track_id, score)], best first"""
+        import numpy as np
+        ids = np.frombuffer(bytes(self.neighbor_ids), dtype='<i4')
+        scores = np.frombuffer(bytes(self.scores), dtype='<f4')
+        return [(int(track_id), float(score)) for track_id, score in zip(ids[:limit], scores[:limit])]
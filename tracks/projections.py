@@ -0,0 +1,26 @@
+from core.projections import Projection, Column, DateTimeColumn, FileColumn, Many
+from genres.projections import GENRE_PROJECTION
+from .models import Track
+
+# Same output as TrackSerializer, for read-only list endpoints
+TRACK_PROJECTION = Projection(Track, {
+    'id': Column('id'),
+    'album': Column('album_id'),
+    'artist': Column('artist_id'),
+    'artist_name': Column('artist__name'),
+    'album_title': Column('album__title', skip_none=True),
+    'genres': Many('genres', GENRE_PROJECTION),
+    'title': Column('title'),
+    'file': FileColumn('file'),
+    'video': FileColumn('video'),
+    'duration': Column('duration'),
+    'lyrics': Column('lyrics'),
+    'created_at': DateTimeColumn('created_at'),
+    'updated_at': DateTimeColumn('updated_at'),
+    'play_count': Column('play_count'),
+    'download_count': Column('download_count'),
+    'is_downloadable': Column('is_downloadable'),
+    'track_thumbnail': FileColumn('track_thumbnail'),
+    'video_thumbnail': FileColumn('video_thumbnail'),
+    'audio_blob': Column('audio_blob_id'),
+})
@@ -1,8 +1,11 @@
 from rest_framework import serializers
-from .models import Track, Album, Artist, Genre
+from .models import Track, Album, Artist, Genre, UploadSession
+from .services.upload_service import max_upload_size
+from core.fields import VersionedMediaSerializerMixin
+from core.serializers import DynamicFieldsMixin
 from genres.serializers import GenreSerializer
 
-class TrackSerializer(serializers.ModelSerializer):
+class TrackSerializer(DynamicFieldsMixin, VersionedMediaSerializerMixin, serializers.ModelSerializer):
     album = serializers.PrimaryKeyRelatedField(queryset=Album.objects.all(), required=False, allow_null=True)
     artist = serializers.PrimaryKeyRelatedField(queryset=Artist.objects.all())
     artist_name = serializers.CharField(source='artist.name', read_only=True)
@@ -19,6 +22,10 @@ class TrackSerializer(serializers.ModelSerializer):
     class Meta:
         model = Track
         fields = '__all__'
+        expandable_fields = {
+            'artist': ('artists.serializers.ArtistSerializer', {}),
+            'album': ('albums.serializers.AlbumSerializer', {}),
+        }
     
     def validate_duration(self, value):
         if value is None:
@@ -26,4 +33,21 @@ class TrackSerializer(serializers.ModelSerializer):
         try:
             return int(value) 
         except ValueError:
-            raise serializers.ValidationError("Duration must be a valid number.") 
\ No newline at end of file
+            raise serializers.ValidationError("Duration must be a valid number.")
+
+
+class UploadSessionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = UploadSession
+        fields = ['id', 'kind', 'filename', 'size', 'offset', 'status', 'track', 'created_at', 'updated_at']
+        read_only_fields = ['offset', 'status', 'created_at', 'updated_at']
+
+    def validate(self, data):
+        kind = data.get('kind', 'audio')
+        if data['size'] > max_upload_size(kind):
+            raise serializers.ValidationError({'size': f"Upload exceeds the {max_upload_size(kind) // (1024 * 1024)}MB limit."})
+        if kind == 'video' and not data.get('track'):
+            raise serializers.ValidationError({'track': "Video uploads must target an existing track."})
+        if kind == 'audio' and data.get('track'):
+            raise serializers.ValidationError({'track': "Audio uploads create a new track on finalize."})
+        return data
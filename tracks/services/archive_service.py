@@ -0,0 +1,132 @@
+import logging
+import os
+import re
+import zipfile
+from functools import partial
+from django.core.files.storage import FileSystemStorage
+from django.db.models import F
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.http import content_disposition_header
+from user_activity.models import UserActivity
+from ..models import Track
+from .delivery_service import find_track_file_path
+from .leaderboard_service import record_downloads
+
+logger = logging.getLogger(__name__)
+
+# Audio is copied into the archive in blocks of this size, so memory stays flat
+READ_BLOCK_SIZE = 64 * 1024
+UNSAFE_FILENAME_CHARS = re.compile(r'[\\/:*?"<>|\x00-\x1f]+')
+
+
+class _ZipSink:
+    """
+    Write-only, non-seekable target for zipfile.
+
+    zipfile falls back to data descriptors when it cannot seek, so every
+    byte it writes can be drained and sent immediately.
+    """
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _safe_name(value):
+    return UNSAFE_FILENAME_CHARS.sub('_', value).strip() or 'untitled'
+
+
+def track_archive_entries(tracks):
+    """Yield (track, (arcname, opener, size)) for every track whose audio can be found"""
+    for position, track in enumerate(tracks, start=1):
+        path = find_track_file_path(track)
+        if path:
+            opener = partial(open, path, 'rb')
+            size = os.path.getsize(path)
+        elif track.file and not isinstance(track.file.storage, FileSystemStorage):
+            # Remote storage (S3): read through the storage backend
+            opener = partial(track.file.storage.open, track.file.name, 'rb')
+            size = track.file.size
+        else:
+            logger.warning(f"Skipping track {track.id} in archive: file not found ({track.file.name})")
+            continue
+
+        extension = os.path.splitext(track.file.name)[1] or '.mp3'
+        arcname = f"{position:02d} - {_safe_name(track.artist.name)} - {_safe_name(track.title)}{extension}"
+        yield track, (arcname, opener, size)
+
+
+def stream_zip(entries):
+    """
+    Build a ZIP on the fly and yield it in pieces.
+
+    Entries are stored without recompression (audio is already compressed)
+    and nothing is written to temporary files.
+    """
+    sink = _ZipSink()
+    date_time = timezone.localtime().timetuple()[:6]
+
+    with zipfile.ZipFile(sink, mode='w', compression=zipfile.ZIP_STORED, allowZip64=True) as archive:
+        for arcname, opener, size in entries:
+            info = zipfile.ZipInfo(arcname, date_time=date_time)
+            info.compress_type = zipfile.ZIP_STORED
+            info.file_size = size
+            with opener() as source, archive.open(info, mode='w', force_zip64=size >= zipfile.ZIP64_LIMIT) as target:
+                while True:
+                    block = source.read(READ_BLOCK_SIZE)
+                    if not block:
+                        break
+                    target.write(block)
+                    data = sink.drain()
+                    if data:
+                        yield data
+            data = sink.drain()
+            if data:
+                yield data
+
+    # Central directory
+    yield sink.drain()
+
+
+def zip_download_response(request, tracks, archive_name):
+    """
+    Stream ``tracks`` as one ZIP attachment.
+
+    Tracks that are not downloadable are left out. Download counts for the
+    included tracks are bumped in a single UPDATE and activities in a single INSERT.
+    Returns None when nothing can be downloaded.
+    """
+    included = list(track_archive_entries(track for track in tracks if track.is_downloadable))
+    if not included:
+        return None
+
+    track_ids = [track.id for track, _ in included]
+    Track.objects.filter(id__in=track_ids).update(download_count=F('download_count') + 1)
+    record_downloads(track_ids)
+
+    if request.user and request.user.is_authenticated:
+        UserActivity.objects.bulk_create([
+            UserActivity(user=request.user, track_id=track_id, action='download')
+            for track_id in track_ids
+        ])
+
+    response = StreamingHttpResponse(stream_zip(entry for _, entry in included), content_type='application/zip')
+    response['Content-Disposition'] = content_disposition_header(True, f'{_safe_name(archive_name)}.zip')
+    return response
@@ -0,0 +1,77 @@
+import hashlib
+import logging
+import os
+from django.core.files import File
+from django.db import IntegrityError, transaction
+from ..models import MediaBlob
+
+logger = logging.getLogger(__name__)
+
+
+def _chunks(fileobj):
+    if not hasattr(fileobj, 'chunks'):
+        fileobj = File(fileobj)
+    # chunks() rewinds first, so the file can be read again afterwards
+    return fileobj.chunks()
+
+
+def hash_file(fileobj):
+    """Return (sha256 hexdigest, size) of ``fileobj``, reading it in chunks"""
+    digest = hashlib.sha256()
+    size = 0
+    for chunk in _chunks(fileobj):
+        digest.update(chunk)
+        size += len(chunk)
+    return digest.hexdigest(), size
+
+
+def blob_name(sha256, filename):
+    """Content-addressed storage name, fanned out so no directory grows too large"""
+    extension = os.path.splitext(filename)[1].lower()
+    return f"blobs/{sha256[:2]}/{sha256[2:4]}/{sha256}{extension}"
+
+
+def _get_or_create_blob(sha256, name, size):
+    try:
+        with transaction.atomic():
+            return MediaBlob.objects.create(sha256=sha256, file=name, size=size), True
+    except IntegrityError:
+        # Another upload of the same bytes won the race
+        return MediaBlob.objects.get(sha256=sha256), False
+
+
+def ingest_file(fileobj, filename):
+    """
+    Store ``fileobj`` once per distinct content and return (blob, created).
+
+    If a blob with the same hash already exists nothing is written and the
+    existing blob is returned.
+    """
+    sha256, size = hash_file(fileobj)
+    blob = MediaBlob.objects.filter(sha256=sha256).first()
+    if blob:
+        logger.info(f"Reusing stored blob {sha256} for {filename}")
+        return blob, False
+
+    storage = MediaBlob._meta.get_field('file').storage
+    name = blob_name(sha256, filename)
+    if not storage.exists(name):
+        name = storage.save(name, fileobj if hasattr(fileobj, 'chunks') else File(fileobj))
+    return _get_or_create_blob(sha256, name, size)
+
+
+def register_stored_file(name):
+    """
+    Hash a file that is already in media storage and return (blob, created).
+
+    A new blob points at the file where it is; when the content is already
+    known, the existing blob is returned and ``name`` is left as a duplicate.
+    """
+    storage = MediaBlob._meta.get_field('file').storage
+    with storage.open(name, 'rb') as stored:
+        sha256, size = hash_file(stored)
+
+    blob = MediaBlob.objects.filter(sha256=sha256).first()
+    if blob:
+        return blob, False
+    return _get_or_create_blob(sha256, name, size)
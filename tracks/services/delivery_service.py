@@ -0,0 +1,90 @@
+import hashlib
+import logging
+import mimetypes
+import os
+import urllib.parse
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.http import content_disposition_header
+
+logger = logging.getLogger(__name__)
+
+# Cached URLs are handed out for this share of their lifetime, so every client gets at least the rest of it
+PRESIGNED_URL_CACHE_FRACTION = 0.5
+
+
+def find_track_file_path(track):
+    """Find the actual local path to the track file, or None"""
+    if not track.file:
+        return None
+
+    # Try multiple ways to find the file
+    simple_name = os.path.basename(track.file.name)
+    possible_paths = [
+        # 1. Standard path
+        os.path.join(settings.MEDIA_ROOT, track.file.name.lstrip('/')),
+        # 2. Path with URL decode
+        os.path.join(settings.MEDIA_ROOT, urllib.parse.unquote(track.file.name).lstrip('/')),
+        # 3. Simple file name (no directory)
+        os.path.join(settings.MEDIA_ROOT, 'tracks', simple_name),
+        # 4. Simple name decoded
+        os.path.join(settings.MEDIA_ROOT, 'tracks', urllib.parse.unquote(simple_name)),
+    ]
+
+    # Find the first path that exists
+    for path in possible_paths:
+        if os.path.exists(path):
+            logger.debug(f"Found track file at: {path}")
+            return path
+
+    return None
+
+
+def presigned_delivery_enabled(field_file):
+    """True when the file should be handed out as a presigned S3 URL instead of proxied"""
+    if settings.MEDIA_DELIVERY_MODE != 'presigned' or not field_file:
+        return False
+    # Only S3-backed storages can sign URLs; local storage keeps the proxy path
+    return hasattr(field_file.storage, 'bucket')
+
+
+def get_presigned_url(field_file, as_attachment=False, filename=None):
+    """
+    Return a presigned GET URL for ``field_file``.
+
+    URLs are memoized per file and disposition for half their lifetime, so
+    repeated plays of the same track reuse one signature and a cached URL
+    always has at least half its lifetime left.
+    S3 serves the object itself, including Range requests.
+    """
+    expiry = settings.MEDIA_PRESIGNED_URL_EXPIRY
+    disposition = 'attachment' if as_attachment else 'inline'
+    name_hash = hashlib.md5(f"{field_file.name}|{filename or ''}".encode('utf-8')).hexdigest()
+    cache_key = f'presigned_url_{disposition}_{name_hash}'
+
+    url = cache.get(cache_key)
+    if url:
+        return url
+
+    storage = field_file.storage
+    params = {
+        'Bucket': storage.bucket.name,
+        'Key': storage._normalize_name(field_file.name),
+    }
+    content_type, _ = mimetypes.guess_type(field_file.name)
+    if content_type:
+        params['ResponseContentType'] = content_type
+    if as_attachment:
+        filename = filename or os.path.basename(field_file.name)
+        # Quoted/escaped, with a filename*=UTF-8'' form for non-ASCII names
+        params['ResponseContentDisposition'] = content_disposition_header(True, filename)
+
+    # Sign with the bucket client directly: storage.url() skips signing when a custom domain is set
+    url = storage.bucket.meta.client.generate_presigned_url(
+        'get_object',
+        Params=params,
+        ExpiresIn=expiry,
+    )
+    cache.set(cache_key, url, max(int(expiry * PRESIGNED_URL_CACHE_FRACTION), 1))
+    logger.debug(f"Generated presigned URL for {field_file.name}")
+    return url
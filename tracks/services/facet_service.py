@@ -0,0 +1,75 @@
+from django.conf import settings
+from django.db.models import Count
+from core import cached
+from core.response_cache import catalog_version
+from ..models import Track
+
+# Query parameter -> filter; values are comma-separated ids, OR-ed within a facet and AND-ed across facets
+FACETS = ('genre', 'artist', 'album')
+
+
+def parse_filters(params):
+    """{'genre': [1, 2], 'artist': [], 'album': []} from ?genre=1,2; raises ValueError on non-ids"""
+    filters = {}
+    for facet in FACETS:
+        raw = params.get(facet, '')
+        filters[facet] = sorted({int(value) for value in raw.split(',') if value.strip()})
+    return filters
+
+
+def filter_tracks(filters, skip=None):
+    """Tracks matching ``filters``, ignoring facet ``skip``. Genre uses a subquery, so no distinct() is needed"""
+    queryset = Track.objects.all()
+    if filters['genre'] and skip != 'genre':
+        queryset = queryset.filter(
+            id__in=Track.genres.through.objects.filter(genre_id__in=filters['genre']).values('track_id')
+        )
+    if filters['artist'] and skip != 'artist':
+        queryset = queryset.filter(artist_id__in=filters['artist'])
+    if filters['album'] and skip != 'album':
+        queryset = queryset.filter(album_id__in=filters['album'])
+    return queryset
+
+
+def _values(rows, id_key, name_key):
+    return [{'id': row[id_key], 'name': row[name_key], 'count': row['count']} for row in rows]
+
+
+def _compute_counts(filters):
+    limit = settings.FACET_MAX_VALUES
+    # Each facet is counted under the other facets' filters, so selecting a genre still lists its siblings
+    genres = (
+        Track.genres.through.objects.filter(track__in=filter_tracks(filters, skip='genre'))
+        .values('genre_id', 'genre__name')
+        .annotate(count=Count('track_id'))
+        .order_by('-count', 'genre__name')[:limit]
+    )
+    artists = (
+        filter_tracks(filters, skip='artist')
+        .values('artist_id', 'artist__name')
+        .annotate(count=Count('id'))
+        .order_by('-count', 'artist__name')[:limit]
+    )
+    albums = (
+        filter_tracks(filters, skip='album').filter(album__isnull=False)
+        .values('album_id', 'album__title')
+        .annotate(count=Count('id'))
+        .order_by('-count', 'album__title')[:limit]
+    )
+    return {
+        'genres': _values(genres, 'genre_id', 'genre__name'),
+        'artists': _values(artists, 'artist_id', 'artist__name'),
+        'albums': _values(albums, 'album_id', 'album__title'),
+    }
+
+
+def facet_counts(filters):
+    """
+    Per-facet counts (top FACET_MAX_VALUES values each) for a filter set,
+    cached per filter set until the catalog changes.
+    """
+    key = 'facets:{}:{}'.format(
+        catalog_version(),
+        '|'.join(f"{facet}={','.join(map(str, filters[facet]))}" for facet in FACETS),
+    )
+    return cached.get_or_compute(key, lambda: _compute_counts(filters), settings.FACET_CACHE_TIMEOUT)
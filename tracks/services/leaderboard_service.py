@@ -0,0 +1,187 @@
+import logging
+from django.db.models import F, Sum
+from redis.exceptions import RedisError
+from core.redis_client import get_redis
+from ..models import Track, Artist, Album
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'leaderboard:'
+PLAYS = 'plays'
+DOWNLOADS = 'downloads'
+# plays + downloads
+POPULAR = 'popular'
+ARTIST_PLAYS = 'artist_plays'
+ALBUM_PLAYS = 'album_plays'
+
+# Members are written to Redis in batches of this size during a rebuild
+REBUILD_BATCH_SIZE = 1000
+ALL_BOARDS = (PLAYS, DOWNLOADS, POPULAR, ARTIST_PLAYS, ALBUM_PLAYS)
+# Boards ranking the rows of each model
+MODEL_BOARDS = {Track: (PLAYS, DOWNLOADS, POPULAR), Artist: (ARTIST_PLAYS,), Album: (ALBUM_PLAYS,)}
+# Set by a full rebuild. Without it (never built, or Redis restarted empty) the boards
+# would only hold recent increments, so they are neither updated nor read
+BUILT_KEY = f'{KEY_PREFIX}built'
+
+
+def _key(board):
+    return f'{KEY_PREFIX}{board}'
+
+
+def _increment(increments):
+    """Apply [(board, member_id, amount)] in one round trip; the database stays the source of truth"""
+    client = get_redis()
+    if client is None:
+        return
+    try:
+        if not client.exists(BUILT_KEY):
+            return
+        pipe = client.pipeline(transaction=False)
+        for board, member_id, amount in increments:
+            pipe.zincrby(_key(board), amount, member_id)
+        pipe.execute()
+    except RedisError as e:
+        logger.warning(f"Could not update leaderboards: {e}")
+
+
+def record_play(track):
+    increments = [
+        (PLAYS, track.id, 1),
+        (POPULAR, track.id, 1),
+        (ARTIST_PLAYS, track.artist_id, 1),
+    ]
+    if track.album_id:
+        increments.append((ALBUM_PLAYS, track.album_id, 1))
+    _increment(increments)
+
+
+def record_downloads(track_ids):
+    _increment(
+        [(DOWNLOADS, track_id, 1) for track_id in track_ids]
+        + [(POPULAR, track_id, 1) for track_id in track_ids]
+    )
+
+
+def remove_member(model, member_id):
+    """Drop a deleted row from every board ranking it, so top lists stay full"""
+    client = get_redis()
+    if client is None:
+        return
+    try:
+        pipe = client.pipeline(transaction=False)
+        for board in MODEL_BOARDS[model]:
+            pipe.zrem(_key(board), member_id)
+        pipe.execute()
+    except RedisError as e:
+        logger.warning(f"Could not remove {model._meta.model_name} {member_id} from leaderboards: {e}")
+
+
+def top_ids(board, limit=10):
+    """
+    Return [(id, score)] for the top ``limit`` members of a board, highest first.
+    Returns None when Redis is unavailable or the boards have not been built,
+    so callers can fall back to the database.
+    """
+    client = get_redis()
+    if client is None:
+        return None
+    try:
+        if not client.exists(BUILT_KEY):
+            return None
+        entries = client.zrevrange(_key(board), 0, limit - 1, withscores=True)
+        if not entries and not client.exists(_key(board)):
+            return None
+    except RedisError as e:
+        logger.warning(f"Could not read leaderboard {board}: {e}")
+        return None
+    return [(int(member), int(score)) for member, score in entries]
+
+
+# Database equivalents of each board, used as fallback and for rebuilds
+def _board_queryset(board):
+    if board == ARTIST_PLAYS:
+        return Artist.objects.annotate(score=Sum('tracks__play_count'))
+    if board == ALBUM_PLAYS:
+        return Album.objects.annotate(score=Sum('tracks__play_count'))
+    if board == PLAYS:
+        return Track.objects.annotate(score=F('play_count'))
+    if board == DOWNLOADS:
+        return Track.objects.annotate(score=F('download_count'))
+    return Track.objects.annotate(score=F('play_count') + F('download_count'))
+
+
+def top_member_ids(board, limit=10):
+    """Ids of the top ``limit`` members of a board, highest first, without loading the objects"""
+    ranked = top_ids(board, limit)
+    if ranked is None:
+        return list(
+            _board_queryset(board).filter(score__isnull=False).order_by('-score').values_list('id', flat=True)[:limit]
+        )
+    return [member_id for member_id, _ in ranked]
+
+
+def top(board, limit=10, select_related=()):
+    """
+    Return the top ``limit`` objects of a board, each with a ``score`` attribute.
+
+    Reads the sorted set when it is available; otherwise sorts in the database.
+    """
+    queryset = _board_queryset(board).select_related(*select_related)
+
+    ranked = top_ids(board, limit)
+    if ranked is None:
+        return list(queryset.filter(score__isnull=False).order_by('-score')[:limit])
+
+    objects = queryset.model.objects.select_related(*select_related).in_bulk(
+        [member_id for member_id, _ in ranked]
+    )
+    result = []
+    for member_id, score in ranked:
+        obj = objects.get(member_id)
+        # A row deleted by a transaction that has not committed yet
+        if obj is not None:
+            obj.score = score
+            result.append(obj)
+    return result
+
+
+def rebuild(boards=ALL_BOARDS):
+    """
+    Recompute boards from the database.
+
+    Each board is built under a temporary key and swapped in with RENAME,
+    so readers never see a half-built board. Rebuilding every board marks
+    them as built, which turns on increments and reads.
+    """
+    client = get_redis()
+    if client is None:
+        raise RuntimeError('REDIS_URL is not configured')
+
+    counts = {}
+    for board in boards:
+        key = _key(board)
+        tmp_key = f'{key}:rebuild'
+        client.delete(tmp_key)
+
+        rows = _board_queryset(board).values_list('id', 'score')
+        batch = {}
+        count = 0
+        for member_id, score in rows.iterator(chunk_size=REBUILD_BATCH_SIZE):
+            batch[member_id] = score or 0
+            if len(batch) >= REBUILD_BATCH_SIZE:
+                client.zadd(tmp_key, batch)
+                count += len(batch)
+                batch = {}
+        if batch:
+            client.zadd(tmp_key, batch)
+            count += len(batch)
+
+        if count:
+            client.rename(tmp_key, key)
+        else:
+            client.delete(key)
+        counts[board] = count
+
+    if set(ALL_BOARDS) <= set(boards):
+        client.set(BUILT_KEY, 1)
+    return counts
@@ -0,0 +1,148 @@
+import logging
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.db.models import Max
+from django.utils import timezone
+from scipy import sparse
+from favorites.models import Favorite
+from user_activity.models import PlayHistory
+from ..models import Track, TrackNeighbors
+
+logger = logging.getLogger(__name__)
+
+User = get_user_model()
+
+# A favorite says more about taste than a single play
+FAVORITE_WEIGHT = 3.0
+
+
+def _chunked_pairs(queryset, chunk_size):
+    """
+    Yield (user_ids, track_ids) arrays from ``queryset`` in primary-key order,
+    ``chunk_size`` rows at a time (keyset pagination, no OFFSET scans).
+    """
+    last_id = 0
+    while True:
+        rows = list(
+            queryset.filter(id__gt=last_id).order_by('id').values_list('id', 'user_id', 'track_id')[:chunk_size]
+        )
+        if not rows:
+            return
+        chunk = np.array(rows, dtype=np.int64)
+        last_id = int(chunk[-1, 0])
+        yield chunk[:, 1], chunk[:, 2]
+
+
+def _sum_pairs(pairs, shape):
+    """
+    Count (user, track) occurrences into a sparse matrix. Chunks are collected
+    as int32 coordinates and converted to CSR once: adding each chunk to a
+    running CSR matrix would re-sort and copy it every time.
+    """
+    user_chunks, track_chunks = [], []
+    for user_ids, track_ids in pairs:
+        user_chunks.append(user_ids.astype(np.int32))
+        track_chunks.append(track_ids.astype(np.int32))
+    if not user_chunks:
+        return sparse.csr_matrix(shape, dtype=np.float32)
+    rows = np.concatenate(user_chunks)
+    columns = np.concatenate(track_chunks)
+    # Duplicate coordinates are summed when converting to CSR
+    return sparse.coo_matrix((np.ones(len(rows), dtype=np.float32), (rows, columns)), shape=shape).tocsr()
+
+
+def build_interaction_matrix(chunk_size=100_000):
+    """
+    Sparse users x tracks matrix of listening strength.
+
+    Each cell is log(1 + plays), plus FAVORITE_WEIGHT if the user favorited
+    the track. Rows and columns are indexed by user id and track id. Raw rows
+    are read in chunks and kept as int32 coordinates (8 bytes per row) until
+    the matrix is built.
+    """
+    max_user = User.objects.aggregate(max_id=Max('id'))['max_id'] or 0
+    max_track = Track.objects.aggregate(max_id=Max('id'))['max_id'] or 0
+    shape = (max_user + 1, max_track + 1)
+
+    # Rows added while the job runs may point past the matrix bounds
+    plays = PlayHistory.objects.filter(user_id__lte=max_user, track_id__lte=max_track)
+    matrix = _sum_pairs(_chunked_pairs(plays, chunk_size), shape)
+    matrix.data = np.log1p(matrix.data)
+
+    favorites = Favorite.objects.filter(
+        content_type='track', track__isnull=False, user_id__lte=max_user, track_id__lte=max_track
+    )
+    matrix = matrix + FAVORITE_WEIGHT * _sum_pairs(_chunked_pairs(favorites, chunk_size), shape)
+    return matrix.tocsc()
+
+
+def _top_k(columns, values, k):
+    if len(values) > k:
+        keep = np.argpartition(-values, k)[:k]
+        columns, values = columns[keep], values[keep]
+    order = np.argsort(-values, kind='stable')
+    return columns[order], values[order]
+
+
+def similar_tracks(matrix, k, block_size=1000):
+    """
+    Yield (track_id, neighbor_ids, scores) by cosine similarity of track columns.
+
+    Similarities are computed for ``block_size`` tracks at a time, so the full
+    tracks x tracks matrix never exists in memory.
+    """
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=0)).ravel())
+    active = np.flatnonzero(norms)
+    inverse = np.zeros_like(norms)
+    inverse[active] = 1 / norms[active]
+
+    normalized = (matrix @ sparse.diags(inverse)).tocsc()
+    by_track = normalized.T.tocsr()
+
+    for start in range(0, len(active), block_size):
+        block = active[start:start + block_size]
+        similarities = (by_track[block] @ normalized).tocsr()
+        for row, track_id in enumerate(block):
+            begin, end = similarities.indptr[row], similarities.indptr[row + 1]
+            columns = similarities.indices[begin:end]
+            values = similarities.data[begin:end]
+            others = columns != track_id
+            columns, values = _top_k(columns[others], values[others], k)
+            if len(columns):
+                yield int(track_id), columns, values
+
+
+def build_similar_tracks(k, chunk_size=100_000, block_size=1000):
+    """Recompute and store neighbor lists for every track with listening data. Returns the count."""
+    started_at = timezone.now()
+    matrix = build_interaction_matrix(chunk_size)
+    logger.info(f"Interaction matrix: {matrix.shape[0]} users x {matrix.shape[1]} tracks, {matrix.nnz} entries")
+
+    stored = 0
+    batch = []
+    for track_id, neighbor_ids, scores in similar_tracks(matrix, k, block_size):
+        batch.append(TrackNeighbors(
+            track_id=track_id,
+            neighbor_ids=neighbor_ids.astype('<i4').tobytes(),
+            scores=scores.astype('<f4').tobytes(),
+            computed_at=timezone.now(),
+        ))
+        if len(batch) >= block_size:
+            stored += _save(batch)
+            batch = []
+    if batch:
+        stored += _save(batch)
+
+    # Tracks that lost all their listeners keep no stale neighbors
+    TrackNeighbors.objects.filter(computed_at__lt=started_at).delete()
+    return stored
+
+
+def _save(batch):
+    TrackNeighbors.objects.bulk_create(
+        batch,
+        update_conflicts=True,
+        unique_fields=['track'],
+        update_fields=['neighbor_ids', 'scores', 'computed_at'],
+    )
+    return len(batch)
@@ -0,0 +1,216 @@
+import logging
+import math
+from collections import defaultdict
+from datetime import timedelta
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F, Max, Q
+from django.db.models.functions import TruncHour
+from django.utils import timezone
+from user_activity.models import PlayHistory
+from ..models import Track, TrackPlayBucket, TrendingScore, TrendingState
+
+logger = logging.getLogger(__name__)
+
+CACHE_PREFIX = 'trending:'
+# Index of every list written by the last run, so lists that drop out can be deleted
+CACHE_INDEX_KEY = f'{CACHE_PREFIX}keys'
+# Tracks whose decayed score falls below this many plays are dropped
+MIN_DECAYED_SCORE = 0.05
+# Rebase before exp() gets anywhere near float overflow
+REBASE_AFTER_HALF_LIVES = 64
+# Runs a missing PlayHistory id below the watermark is looked for again before it counts as rolled back
+PENDING_PLAY_RUNS = 4
+# Gaps are only looked for among this many ids below the newest one
+PENDING_PLAY_WINDOW = 1000
+
+
+def _decay_rate():
+    """Per-hour decay constant for the configured half-life"""
+    return math.log(2) / settings.TRENDING_HALF_LIFE_HOURS
+
+
+def _hours_between(start, end):
+    return (end - start).total_seconds() / 3600
+
+
+def _scale(epoch, moment):
+    """Weight of one play at ``moment`` relative to ``epoch``"""
+    return math.exp(_decay_rate() * _hours_between(epoch, moment))
+
+
+def list_key(genre_id=None, artist_id=None):
+    if genre_id is not None:
+        return f'{CACHE_PREFIX}genre:{genre_id}'
+    if artist_id is not None:
+        return f'{CACHE_PREFIX}artist:{artist_id}'
+    return f'{CACHE_PREFIX}global'
+
+
+def _get_state():
+    now = timezone.now().replace(minute=0, second=0, microsecond=0)
+    state, _ = TrendingState.objects.select_for_update().get_or_create(pk=1, defaults={'epoch': now})
+    return state
+
+
+def _rebase(state, now):
+    """Move the epoch forward so stored scores stay small; one UPDATE for every row"""
+    if _hours_between(state.epoch, now) < REBASE_AFTER_HALF_LIVES * settings.TRENDING_HALF_LIFE_HOURS:
+        return
+    new_epoch = now.replace(minute=0, second=0, microsecond=0)
+    factor = 1 / _scale(state.epoch, new_epoch)
+    TrendingScore.objects.update(score=F('score') * factor)
+    state.epoch = new_epoch
+    logger.info(f"Rebased trending scores to {new_epoch}")
+
+
+def _ingest_plays(state):
+    """
+    Fold PlayHistory rows added since the last run into hourly buckets and scores.
+
+    Ids are not committed in order: a row whose transaction commits after a
+    higher id was read shows up below the watermark. Ids skipped in the
+    range read are kept in ``pending_play_ids`` and picked up once they appear.
+    """
+    max_id = PlayHistory.objects.aggregate(max_id=Max('id'))['max_id'] or 0
+    pending = {int(play_id): runs for play_id, runs in state.pending_play_ids.items()}
+    late_ids = set(PlayHistory.objects.filter(id__in=pending).values_list('id', flat=True)) if pending else set()
+    if max_id <= state.last_play_id and not late_ids:
+        _age_pending(state, pending, late_ids, set())
+        return 0
+
+    # Only the newest ids can still be in flight; older gaps are rolled-back transactions
+    gap_floor = max(state.last_play_id, max_id - PENDING_PLAY_WINDOW)
+    visible = set(PlayHistory.objects.filter(id__gt=gap_floor, id__lte=max_id).values_list('id', flat=True))
+    skipped = set(range(gap_floor + 1, max_id + 1)) - visible
+    _age_pending(state, pending, late_ids, skipped)
+
+    rows = (
+        PlayHistory.objects
+        .filter(Q(id__gt=state.last_play_id, id__lte=max_id) | Q(id__in=late_ids))
+        .annotate(hour=TruncHour('played_at'))
+        .values('track_id', 'hour')
+        .annotate(plays=Count('id'))
+        .order_by()
+    )
+    new_plays = {(row['track_id'], row['hour']): row['plays'] for row in rows}
+    state.last_play_id = max(max_id, state.last_play_id)
+    if not new_plays:
+        return 0
+    track_ids = {track_id for track_id, _ in new_plays}
+    first_hour = min(hour for _, hour in new_plays)
+
+    # Hourly buckets: read the affected ones once, then upsert the sums in bulk
+    existing = {
+        (bucket.track_id, bucket.hour): bucket.plays
+        for bucket in TrackPlayBucket.objects.filter(track_id__in=track_ids, hour__gte=first_hour)
+    }
+    TrackPlayBucket.objects.bulk_create(
+        [
+            TrackPlayBucket(track_id=track_id, hour=hour, plays=existing.get((track_id, hour), 0) + plays)
+            for (track_id, hour), plays in new_plays.items()
+        ],
+        update_conflicts=True,
+        unique_fields=['track', 'hour'],
+        update_fields=['plays'],
+    )
+
+    # Scores: only tracks that were played are touched
+    increments = defaultdict(float)
+    for (track_id, hour), plays in new_plays.items():
+        increments[track_id] += plays * _scale(state.epoch, hour)
+    current = dict(TrendingScore.objects.filter(track_id__in=track_ids).values_list('track_id', 'score'))
+    now = timezone.now()
+    TrendingScore.objects.bulk_create(
+        [
+            TrendingScore(track_id=track_id, score=current.get(track_id, 0) + increment, updated_at=now)
+            for track_id, increment in increments.items()
+        ],
+        update_conflicts=True,
+        unique_fields=['track'],
+        update_fields=['score', 'updated_at'],
+    )
+
+    return sum(new_plays.values())
+
+
+def _age_pending(state, pending, found, skipped):
+    """Drop ids that showed up or ran out of retries, add the newly skipped ones"""
+    remaining = {play_id: runs - 1 for play_id, runs in pending.items() if play_id not in found and runs > 1}
+    remaining.update({play_id: PENDING_PLAY_RUNS for play_id in skipped})
+    state.pending_play_ids = {str(play_id): runs for play_id, runs in remaining.items()}
+
+
+def _prune(state, now):
+    """Drop scores that decayed to nothing and buckets past the retention window"""
+    threshold = MIN_DECAYED_SCORE * _scale(state.epoch, now)
+    TrendingScore.objects.filter(score__lt=threshold).delete()
+    cutoff = now - timedelta(days=settings.TRENDING_BUCKET_RETENTION_DAYS)
+    TrackPlayBucket.objects.filter(hour__lt=cutoff).delete()
+
+
+def _materialize():
+    """Write the global, per-genre and per-artist top lists to the cache in one pass over the scores"""
+    size = settings.TRENDING_LIST_SIZE
+    ranked = list(
+        TrendingScore.objects.order_by('-score').values_list('track_id', 'track__artist_id')
+    )
+    genres_by_track = defaultdict(list)
+    for track_id, genre_id in Track.genres.through.objects.filter(
+        track_id__in=[track_id for track_id, _ in ranked]
+    ).values_list('track_id', 'genre_id'):
+        genres_by_track[track_id].append(genre_id)
+
+    lists = defaultdict(list)
+    for track_id, artist_id in ranked:
+        keys = [list_key(), list_key(artist_id=artist_id)]
+        keys += [list_key(genre_id=genre_id) for genre_id in genres_by_track[track_id]]
+        for key in keys:
+            if len(lists[key]) < size:
+                lists[key].append(track_id)
+    lists.setdefault(list_key(), [])
+
+    stale = set(cache.get(CACHE_INDEX_KEY) or []) - set(lists)
+    cache.set_many(dict(lists), timeout=None)
+    cache.set(CACHE_INDEX_KEY, list(lists), timeout=None)
+    if stale:
+        cache.delete_many(stale)
+    return len(lists)
+
+
+def compute_trending():
+    """
+    Scheduled job: ingest new plays, decay, prune and materialize the lists.
+    Returns (plays ingested, lists written).
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        state = _get_state()
+        _rebase(state, now)
+        ingested = _ingest_plays(state)
+        _prune(state, now)
+        state.save()
+    return ingested, _materialize()
+
+
+def trending_track_ids(genre_id=None, artist_id=None):
+    """
+    Track ids of the trending list, best first.
+
+    Reads the materialized list; when it has not been built yet the scores
+    are ranked in the database. Returns None if nothing has been computed.
+    """
+    track_ids = cache.get(list_key(genre_id, artist_id))
+    if track_ids is not None:
+        return track_ids
+
+    scores = TrendingScore.objects.order_by('-score')
+    if genre_id is not None:
+        scores = scores.filter(track__genres__id=genre_id)
+    if artist_id is not None:
+        scores = scores.filter(track__artist_id=artist_id)
+    track_ids = list(scores.values_list('track_id', flat=True)[:settings.TRENDING_LIST_SIZE])
+    if not track_ids and not TrendingScore.objects.exists():
+        return None
+    return track_ids
@@ -0,0 +1,135 @@
+import base64
+import binascii
+import hashlib
+import logging
+import os
+from datetime import timedelta
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.utils import timezone
+from ..models import UploadSession, MAX_AUDIO_FILE_SIZE
+
+logger = logging.getLogger(__name__)
+
+# Chunks are copied to disk in pieces of this size, never buffered whole
+READ_BLOCK_SIZE = 64 * 1024
+CHECKSUM_ALGORITHMS = ('sha256', 'sha1', 'md5')
+# tus uses 460 for "Checksum Mismatch"
+HTTP_460_CHECKSUM_MISMATCH = 460
+
+
+class UploadError(Exception):
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def max_upload_size(kind):
+    return MAX_AUDIO_FILE_SIZE if kind == 'audio' else settings.UPLOAD_MAX_VIDEO_SIZE
+
+
+def staged_path(session):
+    return os.path.join(settings.UPLOAD_STAGING_ROOT, f'{session.id}.part')
+
+
+def parse_checksum(header):
+    """Parse an ``Upload-Checksum: <algorithm> <base64 digest>`` header"""
+    if not header:
+        return None
+    try:
+        algorithm, encoded = header.strip().split(' ', 1)
+        expected = base64.b64decode(encoded.strip(), validate=True)
+    except (ValueError, binascii.Error):
+        raise UploadError('Malformed Upload-Checksum header')
+    algorithm = algorithm.lower()
+    if algorithm not in CHECKSUM_ALGORITHMS:
+        raise UploadError(f'Unsupported checksum algorithm: {algorithm}')
+    return algorithm, expected
+
+
+def write_chunk(session, stream, length, checksum=None):
+    """
+    Append ``length`` bytes from ``stream`` to the staged file at the session offset.
+
+    With a checksum the chunk is all-or-nothing. Without one, a chunk cut short
+    by a dropped connection is kept so the client can resume from the new offset.
+    Returns the new offset; the caller persists it while still holding the
+    session row lock, so no other chunk writes the file in between.
+    """
+    if length <= 0:
+        raise UploadError('Empty chunk')
+    if length > settings.UPLOAD_MAX_CHUNK_SIZE:
+        raise UploadError('Chunk too large', status_code=413)
+    if session.offset + length > session.size:
+        raise UploadError('Chunk exceeds declared upload size', status_code=413)
+
+    digest = hashlib.new(checksum[0]) if checksum else None
+    path = staged_path(session)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    with open(path, 'r+b' if os.path.exists(path) else 'wb') as staged:
+        staged.seek(session.offset)
+        remaining = length
+        while remaining > 0:
+            data = stream.read(min(READ_BLOCK_SIZE, remaining))
+            if not data:
+                break
+            staged.write(data)
+            if digest:
+                digest.update(data)
+            remaining -= len(data)
+
+        if digest and (remaining or digest.digest() != checksum[1]):
+            # Drop the rejected bytes so the next attempt starts clean
+            staged.truncate(session.offset)
+            raise UploadError('Checksum mismatch', status_code=HTTP_460_CHECKSUM_MISMATCH)
+        staged.truncate(session.offset + length - remaining)
+
+    return session.offset + length - remaining
+
+
+def commit_staged_file(session, field):
+    """Move the completed staged file into ``field``'s storage and return the stored name"""
+    storage = field.storage
+    path = staged_path(session)
+    # generate_filename applies upload_to and sanitizes the client-supplied name
+    name = storage.get_available_name(field.generate_filename(None, session.filename))
+
+    if isinstance(storage, FileSystemStorage):
+        # Same disk: a rename instead of copying the whole file
+        target = storage.path(name)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        os.replace(path, target)
+        logger.info(f"Committed upload {session.id} to {name}")
+        return name
+
+    with open(path, 'rb') as staged:
+        name = storage.save(name, File(staged))
+    os.remove(path)
+    logger.info(f"Committed upload {session.id} to {name}")
+    return name
+
+
+def commit_staged_blob(session):
+    """Store the completed staged audio as a content-addressed blob and return it"""
+    from .blob_service import ingest_file
+
+    path = staged_path(session)
+    with open(path, 'rb') as staged:
+        blob, created = ingest_file(File(staged), session.filename)
+    os.remove(path)
+    logger.info(f"Committed upload {session.id} to blob {blob.sha256} ({'new' if created else 'deduplicated'})")
+    return blob
+
+
+def discard_session(session):
+    path = staged_path(session)
+    if os.path.exists(path):
+        os.remove(path)
+    session.delete()
+
+
+def expired_sessions():
+    cutoff = timezone.now() - timedelta(hours=settings.UPLOAD_SESSION_TTL_HOURS)
+    return UploadSession.objects.filter(status='active', updated_at__lt=cutoff)
@@ -0,0 +1,14 @@
+from django.db import transaction
+from django.db.models.signals import post_delete
+from .models import Track, Artist, Album
+from .services import leaderboard_service
+
+
+def remove_from_leaderboards(sender, instance, **kwargs):
+    member_id = instance.pk
+    # Only once the delete is committed; the pk is cleared by then
+    transaction.on_commit(lambda: leaderboard_service.remove_member(sender, member_id))
+
+
+for model in leaderboard_service.MODEL_BOARDS:
+    post_delete.connect(remove_from_leaderboards, sender=model, dispatch_uid=f'leaderboard_delete_{model.__name__}')
@@ -1,9 +1,10 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import TrackViewSet
+from .views import TrackViewSet, UploadSessionViewSet
 
 router = DefaultRouter()
 router.register(r'tracks', TrackViewSet)
+router.register(r'uploads', UploadSessionViewSet, basename='upload')
 
 urlpatterns = [
     path('', include(router.urls)),
@@ -1,21 +1,38 @@
-from rest_framework import viewsets, permissions, status
+from rest_framework import viewsets, permissions, status, mixins
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from django.db.models import F
-from django.http import HttpResponse, FileResponse, Http404
+from django.http import HttpResponse, HttpResponseRedirect, FileResponse, Http404
 from django.conf import settings
+from django.db import transaction
+from django.utils.http import parse_etags
 import os
 import re
 import mimetypes
-import urllib.parse
-from .models import Track
+from .models import Track, TrackNeighbors, UploadSession
+from core import catalog_snapshot
+from core.media import IMMUTABLE_CACHE_CONTROL, file_version, is_content_addressed
+from core.pagination import SizedPageNumberPagination
+from core.views import CachedObjectViewMixin, DynamicFieldsViewMixin
+from core.response_cache import cache_response
 from user_activity.models import UserActivity, PlayHistory
-from .serializers import TrackSerializer
+from .serializers import TrackSerializer, UploadSessionSerializer
+from .projections import TRACK_PROJECTION
+from .services import facet_service, leaderboard_service, trending_service
+from .services.delivery_service import presigned_delivery_enabled, get_presigned_url, find_track_file_path
+from .services.upload_service import (
+    UploadError,
+    parse_checksum,
+    write_chunk,
+    commit_staged_file,
+    commit_staged_blob,
+    discard_session,
+)
 
-class TrackViewSet(viewsets.ModelViewSet):
+class TrackViewSet(CachedObjectViewMixin, DynamicFieldsViewMixin, viewsets.ModelViewSet):
     queryset = Track.objects.all()
     serializer_class = TrackSerializer
+    cached_object_actions = ('retrieve', 'stream', 'similar')
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
     
     def get_queryset(self):
@@ -25,10 +42,11 @@ class TrackViewSet(viewsets.ModelViewSet):
         album = self.request.query_params.get('album', None)
         search = self.request.query_params.get('search', None)
         
+        # Names are matched against the in-process snapshot, so the filters need no joins
         if genre:
-            queryset = queryset.filter(genres__name__icontains=genre)
+            queryset = queryset.filter(genres__id__in=catalog_snapshot.get_snapshot().genre_ids_containing(genre))
         if artist:
-            queryset = queryset.filter(artist__name__icontains=artist)
+            queryset = queryset.filter(artist_id__in=catalog_snapshot.get_snapshot().artist_ids_containing(artist))
         if album:
             queryset = queryset.filter(album__title__icontains=album)
         if search:
@@ -73,13 +91,24 @@ class TrackViewSet(viewsets.ModelViewSet):
             
         return Response({'status': 'download count incremented'})
     
+    def _track_list_response(self, queryset=None, track_ids=None):
+        """
+        Read-only track lists in TrackSerializer's shape, rendered from a values()
+        projection. ?fields=/?expand= still go through the serializer.
+        """
+        if 'fields' in self.request.query_params or 'expand' in self.request.query_params:
+            if track_ids is not None:
+                tracks_by_id = Track.cached.get_many(track_ids)
+                queryset = [tracks_by_id[track_id] for track_id in track_ids if track_id in tracks_by_id]
+            return Response(self.get_serializer(queryset, many=True).data)
+        if track_ids is not None:
+            return Response(TRACK_PROJECTION.render_ids(track_ids, self.request))
+        return Response(TRACK_PROJECTION.render(queryset, self.request))
+
     @action(detail=False, methods=['get'])
+    @cache_response()
     def top_tracks(self, request):
-        top_tracks = Track.objects.annotate(
-            total_plays=F('play_count') + F('download_count')
-        ).order_by('-total_plays')[:10]
-        serializer = self.get_serializer(top_tracks, many=True)
-        return Response(serializer.data)
+        return self._track_list_response(track_ids=leaderboard_service.top_member_ids(leaderboard_service.POPULAR, 10))
         
     @action(detail=False, methods=['get'], url_path='current-track', permission_classes=[permissions.AllowAny])
     def current_track(self, request):
@@ -91,7 +120,8 @@ class TrackViewSet(viewsets.ModelViewSet):
         # Check if user is authenticated or AnonymousUser
         if not user or not user.is_authenticated:
             # For anonymous users, return the most recent track from cache or database
-            most_popular_track = Track.objects.order_by('-play_count').first()
+            most_popular = leaderboard_service.top(leaderboard_service.PLAYS, 1)
+            most_popular_track = most_popular[0] if most_popular else None
             if most_popular_track:
                 serializer = TrackSerializer(most_popular_track)
                 return Response(serializer.data)
@@ -107,7 +137,8 @@ class TrackViewSet(viewsets.ModelViewSet):
         
         if not recent_activity or not recent_activity.track:
             # If authenticated but no recent activity, fall back to popular track
-            most_popular_track = Track.objects.order_by('-play_count').first()
+            most_popular = leaderboard_service.top(leaderboard_service.PLAYS, 1)
+            most_popular_track = most_popular[0] if most_popular else None
             if most_popular_track:
                 serializer = TrackSerializer(most_popular_track)
                 return Response(serializer.data)
@@ -136,7 +167,21 @@ class TrackViewSet(viewsets.ModelViewSet):
     def stream(self, request, pk=None):
         try:
             track = self.get_object()
-            
+
+            if self._is_not_modified(request, track):
+                return self._not_modified_response(track)
+
+            # Let S3 serve the bytes (and Range requests) directly when configured
+            if presigned_delivery_enabled(track.file):
+                range_match = re.match(r'bytes=(\d+)-', request.META.get('HTTP_RANGE', ''))
+                if (not range_match or int(range_match.group(1)) == 0) and request.user and request.user.is_authenticated:
+                    UserActivity.objects.create(
+                        user=request.user,
+                        track=track,
+                        action='play'
+                    )
+                return self._presigned_response(request, track.file)
+
             # Get the track path
             file_path = self._find_track_file_path(track)
             
@@ -150,38 +195,36 @@ class TrackViewSet(viewsets.ModelViewSet):
             import traceback
             traceback.print_exc()
             return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-            
+
+    def _is_not_modified(self, request, track):
+        """True when the client already holds these exact audio bytes (If-None-Match)"""
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+        if not if_none_match or not track.etag:
+            return False
+        return if_none_match.strip() == '*' or track.etag in parse_etags(if_none_match)
+
+    def _not_modified_response(self, track):
+        response = HttpResponse(status=304)
+        response['ETag'] = track.etag
+        return response
+
+    def _download_filename(self, track, file_path):
+        # Blob names are content hashes; give the user a readable name instead
+        if track.audio_blob_id:
+            extension = os.path.splitext(file_path)[1] or '.mp3'
+            return f"{track.artist.name} - {track.title}{extension}"
+        return os.path.basename(file_path)
+
+    def _presigned_response(self, request, field_file, as_attachment=False, filename=None):
+        """Redirect to a presigned URL, or return it as JSON with ?redirect=false"""
+        url = get_presigned_url(field_file, as_attachment=as_attachment, filename=filename)
+        if request.query_params.get('redirect') == 'false':
+            return Response({'url': url})
+        return HttpResponseRedirect(url)
+
     def _find_track_file_path(self, track):
         """Find the actual path to the track file"""
-        # Try multiple ways to find the file
-        possible_paths = []
-        
-        # 1. Standard path
-        standard_path = os.path.join(settings.MEDIA_ROOT, track.file.name.lstrip('/'))
-        possible_paths.append(standard_path)
-        
-        # 2. Path with URL decode
-        decoded_name = urllib.parse.unquote(track.file.name)
-        decoded_path = os.path.join(settings.MEDIA_ROOT, decoded_name.lstrip('/'))
-        possible_paths.append(decoded_path)
-        
-        # 3. Try with simple file name (no directory)
-        simple_name = os.path.basename(track.file.name)
-        simple_path = os.path.join(settings.MEDIA_ROOT, 'tracks', simple_name)
-        possible_paths.append(simple_path)
-        
-        # 4. Simple name decoded
-        decoded_simple = urllib.parse.unquote(simple_name)
-        decoded_simple_path = os.path.join(settings.MEDIA_ROOT, 'tracks', decoded_simple)
-        possible_paths.append(decoded_simple_path)
-        
-        # Find the first path that exists
-        for path in possible_paths:
-            if os.path.exists(path):
-                print(f"Found track file at: {path}")
-                return path
-                
-        return None
+        return find_track_file_path(track)
         
     def _handle_file_not_found(self, track):
         """Handle case when track file is not found"""
@@ -210,8 +253,12 @@ class TrackViewSet(viewsets.ModelViewSet):
         if content_type is None:
             content_type = 'audio/mpeg'  # Default to MP3
             
+        # A stale If-Range validator means the client gets the whole file again
+        if_range = request.META.get('HTTP_IF_RANGE')
+        range_valid = not if_range or (track.etag is not None and if_range.strip() == track.etag)
+
         # Check for range header
-        if 'HTTP_RANGE' in request.META:
+        if 'HTTP_RANGE' in request.META and range_valid:
             print(f"Range header found: {request.META['HTTP_RANGE']}")
             range_header = request.META['HTTP_RANGE']
             range_match = re.match(r'bytes=(\d+)-(\d*)', range_header)
@@ -241,6 +288,8 @@ class TrackViewSet(viewsets.ModelViewSet):
                 response['Content-Length'] = str(length)
                 response['Content-Range'] = f'bytes {start}-{end}/{file_size}'
                 response['Accept-Ranges'] = 'bytes'
+                if track.etag:
+                    response['ETag'] = track.etag
                 
                 # Record play activity if at the beginning
                 if start == 0 and hasattr(request, 'user') and request.user and request.user.is_authenticated:
@@ -261,6 +310,8 @@ class TrackViewSet(viewsets.ModelViewSet):
         )
         response['Content-Length'] = str(file_size)
         response['Accept-Ranges'] = 'bytes'
+        if track.etag:
+            response['ETag'] = track.etag
         
         # Record play activity if full file requested
         if hasattr(request, 'user') and request.user and request.user.is_authenticated:
@@ -279,16 +330,25 @@ class TrackViewSet(viewsets.ModelViewSet):
         if not track.is_downloadable:
             return Response({'error': 'This track is not available for download'}, 
                          status=status.HTTP_403_FORBIDDEN)
+
+        if self._is_not_modified(request, track):
+            return self._not_modified_response(track)
         
         track.increment_download_count()
         
-        if request.user.is_authenticated:
+        if request.user and request.user.is_authenticated:
             UserActivity.objects.create(
                 user=request.user,
                 track=track,
                 action='download'
             )
-        
+
+        if presigned_delivery_enabled(track.file):
+            return self._presigned_response(
+                request, track.file, as_attachment=True,
+                filename=self._download_filename(track, track.file.name),
+            )
+
         # Try to get the actual file path
         file_path = self._find_track_file_path(track)
         
@@ -296,7 +356,7 @@ class TrackViewSet(viewsets.ModelViewSet):
             return self._handle_file_not_found(track)
             
         # Get just the filename without the path
-        filename = os.path.basename(file_path)
+        filename = self._download_filename(track, file_path)
         
         # Create a direct download response with the file
         response = FileResponse(
@@ -305,9 +365,34 @@ class TrackViewSet(viewsets.ModelViewSet):
             as_attachment=True,
             filename=filename
         )
+        if track.etag:
+            response['ETag'] = track.etag
         
         return response
     
+    @action(detail=True, methods=['get'])
+    def similar(self, request, pk=None):
+        """Tracks most often listened to by the same people (built by build_similar_tracks)"""
+        track = self.get_object()
+        try:
+            limit = min(int(request.query_params.get('limit', 20)), settings.SIMILAR_TRACKS_PER_TRACK)
+        except ValueError:
+            return Response({'error': 'limit must be a number'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            neighbors = track.neighbors.neighbors(limit)
+        except TrackNeighbors.DoesNotExist:
+            neighbors = []
+
+        tracks_by_id = Track.cached.get_many(track_id for track_id, _ in neighbors)
+        results = []
+        for track_id, score in neighbors:
+            if track_id in tracks_by_id:
+                data = self.get_serializer(tracks_by_id[track_id]).data
+                data['similarity'] = round(score, 4)
+                results.append(data)
+        return Response(results)
+
     @action(detail=True, methods=['get'])
     def video(self, request, pk=None):
         track = self.get_object()
@@ -322,19 +407,53 @@ class TrackViewSet(viewsets.ModelViewSet):
         })
     
     @action(detail=False)
+    @cache_response()
     def trending(self, request):
-        """Get tracks with the highest play count"""
-        tracks = Track.objects.order_by('-play_count')[:10]
-        serializer = self.get_serializer(tracks, many=True)
-        return Response(serializer.data)
+        """Get tracks trending right now, optionally within a genre (?genre=<id>) or artist (?artist=<id>)"""
+        try:
+            genre_id = int(request.query_params['genre']) if 'genre' in request.query_params else None
+            artist_id = int(request.query_params['artist']) if 'artist' in request.query_params else None
+        except ValueError:
+            return Response({'error': 'genre and artist must be ids'}, status=status.HTTP_400_BAD_REQUEST)
+
+        track_ids = trending_service.trending_track_ids(genre_id=genre_id, artist_id=artist_id)
+        if track_ids is None:
+            # Trending has not been computed yet: use lifetime plays, within the same genre/artist
+            if genre_id is None and artist_id is None:
+                track_ids = leaderboard_service.top_member_ids(leaderboard_service.PLAYS, 10)
+            else:
+                tracks = Track.objects.order_by('-play_count')
+                if genre_id is not None:
+                    tracks = tracks.filter(genres__id=genre_id)
+                if artist_id is not None:
+                    tracks = tracks.filter(artist_id=artist_id)
+                track_ids = list(tracks.values_list('id', flat=True)[:10])
+        # The materialized lists hold TRENDING_LIST_SIZE ids; the endpoint returns the top 10
+        return self._track_list_response(track_ids=track_ids[:10])
     
     @action(detail=False)
+    @cache_response()
     def recent(self, request):
         """Get recently added tracks"""
-        tracks = Track.objects.order_by('-created_at')[:10]
-        serializer = self.get_serializer(tracks, many=True)
-        return Response(serializer.data)
+        return self._track_list_response(Track.objects.order_by('-created_at')[:10])
     
+    @action(detail=False, methods=['get'], pagination_class=SizedPageNumberPagination)
+    def browse(self, request):
+        """
+        Faceted browsing: ?genre=1,2&artist=3&album=4 (ids, OR within a facet,
+        AND across facets), paginated with ?page=N&size=M, plus per-facet counts.
+        """
+        try:
+            filters = facet_service.parse_filters(request.query_params)
+        except ValueError:
+            return Response({'error': 'genre, artist and album must be comma-separated ids'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        track_ids = self.paginate_queryset(facet_service.filter_tracks(filters).values_list('id', flat=True))
+        response = self.get_paginated_response(TRACK_PROJECTION.render_ids(list(track_ids), request))
+        response.data['facets'] = facet_service.facet_counts(filters)
+        return response
+
     @action(detail=False)
     def by_genre(self, request):
         genre_id = request.query_params.get('genre_id')
@@ -342,18 +461,124 @@ class TrackViewSet(viewsets.ModelViewSet):
             return Response({'error': 'genre_id parameter is required'}, 
                          status=status.HTTP_400_BAD_REQUEST)
         
-        tracks = Track.objects.filter(genres__id=genre_id)
-        serializer = self.get_serializer(tracks, many=True)
-        return Response(serializer.data)
+        return self._track_list_response(Track.objects.filter(genres__id=genre_id))
+
+class UploadSessionViewSet(mixins.CreateModelMixin,
+                           mixins.RetrieveModelMixin,
+                           mixins.DestroyModelMixin,
+                           viewsets.GenericViewSet):
+    """
+    Resumable chunked uploads (tus-like).
+
+    POST   /uploads/                 declare filename, size and kind
+    HEAD   /uploads/{id}/            current offset in the Upload-Offset header
+    PATCH  /uploads/{id}/            append a chunk at Upload-Offset, optional Upload-Checksum
+    POST   /uploads/{id}/finalize/   turn the completed upload into a Track
+    DELETE /uploads/{id}/            abort and drop the staged bytes
+    """
+    serializer_class = UploadSessionSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        queryset = UploadSession.objects.filter(user=self.request.user)
+        if self.action == 'partial_update':
+            # Chunks of one upload are checked, written and counted one at a time under the row lock
+            queryset = queryset.select_for_update()
+        return queryset
+
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)
+
+    def perform_destroy(self, instance):
+        discard_session(instance)
+
+    def _with_offset(self, response, session):
+        response['Upload-Offset'] = str(session.offset)
+        response['Upload-Length'] = str(session.size)
+        response['Cache-Control'] = 'no-store'
+        return response
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        self.perform_create(serializer)
+        response = Response(serializer.data, status=status.HTTP_201_CREATED)
+        response['Location'] = request.build_absolute_uri(f'{serializer.instance.pk}/')
+        return self._with_offset(response, serializer.instance)
+
+    def retrieve(self, request, *args, **kwargs):
+        session = self.get_object()
+        return self._with_offset(Response(self.get_serializer(session).data), session)
+
+    def partial_update(self, request, pk=None):
+        try:
+            client_offset = int(request.META.get('HTTP_UPLOAD_OFFSET', ''))
+        except ValueError:
+            return Response({'error': 'Upload-Offset header is required'}, status=status.HTTP_400_BAD_REQUEST)
+
+        with transaction.atomic():
+            session = self.get_object()
+            if session.status != 'active':
+                return Response({'error': 'Upload already finalized'}, status=status.HTTP_409_CONFLICT)
+            if client_offset != session.offset:
+                return Response({'error': 'Offset mismatch', 'offset': session.offset}, status=status.HTTP_409_CONFLICT)
+
+            try:
+                checksum = parse_checksum(request.META.get('HTTP_UPLOAD_CHECKSUM'))
+                length = int(request.META.get('CONTENT_LENGTH') or 0)
+                new_offset = write_chunk(session, request.stream, length, checksum)
+            except UploadError as e:
+                return Response({'error': str(e), 'offset': session.offset}, status=e.status_code)
+
+            session.offset = new_offset
+            session.save(update_fields=['offset', 'updated_at'])
+        return self._with_offset(Response(status=status.HTTP_204_NO_CONTENT), session)
+
+    @action(detail=True, methods=['post'])
+    def finalize(self, request, pk=None):
+        session = self.get_object()
+        if session.status != 'active':
+            return Response({'error': 'Upload already finalized'}, status=status.HTTP_409_CONFLICT)
+        if not session.is_complete:
+            return Response({'error': 'Upload is incomplete', 'offset': session.offset}, status=status.HTTP_409_CONFLICT)
+
+        if session.kind == 'video':
+            track = session.track
+            track.video.name = commit_staged_file(session, Track._meta.get_field('video'))
+            track.save(update_fields=['video', 'updated_at'])
+        else:
+            serializer = TrackSerializer(data=request.data, context=self.get_serializer_context())
+            # The audio comes from the staged upload, not the request body
+            serializer.fields['file'].required = False
+            serializer.is_valid(raise_exception=True)
+            blob = commit_staged_blob(session)
+            track = serializer.save(file=blob.file.name, audio_blob=blob)
+
+        session.status = 'completed'
+        session.track = track
+        session.save(update_fields=['status', 'track', 'updated_at'])
+
+        serializer = TrackSerializer(track, context=self.get_serializer_context())
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
 
 def media_stream(request, path):
     file_path = os.path.join(settings.MEDIA_ROOT, path)
     if not os.path.exists(file_path):
         raise Http404
 
+    content_type = mimetypes.guess_type(file_path)[0] or 'application/octet-stream'
+    # Content-addressed URLs, and ?v= URLs carrying the file's current version, change whenever the file does
+    if is_content_addressed(path) or request.GET.get('v') == file_version(file_path):
+        cache_control = IMMUTABLE_CACHE_CONTROL
+    else:
+        cache_control = 'no-cache'
+
     range_header = request.META.get('HTTP_RANGE', '').strip()
     if not range_header:
-        return FileResponse(open(file_path, 'rb'))
+        resp = FileResponse(open(file_path, 'rb'), content_type=content_type)
+        resp['Accept-Ranges'] = 'bytes'
+        resp['Cache-Control'] = cache_control
+        return resp
 
     size = os.path.getsize(file_path)
     byte1, byte2 = 0, None
@@ -374,8 +599,9 @@ def media_stream(request, path):
         f.seek(byte1)
         data = f.read(length)
 
-    resp = HttpResponse(data, status=206, content_type='video/mp4')
+    resp = HttpResponse(data, status=206, content_type=content_type)
     resp['Content-Range'] = f'bytes {byte1}-{byte1+length-1}/{size}'
     resp['Accept-Ranges'] = 'bytes'
     resp['Content-Length'] = str(length)
-    return resp 
\ No newline at end of file
+    resp['Cache-Control'] = cache_control
+    return resp 
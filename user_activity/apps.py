@@ -2,4 +2,7 @@ from django.apps import AppConfig
 
 class UserActivityConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'user_activity' 
\ No newline at end of file
+    name = 'user_activity'
+
+    def ready(self):
+        from . import signals  # noqa: F401
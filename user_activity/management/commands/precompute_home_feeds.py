@@ -0,0 +1,22 @@
+import logging
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from user_activity.services import home_feed_service
+
+logger = logging.getLogger(__name__)
+
+class Command(BaseCommand):
+    help = 'Precompute the home feed of every recently active user'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.HOME_FEED_ACTIVE_DAYS,
+                            help='Users who played something in this many days count as active')
+
+    def handle(self, *args, **options):
+        count = 0
+        for user_id in home_feed_service.active_user_ids(options['days']).iterator():
+            home_feed_service.build_feed(user_id)
+            count += 1
+
+        self.stdout.write(self.style.SUCCESS(f'Successfully precomputed {count} home feeds'))
+        logger.info(f'Successfully precomputed {count} home feeds')
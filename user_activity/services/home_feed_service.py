@@ -0,0 +1,150 @@
+import logging
+from datetime import timedelta
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+from django.utils import timezone
+from favorites.models import Favorite
+from tracks.models import Track, TrackNeighbors
+from tracks.services.trending_service import trending_track_ids
+from ..models import PlayHistory
+
+logger = logging.getLogger(__name__)
+
+SECTION_SIZE = 20
+TOP_GENRES = 3
+# Only this much recent history is scanned per section
+HISTORY_WINDOW = 200
+GENRE_LOOKBACK_DAYS = 30
+NEW_RELEASE_DAYS = 30
+
+
+def _cache_key(user_id):
+    return f'home_feed_{user_id}'
+
+
+def _unique(ids, limit=SECTION_SIZE):
+    seen = set()
+    result = []
+    for item in ids:
+        if item not in seen:
+            seen.add(item)
+            result.append(item)
+            if len(result) == limit:
+                break
+    return result
+
+
+def recently_played(user_id):
+    ids = PlayHistory.objects.filter(user_id=user_id).values_list('track_id', flat=True)[:HISTORY_WINDOW]
+    return _unique(ids)
+
+
+def because_you_liked(user_id):
+    """Neighbors of the user's latest favorite track, or None if they have not liked anything"""
+    favorite = (
+        Favorite.objects.filter(user_id=user_id, content_type='track', track__isnull=False)
+        .only('track_id').first()
+    )
+    if favorite is None:
+        return None
+
+    seed_id = favorite.track_id
+    try:
+        ids = [track_id for track_id, _ in TrackNeighbors.objects.get(track_id=seed_id).neighbors(SECTION_SIZE)]
+    except TrackNeighbors.DoesNotExist:
+        # No co-listening data yet: same artist
+        seed = Track.objects.only('artist_id').get(id=seed_id)
+        ids = list(
+            Track.objects.filter(artist_id=seed.artist_id).exclude(id=seed_id)
+            .order_by('-play_count').values_list('id', flat=True)[:SECTION_SIZE]
+        )
+    return {'seed': seed_id, 'tracks': ids}
+
+
+def top_genres(user_id):
+    """The user's most played genres over the last month, each with its trending tracks"""
+    since = timezone.now() - timedelta(days=GENRE_LOOKBACK_DAYS)
+    genres = (
+        PlayHistory.objects.filter(user_id=user_id, played_at__gte=since, track__genres__isnull=False)
+        .values('track__genres__id', 'track__genres__name')
+        .annotate(plays=Count('id'))
+        .order_by('-plays')[:TOP_GENRES]
+    )
+    sections = []
+    for genre in genres:
+        genre_id = genre['track__genres__id']
+        ids = trending_track_ids(genre_id=genre_id)
+        if not ids:
+            ids = Track.objects.filter(genres__id=genre_id).order_by('-play_count').values_list('id', flat=True)
+        sections.append({'genre': genre_id, 'name': genre['track__genres__name'], 'tracks': list(ids[:SECTION_SIZE])})
+    return sections
+
+
+def new_from_favorite_artists(user_id):
+    artist_ids = Favorite.objects.filter(
+        user_id=user_id, content_type='artist', artist__isnull=False
+    ).values_list('artist_id', flat=True)
+    since = timezone.now() - timedelta(days=NEW_RELEASE_DAYS)
+    return list(
+        Track.objects.filter(artist_id__in=artist_ids, created_at__gte=since)
+        .order_by('-created_at').values_list('id', flat=True)[:SECTION_SIZE]
+    )
+
+
+SECTION_BUILDERS = {
+    'recently_played': recently_played,
+    'because_you_liked': because_you_liked,
+    'top_genres': top_genres,
+    'new_from_favorite_artists': new_from_favorite_artists,
+}
+
+
+def build_feed(user_id):
+    """Compute every section and cache the result. Sections hold track ids only."""
+    feed = {name: builder(user_id) for name, builder in SECTION_BUILDERS.items()}
+    feed['generated_at'] = timezone.now().isoformat()
+    cache.set(_cache_key(user_id), feed, settings.HOME_FEED_TTL)
+    return feed
+
+
+def get_feed(user_id):
+    feed = cache.get(_cache_key(user_id))
+    if feed is None:
+        feed = build_feed(user_id)
+    return feed
+
+
+def refresh_sections(user_id, *names):
+    """Rebuild only ``names`` in a cached feed; feeds nobody has asked for are left alone"""
+    feed = cache.get(_cache_key(user_id))
+    if feed is None:
+        return
+    for name in names:
+        feed[name] = SECTION_BUILDERS[name](user_id)
+    cache.set(_cache_key(user_id), feed, settings.HOME_FEED_TTL)
+
+
+def record_play(user_id, track_id):
+    """Move a just-played track to the front of the cached recently played section, without a query"""
+    feed = cache.get(_cache_key(user_id))
+    if feed is None:
+        return
+    feed['recently_played'] = _unique([track_id] + feed['recently_played'])
+    cache.set(_cache_key(user_id), feed, settings.HOME_FEED_TTL)
+
+
+def feed_track_ids(feed):
+    ids = set(feed['recently_played']) | set(feed['new_from_favorite_artists'])
+    if feed['because_you_liked']:
+        ids.add(feed['because_you_liked']['seed'])
+        ids.update(feed['because_you_liked']['tracks'])
+    for genre in feed['top_genres']:
+        ids.update(genre['tracks'])
+    return ids
+
+
+def active_user_ids(days):
+    since = timezone.now() - timedelta(days=days)
+    # order_by() clears Meta.ordering, which would otherwise add played_at to the DISTINCT
+    return PlayHistory.objects.filter(played_at__gte=since).order_by().values_list('user_id', flat=True).distinct()
@@ -0,0 +1,17 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from favorites.models import Favorite
+from .models import PlayHistory
+from .services import home_feed_service
+
+@receiver(post_save, sender=PlayHistory)
+def update_home_feed_on_play(sender, instance, created, **kwargs):
+    if created:
+        home_feed_service.record_play(instance.user_id, instance.track_id)
+
+@receiver([post_save, post_delete], sender=Favorite)
+def update_home_feed_on_favorite(sender, instance, **kwargs):
+    if instance.content_type == 'track':
+        home_feed_service.refresh_sections(instance.user_id, 'because_you_liked')
+    elif instance.content_type == 'artist':
+        home_feed_service.refresh_sections(instance.user_id, 'new_from_favorite_artists')
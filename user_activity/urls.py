@@ -1,10 +1,11 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import UserActivityViewSet
+from .views import UserActivityViewSet, HomeFeedView
 
 router = DefaultRouter()
 router.register(r'activities', UserActivityViewSet, basename='user-activity')
 
 urlpatterns = [
     path('', include(router.urls)),
+    path('home/', HomeFeedView.as_view(), name='home-feed'),
 ] 
\ No newline at end of file
@@ -1,18 +1,27 @@
 from rest_framework import viewsets, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.db.models import Count
+from rest_framework.views import APIView
+from django.db.models import Count, Prefetch
 from django.utils import timezone
 from datetime import timedelta
 from .models import UserActivity
 from .serializers import UserActivitySerializer
+from .services import home_feed_service
+from tracks.models import Track
+from tracks.serializers import TrackSerializer
+from playlists.models import Playlist
+from playlists.serializers import with_summary
 
 class UserActivityViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = UserActivitySerializer
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
-        return UserActivity.objects.filter(user=self.request.user)
+        # Playlists come annotated for PlaylistSummarySerializer, one query for the whole page
+        return UserActivity.objects.filter(user=self.request.user).select_related('user').prefetch_related(
+            Prefetch('playlist', queryset=with_summary(Playlist.objects.all()))
+        )
     
     @action(detail=False, methods=['get'])
     def recent(self, request):
@@ -43,4 +52,38 @@ class UserActivityViewSet(viewsets.ReadOnlyModelViewSet):
         return Response({
             'activity_counts': activity_counts,
             'most_played_tracks': most_played
-        }) 
\ No newline at end of file
+        })
+
+
+class HomeFeedView(APIView):
+    """Personalized home screen in one request, served from the precomputed feed"""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        feed = home_feed_service.get_feed(request.user.id)
+
+        # One cache round trip (and one query for misses) for every track referenced by any section
+        tracks = Track.cached.get_many(home_feed_service.feed_track_ids(feed))
+        context = {'request': request}
+
+        def serialize(track_ids):
+            return TrackSerializer([tracks[i] for i in track_ids if i in tracks], many=True, context=context).data
+
+        because_you_liked = None
+        liked = feed['because_you_liked']
+        if liked and liked['seed'] in tracks:
+            because_you_liked = {
+                'seed': TrackSerializer(tracks[liked['seed']], context=context).data,
+                'tracks': serialize(liked['tracks']),
+            }
+
+        return Response({
+            'recently_played': serialize(feed['recently_played']),
+            'because_you_liked': because_you_liked,
+            'top_genres': [
+                {'id': genre['genre'], 'name': genre['name'], 'tracks': serialize(genre['tracks'])}
+                for genre in feed['top_genres']
+            ],
+            'new_from_favorite_artists': serialize(feed['new_from_favorite_artists']),
+            'generated_at': feed['generated_at'],
+        })